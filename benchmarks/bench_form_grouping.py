@@ -0,0 +1,125 @@
+"""
+Compare the grid-indexed field grouping in analyze_form_fields with the
+previous all-pairs grouping.
+
+Builds a synthetic form with N candidate elements (inputs, selects and
+buttons in field wrappers) and reports the grouping time for both versions.
+The all-pairs version is skipped above --legacy-max candidates.
+
+    python benchmarks/bench_form_grouping.py [--candidates 100 1000 10000] [--runs 3]
+"""
+from playwright.sync_api import sync_playwright
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scripts.page_helpers import install_helpers  # noqa: E402
+
+# The grouping analyze_form_fields used before the grid index
+LEGACY_GROUP_ELEMENTS_JS = '''
+        function groupElements(elements) {
+            function findCommonAncestor(el1, el2) {
+                const path1 = [];
+                let parent = el1;
+                while (parent) {
+                    path1.push(parent);
+                    parent = parent.parentElement;
+                }
+                parent = el2;
+                while (parent) {
+                    if (path1.includes(parent)) return parent;
+                    parent = parent.parentElement;
+                }
+                return null;
+            }
+
+            function elementsOverlap(el1, el2) {
+                const rect1 = el1.getBoundingClientRect();
+                const rect2 = el2.getBoundingClientRect();
+                const closeHorizontally = Math.abs(rect1.left - rect2.left) < 50 ||
+                                          Math.abs(rect1.right - rect2.right) < 50;
+                const closeVertically = Math.abs(rect1.top - rect2.top) < 50 ||
+                                        Math.abs(rect1.bottom - rect2.bottom) < 50;
+                const commonAncestor = findCommonAncestor(el1, el2);
+                const closeAncestor = commonAncestor &&
+                                      Array.from(commonAncestor.querySelectorAll('*')).length < 20;
+                return (closeHorizontally && closeVertically) || closeAncestor;
+            }
+
+            const groups = [];
+            const usedElements = new Set();
+            elements.forEach(el => {
+                if (usedElements.has(el)) return;
+                const group = [el];
+                usedElements.add(el);
+                elements.forEach(otherEl => {
+                    if (el === otherEl || usedElements.has(otherEl)) return;
+                    if (elementsOverlap(el, otherEl)) {
+                        group.push(otherEl);
+                        usedElements.add(otherEl);
+                    }
+                });
+                groups.push(group);
+            });
+            return groups;
+        }
+'''
+
+
+def build_page(candidates):
+    """Synthetic form: field wrappers with a label, a control and a button, two columns"""
+    fields = []
+    for i in range(candidates // 2):
+        control = (f'<select id="f{i}"><option>A</option><option>B</option></select>'
+                   if i % 3 == 0 else f'<input id="f{i}" type="text">')
+        fields.append(f'<div class="field" style="width: 45%; display: inline-block; margin: 8px">'
+                      f'<label for="f{i}">Question {i}</label>{control}'
+                      f'<button type="button">Clear</button></div>')
+    return f"<html><body><form>{''.join(fields)}</form></body></html>"
+
+
+def measure(page, prelude, group_call, runs):
+    """Average grouping time (ms) and group count over runs"""
+    script = '''() => {''' + prelude + '''
+        const elements = Array.from(document.querySelectorAll('input, select, button'));
+        const start = performance.now();
+        const groups = ''' + group_call + '''(elements);
+        return { ms: performance.now() - start, groups: groups.length };
+    }'''
+    results = [page.evaluate(script) for _ in range(runs)]
+    return sum(r['ms'] for r in results) / runs, results[0]['groups']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--legacy-max', type=int, default=1000)
+    args = parser.parse_args()
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+
+        print(f"{'candidates':>10} {'groups':>7} {'grid ms':>9} {'all-pairs ms':>13} {'speedup':>8}")
+        for candidates in args.candidates:
+            page.set_content(build_page(candidates))
+            install_helpers(page)
+            grid_ms, groups = measure(page, '', 'window.__adf.groupElements', args.runs)
+            if candidates <= args.legacy_max:
+                legacy_ms, legacy_groups = measure(
+                    page, LEGACY_GROUP_ELEMENTS_JS, 'groupElements', args.runs)
+                if legacy_groups != groups:
+                    print(f"  warning: {legacy_groups} all-pairs groups vs {groups} grid groups")
+                print(f"{candidates:>10} {groups:>7} {grid_ms:>9.1f} {legacy_ms:>13.1f} "
+                      f"{legacy_ms / max(grid_ms, 0.01):>7.1f}x")
+            else:
+                print(f"{candidates:>10} {groups:>7} {grid_ms:>9.1f} {'skipped':>13} {'':>8}")
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure the per-call overhead saved by the installed __adf helper bundle.
+
+Compares calling __adf.scan() / __adf.verify(fields) on a page where the
+bundle is installed with shipping the full bundle source on every evaluate
+(what each page.evaluate did before), on a synthetic form of N fields.
+
+    python benchmarks/bench_page_helpers.py [--fields 20 100] [--runs 20]
+"""
+from playwright.sync_api import sync_playwright
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scripts.page_helpers import HELPERS_JS, HELPERS_VERSION, install_helpers  # noqa: E402
+
+
+def build_page(fields):
+    """Synthetic form with alternating native selects and React-Select style comboboxes"""
+    html = []
+    for i in range(fields):
+        if i % 2 == 0:
+            control = f'<select id="f{i}"><option value="">Select...</option><option value="a">A</option></select>'
+        else:
+            control = (f'<div class="select__control"><div class="select__single-value">Option {i}</div>'
+                       f'<input id="f{i}" role="combobox"></div>')
+        html.append(f'<div class="field"><label for="f{i}">Question {i}</label>{control}'
+                    f'<button type="button">Clear</button></div>')
+    return f"<html><body><form>{''.join(html)}</form></body></html>"
+
+
+def time_calls(page, script, arg, runs):
+    """Average wall time (ms) of page.evaluate(script, arg)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        page.evaluate(script, arg)
+        timings.append(time.perf_counter() - start)
+    return 1000 * sum(timings) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fields', type=int, nargs='+', default=[20, 100])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    # The whole bundle is re-sent, parsed and compiled on each call, as when
+    # every evaluate carried its own copy of the helpers
+    inline = '''([name, args]) => {
+        delete window.__adf;
+        ''' + HELPERS_JS + ''';
+        return window.__adf[name](...args);
+    }'''
+    installed = '''([name, args]) => window.__adf[name](...args)'''
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+
+        print(f"bundle v{HELPERS_VERSION}: {len(HELPERS_JS) / 1024:.1f} KB source, "
+              f"{len(installed)} bytes per installed call\n")
+        print(f"{'fields':>7} {'call':>7} {'inline ms':>10} {'installed ms':>13} {'saved ms':>9}")
+        for fields in args.fields:
+            page.set_content(build_page(fields))
+            field_infos = [{'id': f'f{i}', 'xpath': '', 'label': ''} for i in range(fields)]
+            calls = [('scan', []), ('verify', [field_infos])]
+
+            for name, call_args in calls:
+                inline_ms = time_calls(page, inline, [name, call_args], args.runs)
+                install_helpers(page)
+                installed_ms = time_calls(page, installed, [name, call_args], args.runs)
+                print(f"{fields:>7} {name:>7} {inline_ms:>10.2f} {installed_ms:>13.2f} "
+                      f"{inline_ms - installed_ms:>9.2f}")
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
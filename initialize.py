@@ -1,8 +1,12 @@
 from playwright.sync_api import sync_playwright
-import time
+from utils.scripts.wait_utils import wait_for_pages_ready
+from utils.scripts.page_helpers import install_helpers
 import subprocess
 import os
 
+# Chrome's remote debugging endpoint; batch workers open their own connection to it
+CDP_URL = "http://localhost:9222"
+
 
 def initialize_browser():
     chrome_process = subprocess.Popen([
@@ -22,12 +26,13 @@ def initialize_browser():
     ]
 
     playwright = sync_playwright().start()
-    browser = playwright.chromium.connect_over_cdp("http://localhost:9222")
+    browser = playwright.chromium.connect_over_cdp(CDP_URL)
     context = browser.contexts[0]
 
     pages = []
     for url in test_urls:
         page = context.new_page()
+        install_helpers(page)
         page.goto(url)
         pages.append(page)
         print(f"Opened: {url}")
@@ -35,7 +40,7 @@ def initialize_browser():
     print("\nAll test pages opened. Available pages:")
     for i, page in enumerate(pages):
         print(f"{i}: {page.url}")
-    time.sleep(3)
+    wait_for_pages_ready(pages, timeout=3.0)
     return chrome_process, playwright, browser, pages
 
 
@@ -0,0 +1,152 @@
+"""
+Fill job applications unattended in headless Chromium.
+
+Reads URLs (one per line, '#' comments allowed) from a file or stdin, fills
+every field on each page and writes one JSON result record per URL. Fields
+GPT can't decide are written to a review queue instead of prompting.
+
+    python run_batch.py urls.txt --parallel 3
+    cat urls.txt | python run_batch.py --output results.jsonl
+"""
+from playwright.sync_api import sync_playwright
+from run_dropdown_fill import process_all_fields, collect_run_stats, print_run_summary
+from utils.scripts.analyze_form_fields import analyze_form_fields
+from utils.scripts.wait_utils import wait_for_page_ready
+from utils.scripts.page_helpers import install_helpers
+from utils.review.review_queue import enable_review_queue, start_review_job, finish_review_job
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+
+
+def read_urls(source):
+    """Read URLs from a file path, or stdin if source is '-'"""
+    stream = sys.stdin if source == '-' else open(source)
+    try:
+        return [line.strip() for line in stream
+                if line.strip() and not line.strip().startswith('#')]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def process_url(browser, url, page_timeout):
+    """Fill one application in a fresh browser context and return its result record"""
+    result = {
+        'url': url,
+        'status': 'failed',
+        'fields_total': 0,
+        'fields_filled': 0,
+        'needs_review': [],
+        'seconds': 0.0
+    }
+    started = time.perf_counter()
+    start_review_job(url)
+    context = browser.new_context()
+
+    try:
+        page = context.new_page()
+        install_helpers(page)
+        page.goto(url, timeout=page_timeout * 1000)
+        wait_for_page_ready(page)
+
+        fields = process_all_fields(page, analyze_form_fields(page, verify=False))
+        result['fields_total'] = len(fields)
+        result['fields_filled'] = sum(1 for field in fields
+                                      if field['fillState'] in ('filled', 'skipped'))
+        result['status'] = 'done'
+    except Exception as e:
+        result['error'] = str(e)
+        print(f"Error processing {url}: {e}")
+    finally:
+        context.close()
+
+    result['needs_review'] = [item['label'] for item in finish_review_job()]
+    if result['status'] == 'done' and result['needs_review']:
+        result['status'] = 'needs_review'
+    result['seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def run_worker(url_queue, write_result, headless, page_timeout):
+    """Launch one browser and process URLs from the queue until it is empty"""
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=headless)
+        try:
+            while True:
+                try:
+                    url = url_queue.get_nowait()
+                except queue.Empty:
+                    break
+                write_result(process_url(browser, url, page_timeout))
+        finally:
+            browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('urls', nargs='?', default='-',
+                        help="File with one URL per line ('-' or omitted for stdin)")
+    parser.add_argument('--output', default='batch_results.jsonl',
+                        help="JSONL file for per-URL results ('-' for stdout)")
+    parser.add_argument('--review-queue', default='review_queue.jsonl',
+                        help="JSONL file for fields that need a human")
+    parser.add_argument('--parallel', type=int, default=1,
+                        help="Number of browsers filling forms at once")
+    parser.add_argument('--page-timeout', type=float, default=30,
+                        help="Seconds to wait for each page to load")
+    parser.add_argument('--headed', action='store_true',
+                        help="Show the browser windows")
+    args = parser.parse_args()
+
+    urls = read_urls(args.urls)
+    if not urls:
+        print("No URLs to process")
+        return
+
+    enable_review_queue(args.review_queue)
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'a')
+    output_lock = threading.Lock()
+    results = []
+
+    def write_result(result):
+        with output_lock:
+            results.append(result)
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            print(f"\n[{len(results)}/{len(urls)}] {result['status']}: {result['url']}")
+
+    run_stats = collect_run_stats()
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=run_worker,
+                         args=(url_queue, write_result, not args.headed, args.page_timeout))
+        for _ in range(max(1, min(args.parallel, len(urls))))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    if output is not sys.stdout:
+        output.close()
+
+    done = sum(1 for result in results if result['status'] == 'done')
+    review = sum(1 for result in results if result['status'] == 'needs_review')
+    failed = len(results) - done - review
+    print(f"\nProcessed {len(results)} URL(s) in {elapsed:.1f}s "
+          f"({3600 * len(results) / elapsed:.1f} forms/hour): "
+          f"{done} done, {review} need review, {failed} failed")
+    print_run_summary(run_stats)
+
+
+if __name__ == "__main__":
+    main()
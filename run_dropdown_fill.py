@@ -1,11 +1,28 @@
-from initialize import initialize_browser
-import time
-from utils.scripts.verify_field_content import verify_field_content
-from utils.scripts.analyze_form_fields import analyze_form_fields
-from utils.scripts.visualize_element_changes import visualize_element_changes
-from utils.gpt.field_state_validator import validate_field_state
+from initialize import initialize_browser, CDP_URL
+from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor
+from utils.scripts.verify_field_content import verify_fields_content, record_escalations, get_classifier_stats
+from utils.scripts.analyze_form_fields import analyze_form_fields, analyze_revealed_fields
+from utils.scripts.visualize_element_changes import visualize_element_changes, get_native_select_stats
+from utils.scripts.harvest_field_options import harvest_field_options
+from utils.scripts.field_watcher import watch_fields, take_field_changes
+from utils.scripts.field_screenshot import capture_field_image, capture_field_images, get_screenshot_stats
+from utils.gpt.form_planner import plan_form_answers, field_key, get_planner_stats
+from utils.gpt.field_state_validator import validate_field_states, get_vision_stats
+from utils.gpt.response_parser import get_parser_stats
+from utils.cache.cache_store import get_store_stats
+from utils.cache.vision_hash_cache import get_hash_cache_stats
+from utils.gpt.client import get_client_stats
+from utils.matching.option_index import get_shortlist_stats
+from utils.gpt.option_selector import get_tournament_stats
+from utils.reference.gazetteer import get_reference_stats
+from utils.matching.local_matcher import get_matcher_stats
+from utils.scripts.wait_utils import wait_for_dom_quiet, get_wait_stats
 import os
-import tempfile
+import time
+
+# Max tabs filled at the same time in 'pages' mode
+MAX_PARALLEL_PAGES = int(os.getenv('MAX_PARALLEL_PAGES', '3'))
 
 
 def compare_states(before, after):
@@ -44,39 +61,274 @@ def compare_aria(before, after):
             print(change)
 
 
-def process_all_fields(page, clickable_elements):
+def plan_empty_fields(page, clickable_elements):
+    """Harvest known options and plan answers for all empty fields in one batch"""
+    empty_fields = [element for element in clickable_elements
+                    if not element.get('hasContent')]
+    if not empty_fields:
+        return {}
+
+    options_by_field = harvest_field_options(page, empty_fields)
+    return plan_form_answers(empty_fields, options_by_field)
+
+
+def collect_run_stats():
+    """
+    Snapshot the counters every component keeps for this process, one
+    section per line of the run summary.
+    """
+    stats = {
+        'Form plan': get_planner_stats(),
+        'Local matcher': get_matcher_stats(),
+        'Reference data': get_reference_stats(),
+        'Option shortlist': get_shortlist_stats(),
+        'Tournaments': get_tournament_stats(),
+        'Native selects': get_native_select_stats(),
+        'Option parsing': get_parser_stats(),
+        'LLM requests': get_client_stats(),
+        'Vision checks': get_vision_stats(),
+        'Screenshots': get_screenshot_stats(),
+        'Vision hash cache': get_hash_cache_stats()
+    }
+    for namespace, counts in get_store_stats().items():
+        stats[f"Cache {namespace}"] = counts
+    for site, counts in get_classifier_stats().items():
+        stats[f"DOM state {site}"] = counts
+    for name, counts in get_wait_stats().items():
+        stats[f"Wait {name}"] = counts
+    return stats
+
+
+def print_run_summary(before):
+    """
+    Print what each component did since the collect_run_stats snapshot
+    `before`, one line per component that did anything. Counters are shared
+    by all pages of the run, so this is printed once per run rather than
+    per form. Rates are left out since they don't subtract.
+    """
+    print("\nRun summary:")
+    for section, counts in collect_run_stats().items():
+        previous = before.get(section, {})
+        parts = []
+        for key, value in counts.items():
+            if key.endswith('rate') or key in ('reduction', 'total'):
+                continue
+            delta = value - previous.get(key, 0)
+            if delta:
+                amount = f"{delta:.2f}" if isinstance(delta, float) else str(delta)
+                parts.append(f"{amount} {key.replace('_', ' ')}")
+        if parts:
+            print(f"  {section}: {', '.join(parts)}")
+
+
+def process_all_fields(page, clickable_elements, on_progress=None):
+    """
+    Fill every empty field, tracking each one on a worklist.
+
+    Fields are verified once up front and then kept as pending, filled,
+    failed (tried but still empty) or skipped (already had content). After a
+    fill only the fields whose DOM subtree changed are re-verified. When new
+    form controls appear (conditional questions) or a tracked field is
+    re-rendered, only the added subtrees are scanned, and the fields found
+    there are merged into the worklist in page order.
+
+    Returns:
+        list: The tracked fields, each with its final 'fillState'
+    """
     print("\nProcessing all fields...")
+    fields_processed = 0
+    work_stats = {'verifications': 0, 'verify_calls': 0, 'scans': 0}
+
+    def verify(elements):
+        # One bulk DOM check for all the fields
+        if not elements:
+            return []
+        work_stats['verifications'] += len(elements)
+        work_stats['verify_calls'] += 1
+        return verify_fields(page, elements)
+
+    def add_entries(worklist, elements):
+        # Fields analyze_form_fields already verified keep their result,
+        # unless the DOM couldn't tell and the vision check is still owed
+        unverified = [element for element in elements
+                      if 'hasContent' not in element or element.get('fieldState') == 'unknown']
+        for element, has_content in zip(unverified, verify(unverified)):
+            element['hasContent'] = has_content
+            element['fieldState'] = 'filled' if has_content else 'empty'
+        for element in elements:
+            worklist[field_key(element)] = {
+                'field': element,
+                'state': 'skipped' if element['hasContent'] else 'pending'
+            }
+
+    # field_key -> {'field', 'state'}, in page order
+    worklist = {}
+    unique_fields = {}
+    for element in clickable_elements:
+        unique_fields.setdefault(field_key(element), element)
+    add_entries(worklist, list(unique_fields.values()))
+
+    # Answer every field up front so the loop below only applies answers
+    planned_answers = plan_empty_fields(
+        page, [entry['field'] for entry in worklist.values() if entry['state'] == 'pending'])
+    watch_fields(page, [entry['field'] for entry in worklist.values()])
 
     while True:
-        empty_field_index = None
-        for index, element in enumerate(clickable_elements):
-            print(f"\nChecking field {index}: {element['label']}")
-
-            if verify_field_content(page, element):
-                print("Field already has content, skipping...")
-                continue
-            else:
-                empty_field_index = index
-                break
-
-        if empty_field_index is None:
+        key = next((key for key, entry in worklist.items()
+                    if entry['state'] == 'pending'), None)
+        if key is None:
             print("\nNo more empty fields to process!")
             break
 
-        print(
-            f"\nProcessing empty field {empty_field_index}: {clickable_elements[empty_field_index]['label']}")
+        element = worklist[key]['field']
+        print(f"\nProcessing empty field: {element['label']}")
+        element['plannedAnswer'] = planned_answers.get(key)
+        worklist[key]['attempted'] = True
+        fields_processed += 1
+        if on_progress:
+            on_progress(element['label'], fields_processed)
+
+        # The worklist decides what to re-check, so skip the full re-analysis
+        visualize_element_changes(page, element, lambda _: None)
+
+        wait_for_dom_quiet(page, quiet_ms=100, timeout=0.5,
+                           name='between_fields', fixed_sleep=0.5)
+
+        changes = take_field_changes(page)
+        tracked = list(worklist)
+        recheck = {key} | {tracked[i] for i in changes['dirty'] + changes['detached']}
+
+        if changes['revealed'] or changes['detached']:
+            print("\nForm structure changed, scanning the added controls...")
+            work_stats['scans'] += 1
+            removed = {tracked[i] for i in changes['detached']}
+            # tracked index -> new fields that follow it on the page
+            revealed_after = {}
+            for field in analyze_revealed_fields(page):
+                after = field.pop('after')
+                field_id = field_key(field)
+                if field_id in worklist:
+                    # Re-rendered field: keep its state, track the new node
+                    worklist[field_id]['field'] = field
+                    removed.discard(field_id)
+                else:
+                    revealed_after.setdefault(after, {}).setdefault(field_id, field)
+
+            previous = worklist
+            worklist = {}
+            new_fields = []
+
+            def insert_revealed(after):
+                for field_id, field in revealed_after.get(after, {}).items():
+                    if field_id in worklist:
+                        continue
+                    print(f"New field revealed: {field['label']}")
+                    # Placeholder keeps page order; verified in one batch below
+                    worklist[field_id] = None
+                    new_fields.append(field)
+                    recheck.discard(field_id)
+
+            insert_revealed(-1)
+            for index, field_id in enumerate(tracked):
+                if field_id in removed:
+                    print(f"Field removed: {previous[field_id]['field']['label']}")
+                else:
+                    worklist[field_id] = previous[field_id]
+                insert_revealed(index)
+            add_entries(worklist, new_fields)
+
+            revealed = [field for field in new_fields
+                        if worklist[field_key(field)]['state'] == 'pending']
+            if revealed:
+                planned_answers.update(plan_empty_fields(page, revealed))
+            watch_fields(page, [entry['field'] for entry in worklist.values()])
+
+        recheck_ids = [field_id for field_id in recheck
+                       if field_id in worklist and
+                       (worklist[field_id]['state'] != 'failed' or field_id == key)]
+        verified = verify([worklist[field_id]['field'] for field_id in recheck_ids])
+        for field_id, has_content in zip(recheck_ids, verified):
+            entry = worklist[field_id]
+            if has_content:
+                entry['state'] = 'filled'
+            elif field_id == key:
+                # Tried once and still empty (e.g. queued for review); not retried
+                entry['state'] = 'failed'
+            elif entry['state'] != 'pending':
+                # Cleared by another fill; only retry fields not tried yet so
+                # two fields resetting each other can't loop forever
+                entry['state'] = 'failed' if entry.get('attempted') else 'pending'
+
+        print(f"Field '{element['label']}': {worklist[key]['state'] if key in worklist else 'removed'}")
+
+    states = [entry['state'] for entry in worklist.values()]
+    print(
+        f"\nWorklist: {states.count('filled')} filled, {states.count('failed')} failed, {states.count('skipped')} skipped for {len(states)} fields; {work_stats['verifications']} field verifications in {work_stats['verify_calls']} calls, {work_stats['scans']} partial scans")
+
+    for entry in worklist.values():
+        entry['field']['fillState'] = entry['state']
+    return [entry['field'] for entry in worklist.values()]
+
+
+def process_page(url, occurrence, page_number, total_pages):
+    """
+    Fill every field of one already-open tab.
+
+    Playwright's sync objects can't be shared between threads, so each
+    worker opens its own CDP connection and finds its tab by URL.
+    """
+    prefix = f"[Page {page_number}/{total_pages}]"
+    result = {'url': url, 'status': 'failed', 'fields_processed': 0}
+    started = time.perf_counter()
+
+    def report(label, count):
+        result['fields_processed'] = count
+        print(f"{prefix} Field {count}: {label}")
+
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.connect_over_cdp(CDP_URL)
+            matches = [p for context in browser.contexts
+                       for p in context.pages if p.url == url]
+            if len(matches) <= occurrence:
+                raise ValueError(f"Tab not found: {url}")
+            page = matches[occurrence]
+
+            print(f"{prefix} Started: {url}")
+            process_all_fields(page, analyze_form_fields(page, verify=False),
+                               on_progress=report)
+            result['status'] = 'done'
+    except Exception as e:
+        result['error'] = str(e)
+        print(f"{prefix} Error: {e}")
 
-        new_elements = visualize_element_changes(
-            page, clickable_elements[empty_field_index], analyze_form_fields)
+    result['seconds'] = time.perf_counter() - started
+    print(
+        f"{prefix} {result['status']} after {result['fields_processed']} field(s) in {result['seconds']:.1f}s")
+    return result
 
-        if new_elements:
-            clickable_elements = new_elements
-        else:
-            clickable_elements = analyze_form_fields(page)
 
-        time.sleep(0.5)
+def process_pages_concurrently(pages, max_parallel=MAX_PARALLEL_PAGES):
+    """
+    Fill all open tabs at once, at most max_parallel at a time, so LLM
+    waits on one tab overlap with DOM work on the others.
 
-    return clickable_elements
+    Returns:
+        list: One result dict (url, status, fields_processed, seconds) per tab
+    """
+    urls = [page.url for page in pages]
+    jobs = [(url, urls[:i].count(url), i + 1, len(urls))
+            for i, url in enumerate(urls)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        results = list(executor.map(lambda job: process_page(*job), jobs))
+
+    print(f"\nProcessed {len(results)} page(s) in {time.perf_counter() - started:.1f}s:")
+    for i, result in enumerate(results, 1):
+        print(
+            f"  {i}. {result['status']:<6} {result['fields_processed']:>3} field(s) {result['seconds']:>6.1f}s  {result['url']}")
+    return results
 
 
 def process_single_element(page, element_index, clickable_elements):
@@ -98,232 +350,74 @@ def process_single_element(page, element_index, clickable_elements):
         return clickable_elements
 
 
-def verify_field_content(page, element):
-    """Check if a field has actual selected content (not placeholder text)"""
+def validate_with_screenshots(page, elements):
+    """
+    Image-based validation of several fields with one screenshot and one
+    batched vision request
+    """
     try:
-        print("\n=== Checking Field Content ===")
-        print(f"Field ID: {element['attributes']['id']}")
-        print(f"Field Label: {element['label']}")
-        print(f"Field Type: {element['type']}")
-        print(f"Field Role: {element['attributes'].get('role')}")
-        print(f"Field XPath: {element['xpath']}")
-        print(f"Field Classes: {element['attributes'].get('class')}")
-        print(f"Field Attributes:", element['attributes'])
-
-        # Try built-in verification first
-        field_state = page.evaluate(f'''() => {{
-            function getFieldByMultipleMethods() {{
-                let el;
-                
-                // Try by ID
-                const id = "{element['attributes']['id']}";
-                if (id) {{
-                    el = document.getElementById(id);
-                    if (el) return {{ method: 'id', element: el }};
-                }}
-                
-                // Try by XPath
-                const xpath = "{element['xpath']}";
-                if (xpath) {{
-                    el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                    if (el) return {{ method: 'xpath', element: el }};
-                }}
-                
-                // Try by role and label
-                const label = "{element['label']}";
-                if (label) {{
-                    el = Array.from(document.querySelectorAll('[role="combobox"], [role="listbox"], select, input'))
-                        .find(e => e.getAttribute('aria-label') === label || 
-                                 document.querySelector(`label[for="${{e.id}}"]`)?.textContent.includes(label));
-                    if (el) return {{ method: 'role_label', element: el }};
-                }}
-                
-                return null;
-            }}
-
-            const result = getFieldByMultipleMethods();
-            if (!result) return {{ error: 'Could not find field' }};
-            
-            const el = result.element;
-            const style = window.getComputedStyle(el);
-            
-            // Get parent element info
-            const parent = el.parentElement;
-            const parentInfo = parent ? {{
-                tag: parent.tagName,
-                class: parent.className,
-                role: parent.getAttribute('role'),
-                id: parent.id
-            }} : null;
-            
-            // Get all possible selected values
-            const selectedValue = el.querySelector('.select__single-value, .selected-value, [class*="selected"], [class*="value"]');
-            const selectedOption = el.querySelector('[aria-selected="true"]');
-            const selectedText = selectedValue ? selectedValue.textContent : null;
-            
-            return {{
-                foundBy: result.method,
-                value: el.value || '',
-                textContent: el.textContent || '',
-                innerText: el.innerText || '',
-                selectedText: selectedText || '',
-                ariaValue: el.getAttribute('aria-valuenow') || el.getAttribute('aria-valuetext') || '',
-                selectedAriaText: selectedOption ? selectedOption.textContent : '',
-                placeholder: el.getAttribute('placeholder') || '',
-                isDisabled: el.disabled || el.getAttribute('aria-disabled') === 'true',
-                isReadOnly: el.readOnly || el.getAttribute('aria-readonly') === 'true',
-                hasPlaceholderClass: el.classList.contains('placeholder'),
-                isEmptyClass: el.classList.contains('empty'),
-                visibility: style.visibility,
-                display: style.display,
-                computedHeight: style.height,
-                ariaExpanded: el.getAttribute('aria-expanded'),
-                ariaHasPopup: el.getAttribute('aria-haspopup'),
-                ariaControls: el.getAttribute('aria-controls'),
-                ariaOwns: el.getAttribute('aria-owns'),
-                ariaDescribedby: el.getAttribute('aria-describedby'),
-                classList: Array.from(el.classList).join(' '),
-                tagName: el.tagName,
-                parent: parentInfo,
-                childElements: Array.from(el.children).map(child => ({{
-                    tag: child.tagName,
-                    text: child.textContent,
-                    class: child.className,
-                    role: child.getAttribute('role'),
-                    ariaSelected: child.getAttribute('aria-selected')
-                }}))
-            }};
-        }}''')
-
-        if field_state:
-            print("\nField State Details:")
-            if 'error' in field_state:
-                print(f"Error: {field_state['error']}")
-                # If built-in verification fails, try image-based validation
-                print("\nFalling back to image-based validation...")
-
-                # Create a temporary file for the screenshot
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    screenshot_path = tmp_file.name
-                    # Take screenshot of the current page state
-                    page.screenshot(path=screenshot_path)
-
-                    try:
-                        # Use GPT-4 Vision to validate field state
-                        is_filled = validate_field_state(
-                            screenshot_path, element)
-                        print(
-                            f"Image-based validation result: {'Filled' if is_filled else 'Empty'}")
-
-                        # Clean up the temporary file
-                        os.unlink(screenshot_path)
-                        return is_filled
-                    except Exception as e:
-                        print(f"Error in image-based validation: {e}")
-                        os.unlink(screenshot_path)
-                        return False
-
-            print(f"Found by method: {field_state.get('foundBy', 'unknown')}")
-            print(f"Tag name: {field_state.get('tagName', 'unknown')}")
-            print(f"Parent: {field_state.get('parent', {})}")
-            print("\nField Values:")
-            for key, value in field_state.items():
-                if key not in ['childElements', 'parent']:
-                    print(f"  {key}: '{value}'")
-
-            print("\nChild Elements:")
-            for child in field_state.get('childElements', []):
-                print(
-                    f"  {child['tag']}: '{child['text']}' (Role: {child['role']}, Selected: {child['ariaSelected']})")
-
-            # Check for actual selected value
-            value_fields = ['selectedText',
-                            'selectedAriaText', 'value', 'ariaValue']
-            for field in value_fields:
-                value = field_state.get(field, '').strip()
-                if value:
-                    print(f"\nFound potential value in {field}: '{value}'")
-                    # Check if it's not a placeholder
-                    if not any(text in value.lower() for text in [
-                        "select...", "all selected options have been cleared",
-                        "choose an option", "no selection", "select an option"
-                    ]):
-                        print(f"Valid value found: '{value}'")
-                        return True
-
-            print("\nNo valid selected value found")
-            # If built-in verification indicates empty, try image-based validation
-            print("\nFalling back to image-based validation...")
-
-            # Create a temporary file for the screenshot
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                screenshot_path = tmp_file.name
-                # Take screenshot of the current page state
-                page.screenshot(path=screenshot_path)
-
-                try:
-                    # Use GPT-4 Vision to validate field state
-                    is_filled = validate_field_state(screenshot_path, element)
-                    print(
-                        f"Image-based validation result: {'Filled' if is_filled else 'Empty'}")
-
-                    # Clean up the temporary file
-                    os.unlink(screenshot_path)
-                    return is_filled
-                except Exception as e:
-                    print(f"Error in image-based validation: {e}")
-                    os.unlink(screenshot_path)
-                    return False
-        else:
-            print("Could not access field state")
-            # If built-in verification fails completely, try image-based validation
-            print("\nFalling back to image-based validation...")
-
-            # Create a temporary file for the screenshot
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                screenshot_path = tmp_file.name
-                # Take screenshot of the current page state
-                page.screenshot(path=screenshot_path)
-
-                try:
-                    # Use GPT-4 Vision to validate field state
-                    is_filled = validate_field_state(screenshot_path, element)
-                    print(
-                        f"Image-based validation result: {'Filled' if is_filled else 'Empty'}")
-
-                    # Clean up the temporary file
-                    os.unlink(screenshot_path)
-                    return is_filled
-                except Exception as e:
-                    print(f"Error in image-based validation: {e}")
-                    os.unlink(screenshot_path)
-                    return False
-
+        captures = capture_field_images(page, elements)
+        # Fields missing from the page screenshot get a viewport capture
+        captures = [capture or capture_field_image(page, element)
+                    for capture, element in zip(captures, elements)]
+        results = validate_field_states(captures, elements)
+        for element, is_filled in zip(elements, results):
+            print(
+                f"Image-based validation result for '{element['label']}': {'Filled' if is_filled else 'Empty'}")
+        return results
     except Exception as e:
-        print(f"Error in verify_field_content: {e}")
-        print(f"Error type: {type(e).__name__}")
-        # If any error occurs, try image-based validation as a last resort
-        print("\nFalling back to image-based validation...")
-
-        # Create a temporary file for the screenshot
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-            screenshot_path = tmp_file.name
-            # Take screenshot of the current page state
-            page.screenshot(path=screenshot_path)
+        print(f"Error in image-based validation: {e}")
+        return [False] * len(elements)
+
+
+def verify_fields(page, elements):
+    """
+    Check which fields have actual selected content (not placeholder text).
+
+    The DOM state of all fields is read in one evaluate and classified
+    locally; only fields the classifier can't decide (or can't find) are
+    checked together by image-based validation.
+
+    Returns:
+        list: True/False per field
+    """
+    results = []
+    fallback = []
+    for i, (element, result) in enumerate(zip(elements, verify_fields_content(page, elements))):
+        if result['hasContent'] and result['evidence']:
+            source, value = result['evidence']
+            print(
+                f"\nField '{element['label']}': valid value found in {source}: '{value}'")
+            results.append(True)
+        elif result['hasContent']:
+            print(
+                f"\nField '{element['label']}': filled ({result['confidence']:.0%} confident)")
+            results.append(True)
+        elif result['fieldState'] == 'empty':
+            print(
+                f"\nField '{element['label']}': empty ({result['confidence']:.0%} confident)")
+            results.append(False)
+        else:
+            reason = (result['state'].get('error') or
+                      ('Conflicting DOM signals' if result['evidence'] else 'No valid selected value found'))
+            print(f"\nField '{element['label']}': {reason}")
+            results.append(False)
+            # Keys the vision hash cache, so a fill never reuses an old verdict
+            element['domState'] = result['state']
+            fallback.append(i)
+
+    if fallback:
+        print(f"Falling back to image-based validation for {len(fallback)} field(s)...")
+        record_escalations(page, len(fallback))
+        verdicts = validate_with_screenshots(page, [elements[i] for i in fallback])
+        for i, is_filled in zip(fallback, verdicts):
+            results[i] = is_filled
+    return results
 
-            try:
-                # Use GPT-4 Vision to validate field state
-                is_filled = validate_field_state(screenshot_path, element)
-                print(
-                    f"Image-based validation result: {'Filled' if is_filled else 'Empty'}")
 
-                # Clean up the temporary file
-                os.unlink(screenshot_path)
-                return is_filled
-            except Exception as e:
-                print(f"Error in image-based validation: {e}")
-                os.unlink(screenshot_path)
-                return False
+def verify_field_content(page, element):
+    """Check if a field has actual selected content (not placeholder text)"""
+    return verify_fields(page, [element])[0]
 
 
 def main():
@@ -334,7 +428,7 @@ def main():
         while True:
             try:
                 choice = input(
-                    "\nEnter element number to visualize, 'all' to process all fields, 'r' to refresh list, or 'q' to quit: ")
+                    "\nEnter element number to visualize, 'all' to process all fields, 'pages' to process all open pages, 'r' to refresh list, or 'q' to quit: ")
 
                 if choice.lower() == 'q':
                     break
@@ -343,17 +437,26 @@ def main():
                     clickable_elements = analyze_form_fields(pages[0])
                 elif choice.lower() == 'all':
                     print("\nProcessing all fields in sequence...")
+                    run_stats = collect_run_stats()
                     clickable_elements = process_all_fields(
                         pages[0], clickable_elements)
+                    print_run_summary(run_stats)
+                elif choice.lower() == 'pages':
+                    print(
+                        f"\nProcessing {len(pages)} pages, {MAX_PARALLEL_PAGES} at a time...")
+                    run_stats = collect_run_stats()
+                    process_pages_concurrently(pages)
+                    print_run_summary(run_stats)
+                    clickable_elements = analyze_form_fields(pages[0])
                 else:
                     element_index = int(choice)
                     clickable_elements = process_single_element(
                         pages[0], element_index, clickable_elements)
 
             except ValueError:
-                if choice.lower() not in ['q', 'r', 'all']:
+                if choice.lower() not in ['q', 'r', 'all', 'pages']:
                     print(
-                        "Please enter a valid number, 'all' to process all fields, 'r' to refresh, or 'q' to quit")
+                        "Please enter a valid number, 'all' to process all fields, 'pages' to process all open pages, 'r' to refresh, or 'q' to quit")
 
         input("\nPress Enter to exit...")
     except Exception as e:
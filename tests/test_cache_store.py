@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from utils.cache import cache_store
+from utils.cache.cache_store import cache_get, cache_put, get_or_compute, make_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_store, 'CACHE_STORE_PATH', str(tmp_path / 'store.sqlite'))
+    clock = Clock()
+    monkeypatch.setattr(cache_store.time, 'time', clock)
+    return clock
+
+
+def test_computes_once(clock):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'index': 2}
+
+    key = make_key('Country', ['Canada', 'United States'])
+
+    assert get_or_compute('option_decisions', key, compute) == {'index': 2}
+    assert get_or_compute('option_decisions', key, compute) == {'index': 2}
+    assert len(calls) == 1
+
+
+def test_none_is_not_stored(clock):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert get_or_compute('search_terms', 'key', compute) is None
+    assert get_or_compute('search_terms', 'key', compute) is None
+    assert len(calls) == 2
+
+
+def test_concurrent_workers_share_one_computation(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_store, 'CACHE_STORE_PATH', str(tmp_path / 'store.sqlite'))
+    monkeypatch.setattr(cache_store, 'LEASE_POLL_INTERVAL', 0.01)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'Yes'
+
+    def worker():
+        results.append(get_or_compute('text_answers', 'key', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['Yes'] * 4
+    assert len(calls) == 1
+
+
+def test_evicts_least_recently_used(clock, monkeypatch):
+    monkeypatch.setitem(cache_store.NAMESPACES, 'search_terms', {'ttl': 3600, 'max_entries': 2})
+
+    cache_put('search_terms', 'a', 'first')
+    clock.now += 1
+    cache_put('search_terms', 'b', 'second')
+    clock.now += 1
+    assert cache_get('search_terms', 'a') == 'first'
+    clock.now += 1
+    cache_put('search_terms', 'c', 'third')
+
+    assert cache_get('search_terms', 'b') is None
+    assert cache_get('search_terms', 'a') == 'first'
+    assert cache_get('search_terms', 'c') == 'third'
+
+
+def test_expires_after_ttl(clock, monkeypatch):
+    monkeypatch.setitem(cache_store.NAMESPACES, 'vision_verdicts', {'ttl': 60, 'max_entries': 10})
+
+    cache_put('vision_verdicts', 'key', True)
+    clock.now += 59
+    assert cache_get('vision_verdicts', 'key') is True
+    clock.now += 2
+    assert cache_get('vision_verdicts', 'key') is None
@@ -0,0 +1,60 @@
+from utils.profile.candidate_profile import parse_profile, get_relevant_facts
+
+PROFILE = """Jane Doe - Software Engineer
+(555) 010-2000 | jane@example.com
+EXPERIENCE
+Backend Engineer, Example Corp
+June 2022 - Present
+Migrated the billing service from on-premise servers to AWS Lambda and DynamoDB, cutting infrastructure costs by a third while keeping p99 latency under 50ms
+Built the internal metrics pipeline in Go and Python, replacing nightly batch jobs with streaming aggregation for every product team in the company
+EDUCATION
+Bachelor of Science Computer Science
+Example State University
+
+Authorized to work in the United States
+Veteran Status: Not a veteran
+Languages: English (Native), Spanish (Conversational)
+"""
+
+
+def write_profile(tmp_path):
+    path = tmp_path / 'info.txt'
+    path.write_text(PROFILE)
+    return str(path)
+
+
+def test_parse_profile_splits_headlines_and_bullets():
+    profile = parse_profile(PROFILE)
+
+    assert profile['facts']['Veteran Status'] == 'Not a veteran'
+    assert 'Backend Engineer, Example Corp' in profile['groups']['experience']
+    assert all(len(line) <= 100 for line in profile['groups']['experience'])
+    assert any('AWS Lambda' in line for line in profile['groups']['skills'])
+    assert 'Not a veteran' in '\n'.join(profile['groups']['eeo'])
+
+
+def test_topic_question_gets_only_its_group(tmp_path):
+    facts = get_relevant_facts('Veteran Status', write_profile(tmp_path))
+
+    assert 'Veteran Status: Not a veteran' in facts
+    assert 'AWS' not in facts
+
+
+def test_skill_answered_only_by_bullet(tmp_path):
+    facts = get_relevant_facts('Do you have experience with AWS?', write_profile(tmp_path))
+
+    assert 'Backend Engineer, Example Corp' in facts
+    assert 'AWS Lambda' in facts
+
+
+def test_programming_languages_include_experience_bullets(tmp_path):
+    facts = get_relevant_facts('Which programming languages are you proficient in?',
+                               write_profile(tmp_path))
+
+    assert 'Go and Python' in facts
+
+
+def test_unmatched_label_gets_whole_profile(tmp_path):
+    path = write_profile(tmp_path)
+
+    assert get_relevant_facts('Zzyzx', path) == PROFILE
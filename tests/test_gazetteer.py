@@ -0,0 +1,60 @@
+from utils.profile.candidate_profile import parse_profile
+from utils.reference.gazetteer import (detect_reference_kind, find_reference_option, load_gazetteer,
+                                       resolve_entity, shortest_search_term)
+
+PROFILE = parse_profile("""Jane Doe
+San Jose, California
+EDUCATION
+University of California, Davis
+Bachelor of Science Computer Science
+
+Authorized to work in the United States
+""")
+
+
+def _index(kind, name):
+    entries = load_gazetteer(kind)['entries']
+    return next(i for i, entry in enumerate(entries) if entry['name'] == name)
+
+
+def test_detects_kind_from_label():
+    assert detect_reference_kind('Highest degree obtained') == 'degree'
+    assert detect_reference_kind('School') == 'university'
+    assert detect_reference_kind('State / Province') == 'us_state'
+    assert detect_reference_kind('Country of residence') == 'country'
+    assert detect_reference_kind('Veteran Status') is None
+
+
+def test_resolves_entity_in_free_text():
+    assert resolve_entity('country', 'Authorized to work in the United States') == _index('country', 'United States')
+    assert resolve_entity('us_state', 'San Jose, CA') == _index('us_state', 'California')
+    # Lowercase short forms inside a sentence aren't codes
+    assert resolve_entity('us_state', 'I can work in any ca office') is None
+
+
+def test_finds_exact_and_containing_options():
+    assert find_reference_option('Country', ['Canada', 'United States', 'Mexico'], PROFILE) == 1
+    assert find_reference_option('Country', ['Canada (+1)', 'United States (+1)'], PROFILE) == 1
+    assert find_reference_option('State', ['Arizona', 'CA', 'Nevada'], PROFILE) == 1
+
+
+def test_finds_close_spelling():
+    options = ['University of California, Berkeley', 'University of Califronia, Davis', 'Stanford University']
+
+    assert find_reference_option('School', options, PROFILE) == 1
+
+
+def test_degree_falls_back_to_parent():
+    options = ["Associate's Degree", "Bachelor's Degree", "Master's Degree"]
+
+    assert find_reference_option('Degree', options, PROFILE) == 1
+
+
+def test_unknown_field_or_missing_entity():
+    assert find_reference_option('Veteran Status', ['Yes', 'No'], PROFILE) is None
+    assert find_reference_option('Country', ['Canada', 'Mexico'], PROFILE) is None
+
+
+def test_shortest_search_term_is_unique_prefix():
+    assert shortest_search_term('university', _index('university', 'University of California, Davis')) == 'dav'
+    assert shortest_search_term('university', _index('university', 'Stanford University')) == 'stan'
@@ -0,0 +1,56 @@
+from utils.matching.local_matcher import canonical_concept, match_option, profile_answers, score_option
+from utils.profile.candidate_profile import parse_profile
+
+PROFILE = parse_profile("""Jane Doe
+EDUCATION
+Bachelor of Science Computer Science
+
+Does not require visa sponsorship
+Authorized to work in the United States
+Gender: Female
+Race/Ethnicity: Asian
+Veteran Status: Not a veteran
+Disability Status: No disabilities
+NOT HISPANIC OR LATINO
+Willing to relocate: Yes
+""")
+
+
+def test_synonyms_share_a_concept():
+    assert canonical_concept('I am not a protected veteran') == 'not_veteran'
+    assert canonical_concept('I identify as one or more of the classifications of protected veteran') == 'veteran'
+    assert canonical_concept("I don't wish to answer") == 'decline'
+    assert score_option('Not a veteran', 'I am not a protected veteran') == 0.95
+    assert score_option('Not a veteran', 'I am a protected veteran') == 0.0
+
+
+def test_answers_read_from_profile():
+    assert profile_answers('Veteran Status', PROFILE) == ['Not a veteran']
+    assert profile_answers('Will you now or in the future require visa sponsorship?', PROFILE)[0] == 'No'
+    assert profile_answers('Are you legally authorized to work in the US?', PROFILE)[0] == 'Yes'
+    assert profile_answers('Are you Hispanic/Latino?', PROFILE)[0] == 'Not Hispanic or Latino'
+
+
+def test_matches_synonym_option():
+    options = ['I am a protected veteran', 'I am not a protected veteran', "I don't wish to answer"]
+
+    assert match_option('Veteran Status', options, PROFILE)[0] == 1
+
+
+def test_only_option_containing_the_answer_wins():
+    options = ['White', 'Asian (Not Hispanic or Latino)', 'Black or African American']
+
+    assert match_option('Race', options, PROFILE)[0] == 1
+
+
+def test_conflicting_yes_no_rules_go_to_gpt():
+    label = 'Are you authorized to work without visa sponsorship?'
+
+    assert profile_answers(label, PROFILE) == []
+    assert match_option(label, ['Yes', 'No'], PROFILE) == (None, 0.0)
+
+
+def test_unknown_field_goes_to_gpt():
+    index, _ = match_option('Favorite color', ['Red', 'Blue'], PROFILE)
+
+    assert index is None
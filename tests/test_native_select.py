@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from utils.review import review_queue
+from utils.scripts import visualize_element_changes as changes
+
+OPTIONS = [
+    {'text': 'Select...', 'value': '', 'selected': True},
+    {'text': 'Option A', 'value': 'a', 'selected': False},
+    {'text': 'Option B', 'value': 'b', 'selected': False}
+]
+ELEMENT = {'label': 'Preferred office', 'type': 'select', 'nativeSelect': True,
+           'attributes': {'id': 'office'}, 'xpath': '//select[1]'}
+
+
+class FakePage:
+    url = 'https://jobs.example.com/apply'
+
+    def __init__(self):
+        self.clicks = []
+
+    def click(self, selector):
+        self.clicks.append(selector)
+
+
+@pytest.fixture
+def page(monkeypatch, tmp_path):
+    page = FakePage()
+    helpers = {'selectOptions': lambda field: OPTIONS, 'setSelectValue': lambda field, value: True}
+    monkeypatch.setattr(changes, 'call_helper', lambda page, name, *args: helpers[name](*args))
+    monkeypatch.setitem(review_queue._queue_state, 'path', str(tmp_path / 'review.jsonl'))
+    return page
+
+
+def test_unanswered_select_is_queued_without_clicking(page, monkeypatch):
+    asked = []
+    monkeypatch.setattr(changes, 'choose_option', lambda options, element: asked.append(options) or 'false')
+
+    assert changes.visualize_element_changes(page, ELEMENT, lambda page: 'analyzed') == 'analyzed'
+    assert len(asked) == 1
+    assert page.clicks == []
+    with open(review_queue._queue_state['path']) as f:
+        item = json.loads(f.readline())
+    assert item['options'] == ['Select...', 'Option A', 'Option B']
+
+
+def test_chosen_option_is_set(page, monkeypatch):
+    monkeypatch.setattr(changes, 'choose_option', lambda options, element: 2)
+
+    assert changes.fill_native_select(page, ELEMENT) is True
+    assert page.clicks == []
+
+
+def test_unreadable_select_falls_back_to_clicking(page, monkeypatch):
+    monkeypatch.setattr(changes, 'call_helper', lambda page, name, *args: [])
+
+    assert changes.fill_native_select(page, ELEMENT) is None
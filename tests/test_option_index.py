@@ -0,0 +1,38 @@
+import numpy as np
+
+from utils.matching.option_index import (SHORTLIST_MIN_OPTIONS, build_option_index, rank_options,
+                                         score_options, shortlist_options)
+
+SCHOOLS = [f"Placeholder College {i}" for i in range(60)] + [
+    'University of California, Berkeley',
+    'University of Michigan',
+    'Stanford University'
+]
+
+
+def test_identical_text_scores_one():
+    index = build_option_index(['United States', 'United Kingdom', 'Canada'])
+    scores = score_options(index, 'United States')
+
+    assert np.isclose(scores[0], 1.0)
+    assert scores[0] > scores[1] > scores[2]
+
+
+def test_best_profile_line_wins():
+    profile_text = "- Willing to relocate\n- B.S. Computer Science, UC Berkeley\n- Python, SQL"
+
+    assert rank_options('School', SCHOOLS, profile_text)[0] == SCHOOLS.index('University of California, Berkeley')
+
+
+def test_short_lists_are_sent_whole():
+    options = SCHOOLS[:SHORTLIST_MIN_OPTIONS]
+
+    assert shortlist_options('School', options, '') == list(range(len(options)))
+
+
+def test_shortlist_keeps_original_order():
+    kept = shortlist_options('School', SCHOOLS, 'University of California, Berkeley', size=5)
+
+    assert len(kept) == 5
+    assert kept == sorted(kept)
+    assert SCHOOLS.index('University of California, Berkeley') in kept
@@ -0,0 +1,86 @@
+import pytest
+
+import run_dropdown_fill
+
+NO_CHANGES = {'dirty': [], 'detached': [], 'revealed': False}
+
+
+def make_field(field_id, label):
+    return {'label': label, 'type': 'div', 'attributes': {'id': field_id, 'role': 'combobox'},
+            'xpath': f'//div[@id="{field_id}"]', 'hasContent': False, 'fieldState': 'empty'}
+
+
+class FakeForm:
+    """Stands in for the page: filling a field records it and may queue DOM changes"""
+
+    def __init__(self):
+        self.filled = []
+        self.changes_after = {}
+        self.revealed = []
+        self.pending_changes = None
+
+    def fill(self, page, element, analyze):
+        field_id = element['attributes']['id']
+        self.filled.append(field_id)
+        self.pending_changes = self.changes_after.get(field_id)
+
+    def take_changes(self, page):
+        changes, self.pending_changes = self.pending_changes or NO_CHANGES, None
+        return changes
+
+    def verify(self, page, elements):
+        return [element['attributes']['id'] in self.filled for element in elements]
+
+
+@pytest.fixture
+def form(monkeypatch):
+    form = FakeForm()
+
+    def full_scan(*args, **kwargs):
+        raise AssertionError("the whole page was re-analyzed")
+
+    monkeypatch.setattr(run_dropdown_fill, 'visualize_element_changes', form.fill)
+    monkeypatch.setattr(run_dropdown_fill, 'take_field_changes', form.take_changes)
+    monkeypatch.setattr(run_dropdown_fill, 'verify_fields', form.verify)
+    monkeypatch.setattr(run_dropdown_fill, 'analyze_revealed_fields', lambda page: form.revealed)
+    monkeypatch.setattr(run_dropdown_fill, 'analyze_form_fields', full_scan)
+    monkeypatch.setattr(run_dropdown_fill, 'wait_for_dom_quiet', lambda *args, **kwargs: True)
+    monkeypatch.setattr(run_dropdown_fill, 'watch_fields', lambda page, fields: None)
+    monkeypatch.setattr(run_dropdown_fill, 'plan_empty_fields', lambda page, fields: {})
+    return form
+
+
+def test_revealed_fields_are_merged_in_page_order(form):
+    # Answering the sponsorship question reveals a follow-up right after it
+    fields = [make_field('auth', 'Authorized'), make_field('sponsor', 'Sponsorship'),
+              make_field('gender', 'Gender')]
+    form.changes_after['sponsor'] = {'dirty': [1], 'detached': [], 'revealed': True}
+    form.revealed = [dict(make_field('visa', 'Visa type'), after=1)]
+
+    result = run_dropdown_fill.process_all_fields(None, fields)
+
+    assert form.filled == ['auth', 'sponsor', 'visa', 'gender']
+    assert [field['attributes']['id'] for field in result] == ['auth', 'sponsor', 'visa', 'gender']
+    assert all(field['fillState'] == 'filled' for field in result)
+    assert 'after' not in result[2]
+
+
+def test_rerendered_field_keeps_its_entry(form):
+    fields = [make_field('country', 'Country'), make_field('state', 'State')]
+    form.changes_after['country'] = {'dirty': [], 'detached': [1], 'revealed': True}
+    form.revealed = [dict(make_field('state', 'State / Province'), after=0)]
+
+    result = run_dropdown_fill.process_all_fields(None, fields)
+
+    assert form.filled == ['country', 'state']
+    assert [field['label'] for field in result] == ['Country', 'State / Province']
+
+
+def test_detached_field_not_found_again_is_dropped(form):
+    fields = [make_field('country', 'Country'), make_field('state', 'State')]
+    form.changes_after['country'] = {'dirty': [], 'detached': [1], 'revealed': False}
+
+    result = run_dropdown_fill.process_all_fields(None, fields)
+
+    assert form.filled == ['country']
+    assert [field['attributes']['id'] for field in result] == ['country']
@@ -0,0 +1,42 @@
+import pytest
+
+from utils.gpt.response_parser import parse_option_index
+
+
+@pytest.mark.parametrize('response, expected', [
+    ('3', 3),
+    ('[3]', 3),
+    ('[ 12 ]', 12),
+    ('Option 3', 3),
+    ('option #3.', 3),
+    ('```json\n{"index": 4}\n```', 4),
+    ('{"choice": "2"}', 2),
+    ('The best match is [7] because it names the school.', 7),
+])
+def test_parses_chosen_index(response, expected):
+    assert parse_option_index(response) == expected
+
+
+@pytest.mark.parametrize('response', [
+    'false', 'None', '"none"', 'null', '{"index": null}', '{"index": false}',
+])
+def test_explicit_no_answer(response):
+    assert parse_option_index(response) == 'false'
+
+
+@pytest.mark.parametrize('response', [
+    '-1',
+    '[-1]',
+    '{"index": -1}',
+    '{"index": "-1"}',
+    'No suitable option, answering -1',
+])
+def test_negative_index_is_never_an_option(response):
+    assert parse_option_index(response) is None
+
+
+@pytest.mark.parametrize('response', [
+    None, '', 'Either [2] or [5] could work',
+])
+def test_ambiguous_responses(response):
+    assert parse_option_index(response) is None
@@ -0,0 +1,47 @@
+import pytest
+
+from utils.scripts.verify_field_content import classify_field_state, find_content_evidence
+
+
+def test_missing_field_is_unknown():
+    assert classify_field_state({'error': 'Element not found'}) == ('unknown', 0.0)
+
+
+def test_native_select_uses_selected_option():
+    state = {'tagName': 'SELECT', 'selectedIndex': 0, 'selectedIsPlaceholder': True}
+    assert classify_field_state(state)[0] == 'empty'
+
+    state = {'tagName': 'SELECT', 'selectedIndex': 2, 'selectedIsPlaceholder': False}
+    assert classify_field_state(state)[0] == 'filled'
+
+
+@pytest.mark.parametrize('state, expected', [
+    ({'tagName': 'DIV', 'singleValueText': 'United States'}, 'filled'),
+    ({'tagName': 'DIV', 'multiValueCount': 2}, 'filled'),
+    ({'tagName': 'DIV', 'placeholderText': 'Select...'}, 'empty'),
+    ({'tagName': 'DIV', 'selectedText': 'Select an option', 'value': 'Select...'}, 'empty'),
+    ({'tagName': 'INPUT', 'value': ''}, 'empty'),
+    ({'tagName': 'INPUT', 'value': 'Jane'}, 'filled'),
+])
+def test_classifies_clear_signals(state, expected):
+    state_name, confidence = classify_field_state(state)
+
+    assert state_name == expected
+    assert confidence >= 0.5
+
+
+def test_conflicting_signals_are_unknown():
+    state = {'tagName': 'DIV', 'selectedText': 'Yes', 'placeholderShown': True}
+
+    assert classify_field_state(state)[0] == 'unknown'
+
+
+def test_blank_combobox_is_unknown():
+    assert classify_field_state({'tagName': 'INPUT', 'role': 'combobox', 'value': ''})[0] == 'unknown'
+
+
+def test_evidence_skips_placeholders():
+    state = {'singleValueText': '', 'selectedText': 'Select...', 'value': 'Female'}
+
+    assert find_content_evidence(state) == ('value', 'Female')
+    assert find_content_evidence({'selectedText': 'Choose an option'}) is None
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.cache import vision_hash_cache
+from utils.cache.vision_hash_cache import find_similar_verdict, image_fingerprint, remember_verdict
+
+FIELD = {'label': 'Gender', 'attributes': {'id': 'gender'}}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(vision_hash_cache, '_entries', OrderedDict())
+
+
+def field_crop(text, color, quality=70):
+    """A 448px wide field with a 16px margin, as capture_field_image clips it"""
+    picture = Image.new('RGB', (480, 70), 'white')
+    draw = ImageDraw.Draw(picture)
+    draw.rounded_rectangle((16, 16, 463, 53), 4, outline=(204, 204, 204))
+    draw.text((28, 28), text, fill=color, font=ImageFont.load_default())
+    draw.text((440, 28), 'v', fill=(150, 150, 150), font=ImageFont.load_default())
+    buffer = BytesIO()
+    picture.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def with_dom(value):
+    return dict(FIELD, domState={'value': value, 'selectedText': '', 'singleValueText': value})
+
+
+def test_reencoded_crop_reuses_verdict():
+    remember_verdict(image_fingerprint(field_crop('Female', 'black'), FIELD), True)
+
+    assert find_similar_verdict(image_fingerprint(field_crop('Female', 'black', quality=50), FIELD)) is True
+
+
+@pytest.mark.parametrize('value', ['Female', 'Male', 'Decline to self-identify'])
+def test_filled_crop_never_reuses_placeholder_verdict(value):
+    remember_verdict(image_fingerprint(field_crop('Select...', 'grey'), FIELD), False)
+
+    assert find_similar_verdict(image_fingerprint(field_crop(value, 'black'), FIELD)) is None
+
+
+def test_dom_values_are_part_of_the_key():
+    # Even a pixel-identical crop isn't reused once the DOM reports a value
+    image = field_crop('Select...', 'grey')
+    remember_verdict(image_fingerprint(image, with_dom('')), False)
+
+    assert find_similar_verdict(image_fingerprint(image, with_dom('Female'))) is None
+    assert find_similar_verdict(image_fingerprint(image, with_dom(''))) is False
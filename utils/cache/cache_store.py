@@ -0,0 +1,239 @@
+from dotenv import load_dotenv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+import threading
+
+# Load environment variables
+load_dotenv()
+
+CACHE_STORE_PATH = os.getenv('CACHE_STORE_PATH', '.cache/store.sqlite')
+# How long a worker may hold a key it is computing before others take over
+LEASE_TIMEOUT = float(os.getenv('CACHE_LEASE_TIMEOUT', '60'))
+LEASE_POLL_INTERVAL = 0.1
+
+DAY = 24 * 3600
+
+# TTL (seconds) and max entries per namespace
+NAMESPACES = {
+    'option_decisions': {
+        'ttl': float(os.getenv('DECISION_CACHE_TTL', str(30 * DAY))),
+        'max_entries': int(os.getenv('DECISION_CACHE_MAX_ENTRIES', '5000'))
+    },
+    'search_terms': {'ttl': 30 * DAY, 'max_entries': 5000},
+    'text_answers': {'ttl': 30 * DAY, 'max_entries': 2000},
+    'vision_verdicts': {'ttl': 1 * DAY, 'max_entries': 2000}
+}
+
+# Per-namespace counters for this process
+_store_stats = {
+    namespace: {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'waits': 0}
+    for namespace in NAMESPACES
+}
+_stats_lock = threading.Lock()
+
+
+def make_key(*parts):
+    """Hash the parts that identify a cached value"""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _connect():
+    """Open a connection that is safe to share the file across processes"""
+    directory = os.path.dirname(CACHE_STORE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(CACHE_STORE_PATH, timeout=10, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=10000')
+    conn.execute('''CREATE TABLE IF NOT EXISTS entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS leases (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )''')
+    return conn
+
+
+def _read(conn, namespace, key, now):
+    """Return (found, value) for a fresh entry and mark it used"""
+    row = conn.execute(
+        'SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?',
+        (namespace, key)).fetchone()
+    if not row or now - row[1] > NAMESPACES[namespace]['ttl']:
+        return False, None
+    conn.execute(
+        'UPDATE entries SET last_used_at = ? WHERE namespace = ? AND key = ?',
+        (now, namespace, key))
+    return True, json.loads(row[0])
+
+
+def cache_get(namespace, key):
+    """
+    Look up a cached value.
+
+    Args:
+        namespace: One of NAMESPACES
+        key: Key from make_key
+
+    Returns:
+        The cached value, or None on a miss
+    """
+    try:
+        conn = _connect()
+        try:
+            found, value = _read(conn, namespace, key, time.time())
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Error reading cache store ({namespace}): {e}")
+        found, value = False, None
+
+    with _stats_lock:
+        _store_stats[namespace]['hits' if found else 'misses'] += 1
+    return value
+
+
+def cache_put(namespace, key, value):
+    """
+    Store a JSON-serializable value and evict stale entries of the namespace:
+    expired ones first, then least recently used beyond max_entries.
+    """
+    settings = NAMESPACES[namespace]
+    now = time.time()
+    try:
+        conn = _connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, json.dumps(value), now, now))
+            evicted = conn.execute(
+                'DELETE FROM entries WHERE namespace = ? AND created_at < ?',
+                (namespace, now - settings['ttl'])).rowcount
+            evicted += conn.execute(
+                '''DELETE FROM entries WHERE rowid IN (
+                    SELECT rowid FROM entries WHERE namespace = ?
+                    ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)''',
+                (namespace, settings['max_entries'])).rowcount
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        with _stats_lock:
+            _store_stats[namespace]['stores'] += 1
+            _store_stats[namespace]['evictions'] += evicted
+    except Exception as e:
+        print(f"Error writing cache store ({namespace}): {e}")
+
+
+def _try_lease(namespace, key, owner):
+    """
+    Atomically check for a value and claim the key if nobody else holds it.
+
+    Returns:
+        tuple: (value or None, True if this owner now holds the lease)
+    """
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        found, value = _read(conn, namespace, key, now)
+        if found:
+            conn.execute('COMMIT')
+            return value, False
+
+        row = conn.execute(
+            'SELECT owner, expires_at FROM leases WHERE namespace = ? AND key = ?',
+            (namespace, key)).fetchone()
+        if row and row[0] != owner and row[1] > now:
+            conn.execute('COMMIT')
+            return None, False
+
+        conn.execute('INSERT OR REPLACE INTO leases VALUES (?, ?, ?, ?)',
+                     (namespace, key, owner, now + LEASE_TIMEOUT))
+        conn.execute('COMMIT')
+        return None, True
+    finally:
+        conn.close()
+
+
+def _release_lease(namespace, key, owner):
+    try:
+        conn = _connect()
+        try:
+            conn.execute('DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?',
+                         (namespace, key, owner))
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Error releasing cache lease ({namespace}): {e}")
+
+
+def get_or_compute(namespace, key, compute):
+    """
+    Return the cached value for key, or compute and store it.
+
+    Only one worker (thread or process) computes a given key at a time;
+    the others wait for its result instead of making the same API call.
+    If the computing worker doesn't finish within LEASE_TIMEOUT, the next
+    waiter takes over.
+
+    Args:
+        namespace: One of NAMESPACES
+        key: Key from make_key
+        compute: Function returning the value, or None to store nothing
+
+    Returns:
+        The cached or computed value
+    """
+    value = cache_get(namespace, key)
+    if value is not None:
+        return value
+
+    owner = uuid.uuid4().hex
+    holds_lease = False
+    try:
+        while True:
+            value, holds_lease = _try_lease(namespace, key, owner)
+            if value is not None:
+                # Another worker computed it while we waited
+                with _stats_lock:
+                    _store_stats[namespace]['waits'] += 1
+                return value
+            if holds_lease:
+                break
+            time.sleep(LEASE_POLL_INTERVAL)
+    except Exception as e:
+        print(f"Error taking cache lease ({namespace}): {e}")
+
+    try:
+        value = compute()
+        if value is not None:
+            cache_put(namespace, key, value)
+        return value
+    finally:
+        if holds_lease:
+            _release_lease(namespace, key, owner)
+
+
+def get_store_stats(namespace=None):
+    """Return per-namespace hit/miss/store/eviction/wait counts for this process"""
+    with _stats_lock:
+        stats = {name: dict(counts) for name, counts in _store_stats.items()}
+    for counts in stats.values():
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = counts['hits'] / lookups if lookups else 0.0
+    return stats[namespace] if namespace else stats
@@ -0,0 +1,79 @@
+from utils.cache.cache_store import cache_get, cache_put, get_or_compute, make_key, get_store_stats
+import hashlib
+import re
+
+# Dropdown decisions live in the shared cache store under this namespace
+NAMESPACE = 'option_decisions'
+
+
+def normalize_text(text):
+    """Lowercase, collapse whitespace and strip required-field markers"""
+    text = (text or '').lower()
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip(' *:?.\t\n')
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def options_hash(option_texts):
+    """Hash the set of normalized option texts (order-independent)"""
+    normalized = sorted({normalize_text(text) for text in option_texts})
+    return _hash('\n'.join(normalized))
+
+
+def decision_key(field_label, option_texts, profile_key):
+    """Cache key for a field: normalized label, option set and profile fingerprint"""
+    return make_key(normalize_text(field_label), options_hash(option_texts),
+                    profile_key)
+
+
+def get_cached_choice(field_label, option_texts, profile_key):
+    """
+    Look up a previous decision for this field.
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts shown for the field
+        profile_key: Fingerprint of the profile used for the decision, so
+            edits to info.txt invalidate old answers
+
+    Returns:
+        str: The chosen option text on a hit, or None on a miss
+    """
+    return cache_get(NAMESPACE, decision_key(field_label, option_texts, profile_key))
+
+
+def store_choice(field_label, option_texts, profile_key, choice_text):
+    """
+    Remember the option chosen for this field.
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts shown for the field
+        profile_key: Fingerprint of the profile used for the decision, so
+            edits to info.txt invalidate old answers
+        choice_text: Text of the option that was chosen
+    """
+    cache_put(NAMESPACE, decision_key(field_label, option_texts, profile_key),
+              choice_text)
+
+
+def get_or_decide(field_label, option_texts, profile_key, decide):
+    """
+    Return the cached choice for this field, or call decide() and store it.
+
+    Workers asking about the same field at the same time share one decide()
+    call (see cache_store.get_or_compute).
+
+    Args:
+        decide: Function returning the chosen option text, or None
+    """
+    return get_or_compute(NAMESPACE, decision_key(field_label, option_texts, profile_key),
+                          decide)
+
+
+def get_cache_stats():
+    """Return hit/miss counts for the decision cache in this process"""
+    return get_store_stats(NAMESPACE)
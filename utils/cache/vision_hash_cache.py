@@ -0,0 +1,112 @@
+from dotenv import load_dotenv
+from collections import OrderedDict
+from PIL import Image
+from io import BytesIO
+import numpy as np
+import os
+import threading
+
+# Load environment variables
+load_dotenv()
+
+# Pixels per hash cell; small enough that a few letters of text span many cells
+HASH_CELL = 4
+# Brightness step between neighbouring cells that counts as an edge
+EDGE_THRESHOLD = 12
+# Images whose hashes differ in at most this many bits count as the same;
+# JPEG re-encoding flips one or two bits, a different value in the field tens
+HASH_TOLERANCE = int(os.getenv('VISION_HASH_TOLERANCE', '3'))
+# DOM values that are part of the key, so a crop taken after a fill never
+# reuses the verdict of the placeholder it replaced
+DOM_VALUE_FIELDS = ['value', 'selectedText', 'singleValueText']
+MAX_ENTRIES = int(os.getenv('VISION_HASH_CACHE_SIZE', '512'))
+
+# (field label, field id, image size, hash) -> verdict, least recently used first
+_entries = OrderedDict()
+_entries_lock = threading.Lock()
+
+_hash_stats = {
+    'hits': 0,
+    'near_hits': 0,
+    'misses': 0,
+    'evictions': 0
+}
+
+
+def perceptual_hash(image):
+    """
+    Edge hash of an image, as one integer.
+
+    The image is shrunk to a grayscale grid of HASH_CELL-pixel cells; each
+    cell keeps whether it is clearly brighter or clearly darker than its
+    right neighbour. Flat background sets neither bit, so re-encoding noise
+    barely changes the hash, while the strokes of a new value in the field
+    change many cells.
+
+    Args:
+        image: Encoded image bytes
+
+    Returns:
+        tuple: (hash int, (width, height) of the image)
+    """
+    with Image.open(BytesIO(image)) as picture:
+        size = picture.size
+        grid = (max(1, size[0] // HASH_CELL) + 1, max(1, size[1] // HASH_CELL))
+        gray = np.asarray(picture.convert('L').resize(grid, Image.BILINEAR), dtype=np.float32)
+
+    difference = gray[:, 1:] - gray[:, :-1]
+    edges = np.concatenate([(difference > EDGE_THRESHOLD).ravel(),
+                            (difference < -EDGE_THRESHOLD).ravel()])
+    return int.from_bytes(np.packbits(edges).tobytes(), 'big'), size
+
+
+def image_fingerprint(image, field_info):
+    """
+    Key of a field image: which field, its DOM values (from the 'domState'
+    verify_fields attaches), the crop size and its perceptual hash
+    """
+    value, size = perceptual_hash(image)
+    state = field_info.get('domState') or {}
+    dom_values = tuple((state.get(field) or '').strip() for field in DOM_VALUE_FIELDS)
+    return (field_info['label'], field_info['attributes'].get('id', ''), dom_values, size), value
+
+
+def find_similar_verdict(fingerprint):
+    """
+    Return the verdict of a cached image of the same field within
+    HASH_TOLERANCE bits, or None.
+    """
+    field, value = fingerprint
+    with _entries_lock:
+        best, best_distance = None, HASH_TOLERANCE + 1
+        for key in _entries:
+            if key[0] == field:
+                distance = bin(key[1] ^ value).count('1')
+                if distance < best_distance:
+                    best, best_distance = key, distance
+
+        if best is None:
+            _hash_stats['misses'] += 1
+            return None
+        _entries.move_to_end(best)
+        _hash_stats['hits' if best_distance == 0 else 'near_hits'] += 1
+        return _entries[best]
+
+
+def remember_verdict(fingerprint, verdict):
+    """Cache a verdict, evicting the least recently used beyond MAX_ENTRIES"""
+    with _entries_lock:
+        _entries[fingerprint] = verdict
+        _entries.move_to_end(fingerprint)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _hash_stats['evictions'] += 1
+
+
+def get_hash_cache_stats():
+    """Return exact/near hits, misses and evictions of the perceptual-hash cache"""
+    with _entries_lock:
+        stats = dict(_hash_stats)
+    lookups = stats['hits'] + stats['near_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['hits'] + stats['near_hits']) / lookups if lookups else 0.0
+    return stats
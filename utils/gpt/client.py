@@ -0,0 +1,184 @@
+from openai import OpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from dotenv import load_dotenv
+import hashlib
+import httpx
+import json
+import os
+import random
+import threading
+import time
+
+# Load environment variables
+load_dotenv()
+
+# Connection pool / concurrency settings (overridable from .env)
+MAX_IN_FLIGHT = int(os.getenv('OPENAI_MAX_IN_FLIGHT', '8'))
+MAX_KEEPALIVE = int(os.getenv('OPENAI_MAX_KEEPALIVE', str(MAX_IN_FLIGHT)))
+CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+REQUEST_TIMEOUT = float(os.getenv('OPENAI_REQUEST_TIMEOUT', '60'))
+MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+BACKOFF_BASE = float(os.getenv('OPENAI_BACKOFF_BASE', '0.5'))
+BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', '8'))
+
+_client = None
+_client_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+# Identical requests currently waiting on the API, keyed by _request_key
+_pending = {}
+_pending_lock = threading.Lock()
+_client_stats = {'requests': 0, 'upstream': 0, 'coalesced': 0}
+
+
+def get_client():
+    """
+    Return the shared OpenAI client, building it on first use.
+
+    All utils/gpt modules go through this client so they share one pooled,
+    keep-alive HTTP transport instead of each opening their own.
+
+    Returns:
+        OpenAI: The shared client instance
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise ValueError(
+                    "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
+
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_IN_FLIGHT,
+                    max_keepalive_connections=MAX_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+            )
+            # Retries are handled in chat_completion so backoff is applied once
+            _client = OpenAI(api_key=api_key, http_client=http_client,
+                             max_retries=0)
+    return _client
+
+
+def _is_retryable(error):
+    """Check if an API error is worth retrying"""
+    if isinstance(error, (APIConnectionError, APITimeoutError, RateLimitError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+class _PendingRequest:
+    """An upstream call that identical requests can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _normalize_content(content):
+    """Collapse whitespace in prompt text so formatting differences don't matter"""
+    if isinstance(content, str):
+        return ' '.join(content.split())
+    if isinstance(content, list):
+        return [_normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {key: _normalize_content(value) for key, value in content.items()}
+    return content
+
+
+def _request_key(kwargs):
+    """Hash of the request with normalized prompts"""
+    request = dict(kwargs)
+    request['messages'] = _normalize_content(request.get('messages', []))
+    encoded = json.dumps(request, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def chat_completion(**kwargs):
+    """
+    Create a chat completion through the shared client.
+
+    Identical requests (same arguments, prompts compared with whitespace
+    collapsed) made while one is already waiting on the API share that
+    call instead of sending their own. Upstream calls are limited and
+    retried as in _create_with_retries.
+
+    Args:
+        **kwargs: Arguments passed to client.chat.completions.create
+
+    Returns:
+        ChatCompletion: The API response
+    """
+    key = _request_key(kwargs)
+    with _pending_lock:
+        _client_stats['requests'] += 1
+        pending = _pending.get(key)
+        leader = pending is None
+        if leader:
+            pending = _PendingRequest()
+            _pending[key] = pending
+        else:
+            _client_stats['coalesced'] += 1
+
+    if not leader:
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.response
+
+    try:
+        pending.response = _create_with_retries(kwargs)
+        return pending.response
+    except Exception as e:
+        pending.error = e
+        raise
+    finally:
+        with _pending_lock:
+            del _pending[key]
+        pending.done.set()
+
+
+def _create_with_retries(kwargs):
+    """
+    Send one request to the API.
+
+    At most MAX_IN_FLIGHT requests run at once across all threads. Connection
+    errors, timeouts, rate limits and 5xx responses are retried with
+    exponential backoff and jitter.
+    """
+    with _pending_lock:
+        _client_stats['upstream'] += 1
+    client = get_client()
+    attempt = 0
+    while True:
+        with _in_flight:
+            try:
+                return client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not _is_retryable(e):
+                    raise
+                error = e
+
+        # Sleep outside the semaphore so waiting retries don't hold a slot
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        delay += random.uniform(0, delay / 2)
+        attempt += 1
+        print(
+            f"LLM request failed ({type(error).__name__}), retrying in {delay:.1f}s (attempt {attempt}/{MAX_RETRIES})")
+        time.sleep(delay)
+
+
+def get_client_stats():
+    """Return request counts, including how many shared an in-flight call"""
+    with _pending_lock:
+        stats = dict(_client_stats)
+    total = stats['requests']
+    stats['coalesce_rate'] = stats['coalesced'] / total if total else 0.0
+    return stats
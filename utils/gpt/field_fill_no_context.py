@@ -1,14 +1,9 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+from utils.gpt.client import chat_completion
+from utils.profile.candidate_profile import get_relevant_facts
+from utils.cache.cache_store import get_or_compute, make_key
+from utils.cache.decision_cache import normalize_text
 
-load_dotenv()
-
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
+SEARCH_TERMS = 'search_terms'
 
 
 def generate_search_term(field_label):
@@ -22,14 +17,20 @@ def generate_search_term(field_label):
         str: A partial search term or None if can't generate
     """
     try:
-        # Read resume text from info.txt for context
-        try:
-            with open('info.txt', 'r') as f:
-                resume_text = f.read()
-        except Exception as e:
-            print(f"Error reading info.txt: {e}")
-            resume_text = ""
+        # Only the profile facts relevant to this field go into the prompt
+        resume_text = get_relevant_facts(field_label)
+        key = make_key('no_context', normalize_text(field_label), resume_text)
+        return get_or_compute(SEARCH_TERMS, key,
+                              lambda: _ask_search_term(field_label, resume_text))
 
+    except Exception as e:
+        print(f"Error generating search term: {e}")
+        return None
+
+
+def _ask_search_term(field_label, resume_text):
+    """Ask GPT for a search term (uncached)"""
+    try:
         message = f"""Given this field label, generate a PARTIAL search term that would help filter and find the best option from my resume.
         The search term should be the most identifying part of the desired option from the resume.
         
@@ -49,7 +50,7 @@ def generate_search_term(field_label):
         """
 
         # Make API call
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": message}],
             temperature=0.1
@@ -1,14 +1,9 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+from utils.gpt.client import chat_completion
+from utils.profile.candidate_profile import get_relevant_facts
+from utils.cache.cache_store import get_or_compute, make_key
+from utils.cache.decision_cache import normalize_text
 
-load_dotenv()
-
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
+SEARCH_TERMS = 'search_terms'
 
 
 def generate_search_term(sample_elements, field_label):
@@ -23,14 +18,21 @@ def generate_search_term(sample_elements, field_label):
         str: A partial search term (max 5 chars) or None if can't generate
     """
     try:
-        # Read resume text from info.txt for context
-        try:
-            with open('info.txt', 'r') as f:
-                resume_text = f.read()
-        except Exception as e:
-            print(f"Error reading info.txt: {e}")
-            resume_text = ""
+        # Only the profile facts relevant to this field go into the prompt
+        resume_text = get_relevant_facts(field_label)
+        key = make_key('partial', normalize_text(field_label),
+                       [el.get('text', '') for el in sample_elements], resume_text)
+        return get_or_compute(SEARCH_TERMS, key,
+                              lambda: _ask_search_term(sample_elements, field_label, resume_text))
 
+    except Exception as e:
+        print(f"Error generating search term: {e}")
+        return None
+
+
+def _ask_search_term(sample_elements, field_label, resume_text):
+    """Ask GPT for a search term (uncached)"""
+    try:
         # Format sample elements for GPT prompt
         elements_text = "\n".join([
             f"[{i}] Text: {el.get('text', '')}, Class: {el.get('class', '')}"
@@ -59,7 +61,7 @@ def generate_search_term(sample_elements, field_label):
         """
 
         # Make API call
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": message}],
             temperature=0.1
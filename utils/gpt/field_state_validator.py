@@ -1,53 +1,76 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+from utils.gpt.client import chat_completion
+from utils.cache.cache_store import cache_get, cache_put, get_or_compute, make_key
+from utils.cache.vision_hash_cache import image_fingerprint, find_similar_verdict, remember_verdict
+import hashlib
 import base64
-from PIL import Image
-from io import BytesIO
+import json
+import threading
 
-# Load environment variables
-load_dotenv()
+# Field images sent in one batched request
+MAX_VISION_BATCH = 8
 
-# Initialize OpenAI client
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
+_vision_stats = {
+    'fields': 0,
+    'requests': 0,
+    'cached': 0
+}
+_stats_lock = threading.Lock()
 
 
-def encode_image_to_base64(image_path):
-    """Convert an image file to base64 string"""
-    try:
-        with Image.open(image_path) as image:
-            buffered = BytesIO()
-            image.save(buffered, format="PNG")
-            return base64.b64encode(buffered.getvalue()).decode('utf-8')
-    except Exception as e:
-        print(f"Error encoding image: {e}")
-        return None
+def _verdict_key(image, field_info):
+    """The same field in an identical screenshot gets the same verdict"""
+    return make_key(field_info['label'], field_info['attributes'].get('id', ''),
+                    hashlib.sha1(image).hexdigest())
 
 
-def validate_field_state(screenshot_path, field_info):
+def _image_url(image, mime_type):
+    return f"data:{mime_type};base64,{base64.b64encode(image).decode('utf-8')}"
+
+
+def validate_field_state(image, field_info, mime_type='image/jpeg'):
     """
     Validate if a field is empty or filled using GPT-4 Vision.
 
     Args:
-        screenshot_path: Path to the screenshot of the current page state
+        image: Screenshot bytes of the field (see capture_field_image)
         field_info: Dictionary containing field information (label, type, etc.)
+        mime_type: MIME type of the image
 
     Returns:
         bool: True if field is filled, False if empty
     """
     try:
-        # Encode the screenshot
-        base64_image = encode_image_to_base64(screenshot_path)
-        if not base64_image:
-            print("Failed to encode screenshot")
+        if not image:
+            print("No screenshot to validate")
             return False
 
+        with _stats_lock:
+            _vision_stats['fields'] += 1
+        fingerprint = image_fingerprint(image, field_info)
+        verdict = find_similar_verdict(fingerprint)
+        if verdict is not None:
+            with _stats_lock:
+                _vision_stats['cached'] += 1
+            return verdict
+
+        verdict = get_or_compute('vision_verdicts', _verdict_key(image, field_info),
+                                 lambda: _ask_field_state(_image_url(image, mime_type), field_info))
+        if verdict is not None:
+            remember_verdict(fingerprint, verdict)
+        return bool(verdict)
+
+    except Exception as e:
+        print(f"Error validating field state: {e}")
+        return False
+
+
+def _ask_field_state(image_url, field_info):
+    """Ask GPT-4 Vision whether the field is filled; None if the call fails"""
+    with _stats_lock:
+        _vision_stats['requests'] += 1
+    try:
         # Prepare the message for GPT-4 Vision
-        message = f"""Analyze this screenshot of a form and determine if the specified field is empty or filled.
+        message = f"""Analyze this screenshot of a form field and determine if the specified field is empty or filled.
         
         Field Details:
         - Label: {field_info['label']}
@@ -61,7 +84,7 @@ def validate_field_state(screenshot_path, field_info):
         """
 
         # Make API call to GPT-4 Vision
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -71,7 +94,9 @@ def validate_field_state(screenshot_path, field_info):
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{base64_image}"
+                                "url": image_url,
+                                # A cropped field reads fine at low detail (fixed, small token cost)
+                                "detail": "low"
                             }
                         }
                     ]
@@ -86,4 +111,100 @@ def validate_field_state(screenshot_path, field_info):
 
     except Exception as e:
         print(f"Error validating field state: {e}")
-        return False
+        return None
+
+
+def validate_field_states(images, field_infos):
+    """
+    Validate several fields with one GPT-4 Vision request per
+    MAX_VISION_BATCH fields instead of one request each.
+
+    Args:
+        images: List of (image bytes, MIME type) per field
+        field_infos: List of field dicts, in the same order
+
+    Returns:
+        list: True if the field is filled, False if empty, per field
+    """
+    results = [False] * len(field_infos)
+    pending = []
+    for i, ((image, mime_type), field_info) in enumerate(zip(images, field_infos)):
+        with _stats_lock:
+            _vision_stats['fields'] += 1
+        fingerprint = image_fingerprint(image, field_info)
+        verdict = find_similar_verdict(fingerprint)
+        if verdict is None:
+            key = _verdict_key(image, field_info)
+            verdict = cache_get('vision_verdicts', key)
+            if verdict is None:
+                pending.append((i, key, fingerprint, _image_url(image, mime_type), field_info))
+                continue
+            remember_verdict(fingerprint, verdict)
+        with _stats_lock:
+            _vision_stats['cached'] += 1
+        results[i] = bool(verdict)
+
+    for start in range(0, len(pending), MAX_VISION_BATCH):
+        batch = pending[start:start + MAX_VISION_BATCH]
+        verdicts = _ask_field_states([(url, info) for _, _, _, url, info in batch])
+        for (i, key, fingerprint, _, _), verdict in zip(batch, verdicts):
+            if verdict is not None:
+                cache_put('vision_verdicts', key, verdict)
+                remember_verdict(fingerprint, verdict)
+                results[i] = verdict
+    return results
+
+
+def _ask_field_states(fields):
+    """
+    Ask GPT-4 Vision about several field images at once.
+
+    Returns:
+        list: True/False per field, None where the answer is missing
+    """
+    if len(fields) == 1:
+        return [_ask_field_state(*fields[0])]
+
+    with _stats_lock:
+        _vision_stats['requests'] += 1
+    try:
+        message = f"""Each image below is a screenshot of one form field, preceded by its number and details.
+        For EACH field, determine if it is empty or filled.
+        A field is considered filled if it shows a selected value, contains text, or displays a chosen option.
+        A field is considered empty if it shows placeholder text, default text like 'Select...', or no value at all.
+
+        Respond with a JSON object of the form {{"filled": {{"1": true, "2": false, ...}}}} covering all {len(fields)} fields.
+        """
+
+        content = [{"type": "text", "text": message}]
+        for number, (image_url, field_info) in enumerate(fields, 1):
+            content.append({
+                "type": "text",
+                "text": f"Field {number}: Label: {field_info['label']}, Type: {field_info['type']}"
+            })
+            content.append({
+                "type": "image_url",
+                "image_url": {"url": image_url, "detail": "low"}
+            })
+
+        response = chat_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": content}],
+            response_format={"type": "json_object"},
+            max_tokens=20 + 10 * len(fields),
+            temperature=0.1
+        )
+
+        filled = json.loads(response.choices[0].message.content).get('filled', {})
+        return [filled.get(str(number)) if isinstance(filled.get(str(number)), bool) else None
+                for number in range(1, len(fields) + 1)]
+
+    except Exception as e:
+        print(f"Error validating field states: {e}")
+        return [None] * len(fields)
+
+
+def get_vision_stats():
+    """Return how many fields were checked by vision and in how many requests"""
+    with _stats_lock:
+        return dict(_vision_stats)
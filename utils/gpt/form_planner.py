@@ -0,0 +1,178 @@
+from utils.gpt.client import chat_completion
+from utils.cache.decision_cache import get_cached_choice, store_choice, normalize_text
+from utils.profile.candidate_profile import get_profile_text, get_profile_fingerprint
+from utils.matching.local_matcher import match_option, score_option, MATCH_THRESHOLD
+import json
+import threading
+
+# Planning and apply counts for this process
+_planner_stats = {
+    'planned_locally': 0,
+    'planned_by_llm': 0,
+    'batch_calls': 0,
+    'applied': 0,
+    'missed': 0
+}
+_stats_lock = threading.Lock()
+
+
+def field_key(field):
+    """Stable key for a field across re-analysis (id, then xpath, then label)"""
+    return (field['attributes'].get('id') or field.get('xpath')
+            or normalize_text(field.get('label')))
+
+
+def _resolve_planned_text(answer, options):
+    """Map a planned answer onto one of the known option texts"""
+    if not options:
+        return answer
+    for option in options:
+        if normalize_text(option) == normalize_text(answer):
+            return option
+    best_score, best_option = max((score_option(answer, option), option)
+                                  for option in options)
+    return best_option if best_score >= MATCH_THRESHOLD else None
+
+
+def _plan_with_llm(pending, profile_key):
+    """Answer the remaining fields with one batched request"""
+    fields_text = "\n".join([
+        f"[{i}] Field: {field['label']}\n    Options: " +
+        (json.dumps(options) if options else "unknown (answer with a short value)")
+        for i, (_, field, options) in enumerate(pending)
+    ])
+
+    message = f"""You are filling out a job application for the candidate below. For EACH field, choose the answer.
+    If options are listed, the answer MUST be copied exactly from that field's options.
+    If options are unknown, give the short value the candidate would pick (e.g. "Yes", "Male", "University of California, Davis").
+    If a field can't be answered, use null.
+    For fields where information isn't directly stated in the resume, select the most advantageous option.
+    Don't fabricate verifiable facts that are verifiable by a company's internal logs ie working at that company before or being a part of that company.
+
+    Respond with a JSON object of the form {{"answers": {{"0": "<answer>", "1": "<answer>", ...}}}}.
+
+    Fields:
+    {fields_text}
+
+    Resume:
+    {get_profile_text()}
+    """
+
+    try:
+        with _stats_lock:
+            _planner_stats['batch_calls'] += 1
+        response = chat_completion(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": message}],
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        answers = json.loads(response.choices[0].message.content).get('answers', {})
+    except Exception as e:
+        print(f"Error planning form answers: {e}")
+        return {}
+
+    plan = {}
+    for i, (key, field, options) in enumerate(pending):
+        answer = answers.get(str(i))
+        if not isinstance(answer, str) or not answer.strip():
+            continue
+        answer = _resolve_planned_text(answer.strip(), options)
+        if answer is None:
+            continue
+        plan[key] = answer
+        with _stats_lock:
+            _planner_stats['planned_by_llm'] += 1
+        if options:
+            store_choice(field['label'], options, profile_key, answer)
+
+    return plan
+
+
+def plan_form_answers(fields, options_by_field):
+    """
+    Decide the answer for every field up front with at most one LLM call.
+
+    Fields with known options are answered by the local matcher or the
+    decision cache when possible. Everything left goes into a single batched
+    request that returns a JSON map of answers. Fields whose options are not
+    known yet still get a planned answer text, which is matched against the
+    real options once the dropdown is opened.
+
+    Args:
+        fields: List of field dicts from analyze_form_fields
+        options_by_field: List of option text lists, aligned with fields
+
+    Returns:
+        dict: field_key -> planned answer text
+    """
+    plan = {}
+    pending = []
+    profile_key = get_profile_fingerprint()
+
+    for field, options in zip(fields, options_by_field):
+        key = field_key(field)
+        if options:
+            index, _ = match_option(field['label'], options)
+            if index is None:
+                cached = get_cached_choice(field['label'], options, profile_key)
+                if cached is not None:
+                    index = next((i for i, option in enumerate(options)
+                                  if normalize_text(option) == normalize_text(cached)), None)
+            if index is not None:
+                plan[key] = options[index]
+                with _stats_lock:
+                    _planner_stats['planned_locally'] += 1
+                continue
+        pending.append((key, field, options))
+
+    if pending:
+        plan.update(_plan_with_llm(pending, profile_key))
+
+    print(f"\nPlanned answers for {len(plan)}/{len(fields)} fields:")
+    for field in fields:
+        if field_key(field) in plan:
+            print(f"  {field['label']}: {plan[field_key(field)]}")
+
+    return plan
+
+
+def find_planned_option(planned_answer, option_texts):
+    """
+    Find the option matching a planned answer.
+
+    Args:
+        planned_answer: Answer text from plan_form_answers
+        option_texts: List of option texts shown after opening the field
+
+    Returns:
+        int or None: Index of the matching option, or None if the plan
+        can't be applied and the field needs its own LLM call
+    """
+    if not planned_answer:
+        return None
+
+    for i, text in enumerate(option_texts):
+        if normalize_text(text) == normalize_text(planned_answer):
+            with _stats_lock:
+                _planner_stats['applied'] += 1
+            return i
+
+    scores = [(score_option(planned_answer, text), i)
+              for i, text in enumerate(option_texts)]
+    if scores:
+        best_score, best_index = max(scores)
+        if best_score >= MATCH_THRESHOLD:
+            with _stats_lock:
+                _planner_stats['applied'] += 1
+            return best_index
+
+    with _stats_lock:
+        _planner_stats['missed'] += 1
+    return None
+
+
+def get_planner_stats():
+    """Return planning and apply counts for this process"""
+    with _stats_lock:
+        return dict(_planner_stats)
@@ -1,23 +1,22 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+from utils.gpt.client import chat_completion
+from utils.profile.candidate_profile import get_relevant_facts
+from utils.cache.cache_store import get_or_compute, make_key
+from utils.cache.decision_cache import normalize_text
 import time
 
-# Load environment variables
-load_dotenv()
-
-# Initialize OpenAI client
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
-
 
 def get_text_field_value(field_info, resume_text):
     """Get appropriate value for a text field using GPT"""
+    print(f"\nGetting value for field: {field_info['label']}")
+    key = make_key(normalize_text(field_info['label']), field_info['type'],
+                   field_info['isRequired'], resume_text)
+    return get_or_compute('text_answers', key,
+                          lambda: _ask_text_field_value(field_info, resume_text))
+
+
+def _ask_text_field_value(field_info, resume_text):
+    """Ask GPT for a text field value (uncached)"""
     try:
-        print(f"\nGetting value for field: {field_info['label']}")
 
         # Format the message to get appropriate text field value
         message = f"""Given a text field in a job application and the candidate's resume, provide an appropriate value to fill in the field.
@@ -34,7 +33,7 @@ def get_text_field_value(field_info, resume_text):
         For any information not found in the resume, provide a reasonable professional response that would be appropriate for a job application.
         """
 
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": message}],
             temperature=0.1
@@ -52,9 +51,8 @@ def get_text_field_value(field_info, resume_text):
 def fill_text_field(page, element):
     """Fill a text field with GPT-suggested value"""
     try:
-        # Load resume text
-        with open('info.txt', 'r') as file:
-            resume_text = file.read()
+        # Load only the profile facts relevant to this field
+        resume_text = get_relevant_facts(element['label'])
 
         # Get value from GPT
         value = get_text_field_value(element, resume_text)
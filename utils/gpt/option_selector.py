@@ -1,30 +1,107 @@
-from openai import OpenAI
+from utils.gpt.client import chat_completion, MAX_IN_FLIGHT
+from utils.gpt.response_parser import extract_number_from_response
+from utils.cache.decision_cache import get_or_decide, normalize_text
+from utils.profile.candidate_profile import get_relevant_facts, get_profile_fingerprint
+from utils.matching.local_matcher import match_option
+from utils.matching.option_index import shortlist_options, rank_options
+from utils.reference.gazetteer import find_reference_option
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import math
 import os
-from utils.gpt.response_parser import extract_number_from_response
-
+import threading
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
+# Lists this long fall back to typing a search term when GPT finds no match
+# in the shortlist; shorter ones are re-sent whole
+LARGE_LIST_OPTIONS = 90
+
+# Lists this long are decided by a tournament: concurrent calls over chunks,
+# then one final call over the chunk winners
+TOURNAMENT_MIN_OPTIONS = int(os.getenv('TOURNAMENT_MIN_OPTIONS', '200'))
+# Total calls (chunks + final) and estimated prompt tokens per tournament.
+# With no more chunks than requests allowed in flight, a tournament takes
+# two LLM round trips whatever the list size.
+TOURNAMENT_MAX_CALLS = int(os.getenv('TOURNAMENT_MAX_CALLS', str(MAX_IN_FLIGHT + 1)))
+TOURNAMENT_MAX_TOKENS = int(os.getenv('TOURNAMENT_MAX_TOKENS', '60000'))
+TOURNAMENT_MIN_CHUNK = 50
+# Tokens of the option prompt without the options and resume
+PROMPT_OVERHEAD_TOKENS = 400
+
+_tournament_stats = {
+    'tournaments': 0,
+    'calls': 0,
+    'tokens': 0,
+    'options_dropped': 0
+}
+_stats_lock = threading.Lock()
 
 
 def select_best_option(elements, field_label, resume_text=None):
     try:
-        # Read resume text from info.txt
-        try:
-            with open('info.txt', 'r') as f:
-                resume_text = f.read()
-        except Exception as e:
-            print(f"Error reading info.txt: {e}")
+        # Only the profile facts relevant to this field go into the prompt
+        if resume_text is None:
+            resume_text = get_relevant_facts(field_label)
+        if not resume_text:
+            print("No profile information available")
             return 'false'
+        profile_key = get_profile_fingerprint()
+
+        # Answer obvious fields (Yes/No, EEO, ...) locally from the profile
+        option_texts = [el.get('text', '') for el in elements]
+        local_index, confidence = match_option(field_label, option_texts)
+        if local_index is not None:
+            print(
+                f"Local match: [{local_index}] {option_texts[local_index]} (confidence {confidence:.2f})")
+            return local_index
 
+        # Countries, states, schools and degrees come from bundled reference data
+        reference_index = find_reference_option(field_label, option_texts)
+        if reference_index is not None:
+            print(f"Reference match: [{reference_index}] {option_texts[reference_index]}")
+            return reference_index
+
+        # Reuse a previous decision for the same question and option set;
+        # if another worker is already asking GPT, wait for its answer
+        def ask_gpt():
+            if len(elements) >= TOURNAMENT_MIN_OPTIONS:
+                number = _run_tournament(elements, field_label, resume_text)
+                return option_texts[number] if number != 'false' else None
+
+            # Long lists only send the options closest to the label/profile
+            shortlist = shortlist_options(field_label, option_texts, resume_text)
+            if len(shortlist) < len(elements):
+                print(f"Shortlisted {len(shortlist)} of {len(elements)} options")
+                number = _ask_gpt_for_option(
+                    [elements[i] for i in shortlist], field_label, resume_text)
+                if number != 'false':
+                    return option_texts[shortlist[number]]
+                if len(elements) >= LARGE_LIST_OPTIONS:
+                    return None
+                print("No match in the shortlist, asking with all options...")
+
+            number = _ask_gpt_for_option(elements, field_label, resume_text)
+            return option_texts[number] if number != 'false' else None
+
+        choice = get_or_decide(field_label, option_texts, profile_key, ask_gpt)
+        if choice is None:
+            return 'false'
+        for i, text in enumerate(option_texts):
+            if normalize_text(text) == normalize_text(choice):
+                print(f"Chosen option: [{i}] {text}")
+                return i
+        return 'false'
+
+    except Exception as e:
+        print(f"Critical error in option selection: {e}")
+        return 'false'
+
+
+def _ask_gpt_for_option(elements, field_label, resume_text):
+    """Ask GPT for the index of the best option, or 'false'"""
+    try:
         # Format elements for GPT prompt
         elements_text = "\n".join([
             f"[{i}] Text: {el.get('text', '')}, Class: {el.get('class', '')}"
@@ -39,7 +116,8 @@ def select_best_option(elements, field_label, resume_text=None):
         Other elements might be UI components, labels, or irrelevant options - find the one valid choice.
         If multiple options could work, choose the most specific and accurate one based on the resume.
 
-        Return ONLY the NUMBER of the best option.
+        Respond with a JSON object of the form {{"index": <number of the best option>}}.
+        If no option is valid, respond with {{"index": null}}.
         
         Question/Field: {field_label}
         
@@ -56,9 +134,10 @@ def select_best_option(elements, field_label, resume_text=None):
         """
 
         # Make API call
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": message}],
+            response_format={"type": "json_object"},
             temperature=0.1
         )
 
@@ -67,7 +146,7 @@ def select_best_option(elements, field_label, resume_text=None):
         print("="*100)
         print(f"Raw GPT output: {answer}")
 
-        # Use the new parser to extract the number
+        # Parse the structured answer locally; GPT extraction is only a fallback
         number = extract_number_from_response(answer)
 
         # If we got a number back, validate it
@@ -85,3 +164,94 @@ def select_best_option(elements, field_label, resume_text=None):
     except Exception as e:
         print(f"Critical error in option selection: {e}")
         return 'false'
+
+
+def _estimate_tokens(text):
+    """Rough token count (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _option_tokens(element):
+    """Estimated tokens of one option line in a tournament prompt"""
+    return _estimate_tokens(f"[000] Text: {element.get('text', '')}, Class: ")
+
+
+def _plan_tournament(elements, field_label, resume_text):
+    """
+    Split options into chunks that fit the call and token caps.
+
+    Options are ranked locally first, so when a list is too large for the
+    caps the least similar options are the ones left out.
+
+    Returns:
+        list: Chunks of option indices, each in original order
+    """
+    max_chunks = max(1, TOURNAMENT_MAX_CALLS - 1)
+    overhead = PROMPT_OVERHEAD_TOKENS + _estimate_tokens(resume_text + field_label)
+    # Reserve the final call: overhead plus one short line per winner
+    budget = TOURNAMENT_MAX_TOKENS - overhead - 20 * max_chunks
+
+    ranked = rank_options(field_label, [el.get('text', '') for el in elements], resume_text)
+    chunk_count = min(max_chunks, math.ceil(len(ranked) / TOURNAMENT_MIN_CHUNK))
+    budget -= overhead * chunk_count
+
+    kept = []
+    for index in ranked:
+        budget -= _option_tokens(elements[index])
+        if budget < 0:
+            break
+        kept.append(index)
+
+    with _stats_lock:
+        _tournament_stats['options_dropped'] += len(elements) - len(kept)
+    chunk_count = min(chunk_count, math.ceil(len(kept) / TOURNAMENT_MIN_CHUNK))
+    # Deal ranked options round-robin so every chunk gets some strong ones
+    return [sorted(kept[i::chunk_count]) for i in range(chunk_count)]
+
+
+def _run_tournament(elements, field_label, resume_text):
+    """
+    Pick an option from a very large list in two rounds of LLM calls.
+
+    The chunk calls run concurrently; the final call only sees the chunk
+    winners. Class strings are left out to keep the prompts small.
+
+    Returns:
+        int or 'false': Index into elements
+    """
+    chunks = _plan_tournament(elements, field_label, resume_text)
+    if not chunks:
+        return 'false'
+    print(f"Running tournament over {sum(len(c) for c in chunks)} of {len(elements)} options in {len(chunks)} chunks")
+    with _stats_lock:
+        _tournament_stats['tournaments'] += 1
+
+    overhead = PROMPT_OVERHEAD_TOKENS + _estimate_tokens(resume_text + field_label)
+
+    def ask(indices):
+        options = [{'text': elements[i].get('text', ''), 'class': ''} for i in indices]
+        number = _ask_gpt_for_option(options, field_label, resume_text)
+        return indices[number] if number != 'false' else 'false'
+
+    def count_call(indices):
+        tokens = overhead + sum(_option_tokens(elements[i]) for i in indices)
+        with _stats_lock:
+            _tournament_stats['calls'] += 1
+            _tournament_stats['tokens'] += tokens
+
+    for chunk in chunks:
+        count_call(chunk)
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        winners = [winner for winner in executor.map(ask, chunks) if winner != 'false']
+
+    print(f"Chunk winners: {[elements[i].get('text', '') for i in winners]}")
+    if len(winners) <= 1:
+        return winners[0] if winners else 'false'
+    count_call(winners)
+    return ask(winners)
+
+
+def get_tournament_stats():
+    """Return how many tournaments ran and the calls and tokens they used"""
+    with _stats_lock:
+        return dict(_tournament_stats)
@@ -1,25 +1,135 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+from utils.gpt.client import chat_completion
+import json
+import re
+import threading
 
-# Load environment variables
-load_dotenv()
 
-# Initialize OpenAI client
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError(
-        "No OpenAI API key found. Make sure OPENAI_API_KEY is set in your .env file")
-client = OpenAI(api_key=api_key)
+# How often each extraction path was used ('unparsed' counts fallbacks
+# that still produced no number)
+_parser_stats = {
+    'local': 0,
+    'llm_fallback': 0,
+    'unparsed': 0
+}
+_stats_lock = threading.Lock()
+
+NO_ANSWER_WORDS = {'false', 'none', 'null', 'n/a', 'no match', 'no option'}
+INDEX_KEYS = ['index', 'option', 'choice', 'number', 'answer']
+
+
+def _parse_json_answer(text):
+    """Pull the index out of a JSON answer like {"index": 3}"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+
+    if isinstance(data, bool):
+        return 'false' if data is False else None
+    if isinstance(data, int):
+        return data if data >= 0 else None
+    if isinstance(data, dict):
+        for key in INDEX_KEYS:
+            if key in data:
+                value = data[key]
+                if value is None or value is False:
+                    return 'false'
+                if isinstance(value, bool):
+                    return None
+                if isinstance(value, int):
+                    return value if value >= 0 else None
+                if isinstance(value, str):
+                    return parse_option_index(value)
+    return None
+
+
+def parse_option_index(gpt_response):
+    """
+    Extract the chosen option number from a GPT response without an LLM call.
+
+    Handles bare numbers ("3"), brackets ("[3]"), labelled forms ("Option 3",
+    "option #3"), JSON ({"index": 3}) and explicit no-answers ("false").
+    Negative numbers ("-1" for "no suitable option") are never taken as an
+    option.
+
+    Args:
+        gpt_response: The raw text returned by GPT
+
+    Returns:
+        int or str or None: The number, 'false' for an explicit no-answer, or
+        None if the response is ambiguous or negative
+    """
+    if gpt_response is None:
+        return None
+
+    text = str(gpt_response).strip().lower()
+    # Drop code fences and surrounding quotes
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text).strip()
+    text = text.strip('"\'` ').rstrip('.')
+
+    if not text:
+        return None
+    if text in NO_ANSWER_WORDS:
+        return 'false'
+
+    if text.startswith('{') or text.startswith('['):
+        parsed = _parse_json_answer(text)
+        if parsed is not None:
+            return parsed
+
+    # Whole response is just the answer
+    match = re.fullmatch(
+        r'(?:(?:option|element|choice|number|index)\s*)?#?\s*\[?\s*(-?\d+)\s*\]?', text)
+    if match:
+        number = int(match.group(1))
+        return number if number >= 0 else None
+
+    # Longer responses: accept only if a single distinct number is chosen
+    for pattern in [r'\[(-?\d+)\]',
+                    r'(?:option|element|choice|number|index)\s*#?\s*(-?\d+)',
+                    r'(?<![\w.-])(-?\d+)(?![\w.])']:
+        numbers = {int(number) for number in re.findall(pattern, text)}
+        if len(numbers) == 1:
+            number = numbers.pop()
+            return number if number >= 0 else None
+        if len(numbers) > 1:
+            return None
+
+    if any(word in text for word in NO_ANSWER_WORDS):
+        return 'false'
+
+    return None
+
+
+def get_parser_stats():
+    """Return how often the local parser and the LLM fallback were used"""
+    with _stats_lock:
+        stats = dict(_parser_stats)
+    total = stats['local'] + stats['llm_fallback']
+    stats['total'] = total
+    stats['fallback_rate'] = stats['llm_fallback'] / total if total else 0.0
+    return stats
 
 
 def extract_number_from_response(gpt_response):
     """
-    Uses GPT-3.5-turbo to extract the chosen number from a complex GPT response.
+    Extract the chosen number from a GPT response.
+
+    The response is parsed locally first. GPT-3.5-turbo is only asked when the
+    local parser can't tell which number was chosen.
     Returns the number as an integer or 'false' if no valid number found.
     """
+    number = parse_option_index(gpt_response)
+    if number is not None:
+        with _stats_lock:
+            _parser_stats['local'] += 1
+        return number
+
+    print("Local parser could not extract a number, falling back to GPT...")
+    with _stats_lock:
+        _parser_stats['llm_fallback'] += 1
     try:
-        message = f"""Extract ONLY the final chosen number from this GPT response. 
+        message = f"""Extract ONLY the final chosen number from this GPT response.
         Return ONLY the number, nothing else.
         If no clear number is chosen, return 'false'.
 
@@ -27,7 +137,7 @@ def extract_number_from_response(gpt_response):
         {gpt_response}
         """
 
-        response = client.chat.completions.create(
+        response = chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": message}],
             temperature=0.1
@@ -40,13 +150,17 @@ def extract_number_from_response(gpt_response):
         if extracted_answer == 'false':
             return 'false'
 
-        # Try to convert to integer
+        # Try to convert to integer; negative means no option was chosen
         try:
             number = int(extracted_answer)
-            return number
+            return number if number >= 0 else 'false'
         except ValueError:
+            with _stats_lock:
+                _parser_stats['unparsed'] += 1
             return 'false'
 
     except Exception as e:
         print(f"Error in number extraction: {e}")
+        with _stats_lock:
+            _parser_stats['unparsed'] += 1
         return 'false'
@@ -0,0 +1,234 @@
+from dotenv import load_dotenv
+from utils.profile.candidate_profile import load_profile
+import os
+import re
+import threading
+
+# Load environment variables
+load_dotenv()
+
+# Options scoring below this fall through to GPT
+MATCH_THRESHOLD = float(os.getenv('LOCAL_MATCH_THRESHOLD', '0.85'))
+# Best option must beat the runner-up by at least this much
+MATCH_MARGIN = 0.1
+
+# Phrases that mean the same answer. Checked in order, so negated forms
+# ("not a protected veteran") come before the positive ones.
+SYNONYMS = [
+    ('decline', [r"\bdecline", r"\bprefer not", r"\bdo(n'?t| not) (wish|want) to",
+                 r"\bchoose not to", r"\bnot to (answer|disclose|say)"]),
+    ('not_veteran', [r"\bnot (a )?(protected )?veteran", r"\bno military service",
+                     r"\bi am not a veteran", r"^no\b.*\bveteran"]),
+    ('veteran', [r"\bprotected veteran", r"\bi am a veteran",
+                 r"\bidentify as .*veteran", r"^yes\b.*\bveteran"]),
+    ('no_disability', [r"\bno disabilit", r"\bdo(n'?t| not) have a disability",
+                       r"^no\b.*\bdisabilit"]),
+    ('disability', [r"\bi have a disability", r"^yes\b.*\bdisabilit"]),
+    ('not_hispanic', [r"\bnot hispanic", r"\bnon[- ]hispanic"]),
+    ('hispanic', [r"\bhispanic or latino", r"^hispanic", r"^latino"]),
+    ('female', [r"^(female|woman)$", r"\bfemale\b", r"\bwoman\b"]),
+    ('male', [r"^(male|man)$", r"\bmale\b", r"\bman\b"]),
+    ('yes', [r"^(yes|y|true)\b"]),
+    ('no', [r"^(no|n|false)\b"])
+]
+
+STOPWORDS = {'a', 'an', 'the', 'i', 'am', 'of', 'or', 'and', 'to', 'in', 'my',
+             'is', 'are', 'be', 'as', 'for', 'one', 'more'}
+
+# Label keywords -> how to read the answer from the profile. Each rule
+# returns a list of candidate answer texts; yes/no rules are marked so a
+# label that hits two of them (e.g. "authorized without sponsorship") is
+# left to GPT.
+LABEL_RULES = [
+    (['hispanic', 'latino'], lambda p: _hispanic_answers(p), False),
+    (['sponsor', 'visa'], lambda p: _yes_no_from_line(p, 'authorization', 'sponsorship'), True),
+    (['authoriz', 'legally', 'eligib'], lambda p: _yes_no_from_line(p, 'authorization', 'authorized to work'), True),
+    (['veteran', 'military'], lambda p: _fact(p, 'Veteran Status'), False),
+    (['disabilit', 'disabled'], lambda p: _fact(p, 'Disability Status'), False),
+    (['gender', 'sex'], lambda p: _fact(p, 'Gender'), False),
+    (['pronoun'], lambda p: _fact(p, 'Pronouns'), False),
+    (['race', 'ethnic'], lambda p: _fact(p, 'Race/Ethnicity'), False),
+    (['relocat'], lambda p: _fact(p, 'Willing to relocate'), False),
+    (['citizen'], lambda p: _fact(p, 'Citizenship'), False),
+    (['clearance'], lambda p: _fact(p, 'Security Clearance'), False),
+    (['hear about', 'how did you hear', 'referral source', 'source'],
+     lambda p: _fact(p, 'How did you hear about us', 'Referral Source', 'Source'), False)
+]
+
+# How many fields the matcher resolved without an LLM call
+_matcher_stats = {
+    'resolved': 0,
+    'fallthrough': 0
+}
+_stats_lock = threading.Lock()
+
+
+def _normalize(text):
+    text = (text or '').lower().strip()
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip(' *:?.')
+
+
+def _tokens(text):
+    return {token for token in re.findall(r"[a-z0-9']+", _normalize(text))
+            if token not in STOPWORDS}
+
+
+def canonical_concept(text):
+    """Return the synonym concept a text belongs to, or None"""
+    normalized = _normalize(text)
+    for concept, patterns in SYNONYMS:
+        if any(re.search(pattern, normalized) for pattern in patterns):
+            return concept
+    return None
+
+
+def _fact(profile, *keys):
+    for key in keys:
+        if profile['facts'].get(key):
+            return [profile['facts'][key]]
+    return []
+
+
+def _yes_no_from_line(profile, group, phrase):
+    """Answer yes/no from a free-text line like 'Authorized to work in ...'"""
+    for line in profile['groups'].get(group, []):
+        lowered = line.lower()
+        if phrase in lowered:
+            if re.search(r"\b(not|no|don't|doesn't)\b", lowered):
+                return ['No', line]
+            return ['Yes', line]
+    return []
+
+
+def _hispanic_answers(profile):
+    for line in profile['groups'].get('eeo', []):
+        lowered = line.lower()
+        if 'hispanic' in lowered or 'latino' in lowered:
+            if re.search(r'\bnot\b', lowered):
+                return ['Not Hispanic or Latino', 'No']
+            return ['Hispanic or Latino', 'Yes']
+    return []
+
+
+def _generic_fact_answers(field_label, profile):
+    """Use a 'Key: Value' fact whose key closely matches the label"""
+    label_tokens = _tokens(field_label)
+    answers = []
+    for key, value in profile['facts'].items():
+        key_tokens = _tokens(key)
+        if key_tokens and len(key_tokens & label_tokens) / len(key_tokens) >= 0.75:
+            answers.append(value)
+    return answers
+
+
+def profile_answers(field_label, profile=None):
+    """
+    Return the answers the profile gives for a field label.
+
+    Args:
+        field_label: The label/question of the field
+        profile: Parsed profile, loaded from info.txt if not given
+
+    Returns:
+        list: Candidate answer texts, most specific first
+    """
+    profile = profile or load_profile()
+    label = _normalize(field_label)
+
+    matched = [(rule, yes_no) for keywords, rule, yes_no in LABEL_RULES
+               if any(re.search(r'\b' + re.escape(keyword), label) for keyword in keywords)]
+    if sum(1 for _, yes_no in matched if yes_no) > 1:
+        return []
+
+    for rule, _ in matched:
+        answers = rule(profile)
+        if answers:
+            return answers
+
+    return _generic_fact_answers(field_label, profile)
+
+
+def score_option(answer, option_text):
+    """
+    Score how well an option expresses an answer, from 0 to 1.
+
+    Exact normalized text scores 1.0, a shared synonym concept 0.95, and
+    anything else is scored by token-set overlap.
+    """
+    answer_norm = _normalize(answer)
+    option_norm = _normalize(option_text)
+    if not answer_norm or not option_norm:
+        return 0.0
+    if answer_norm == option_norm:
+        return 1.0
+
+    answer_concept = canonical_concept(answer_norm)
+    option_concept = canonical_concept(option_norm)
+    if answer_concept and option_concept:
+        return 0.95 if answer_concept == option_concept else 0.0
+
+    answer_tokens = _tokens(answer_norm)
+    option_tokens = _tokens(option_norm)
+    if not answer_tokens or not option_tokens:
+        return 0.0
+    overlap = len(answer_tokens & option_tokens)
+    containment = overlap / len(answer_tokens)
+    jaccard = overlap / len(answer_tokens | option_tokens)
+    return 0.5 * containment + 0.5 * jaccard
+
+
+def match_option(field_label, option_texts, profile=None):
+    """
+    Pick an option locally when the profile answers the field unambiguously.
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts
+        profile: Parsed profile, loaded from info.txt if not given
+
+    Returns:
+        tuple: (index, confidence); index is None when the match is below
+        MATCH_THRESHOLD and the field should go to GPT
+    """
+    answers = profile_answers(field_label, profile)
+    if not answers or not option_texts:
+        with _stats_lock:
+            _matcher_stats['fallthrough'] += 1
+        return None, 0.0
+
+    scores = []
+    for i, text in enumerate(option_texts):
+        scores.append((max(score_option(answer, text) for answer in answers), i))
+
+    # An option that is the only one containing every answer word is a
+    # confident match even if it has extra words ("Asian (Not Hispanic)")
+    for answer in answers:
+        answer_tokens = _tokens(answer)
+        containing = [i for i, text in enumerate(option_texts)
+                      if answer_tokens and answer_tokens <= _tokens(text)]
+        if len(containing) == 1:
+            i = containing[0]
+            scores[i] = (max(scores[i][0], MATCH_THRESHOLD), i)
+
+    scores.sort(reverse=True)
+    best_score, best_index = scores[0]
+    runner_up = scores[1][0] if len(scores) > 1 else 0.0
+
+    if best_score >= MATCH_THRESHOLD and best_score - runner_up >= MATCH_MARGIN:
+        with _stats_lock:
+            _matcher_stats['resolved'] += 1
+        return best_index, best_score
+
+    with _stats_lock:
+        _matcher_stats['fallthrough'] += 1
+    return None, best_score
+
+
+def get_matcher_stats():
+    """Return how many fields the local matcher resolved vs sent to GPT"""
+    with _stats_lock:
+        stats = dict(_matcher_stats)
+    total = stats['resolved'] + stats['fallthrough']
+    stats['resolve_rate'] = stats['resolved'] / total if total else 0.0
+    return stats
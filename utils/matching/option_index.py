@@ -0,0 +1,164 @@
+from dotenv import load_dotenv
+from collections import Counter
+import numpy as np
+import os
+import re
+import threading
+
+# Load environment variables
+load_dotenv()
+
+# How many options go into the GPT prompt for a long list
+SHORTLIST_SIZE = int(os.getenv('OPTION_SHORTLIST_SIZE', '20'))
+# Lists up to this long are sent whole
+SHORTLIST_MIN_OPTIONS = 2 * SHORTLIST_SIZE
+NGRAM_SIZE = 3
+
+# How much the shortlist cut prompts
+_shortlist_stats = {
+    'shortlisted': 0,
+    'options_in': 0,
+    'options_sent': 0
+}
+_stats_lock = threading.Lock()
+
+
+def _normalize(text):
+    text = re.sub(r'[^a-z0-9]+', ' ', (text or '').lower())
+    return text.strip()
+
+
+def _ngrams(text):
+    """Character n-grams of the normalized text, padded so word edges count"""
+    padded = f" {_normalize(text)} "
+    return [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+
+
+def build_option_index(option_texts):
+    """
+    Build a TF-IDF index of character n-grams over option texts.
+
+    The matrix is kept in coordinate form (one entry per option/n-gram pair)
+    with each option's row L2-normalized, so a dot product with a normalized
+    query is the cosine similarity.
+
+    Args:
+        option_texts: List of option texts
+
+    Returns:
+        dict: 'vocab' (n-gram -> column), 'idf', 'rows', 'cols', 'weights'
+        and 'size' (number of options)
+    """
+    vocab = {}
+    rows, cols, counts = [], [], []
+    for row, text in enumerate(option_texts):
+        for gram, count in Counter(_ngrams(text)).items():
+            rows.append(row)
+            cols.append(vocab.setdefault(gram, len(vocab)))
+            counts.append(count)
+
+    size = len(option_texts)
+    rows = np.array(rows, dtype=np.int64)
+    cols = np.array(cols, dtype=np.int64)
+    counts = np.array(counts, dtype=np.float64)
+
+    document_freq = np.bincount(cols, minlength=len(vocab))
+    idf = np.log((1 + size) / (1 + document_freq)) + 1
+    weights = (1 + np.log(counts)) * idf[cols]
+
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=size))
+    weights = weights / np.where(norms > 0, norms, 1)[rows]
+
+    return {
+        'vocab': vocab,
+        'idf': idf,
+        'rows': rows,
+        'cols': cols,
+        'weights': weights,
+        'size': size
+    }
+
+
+def score_options(index, query):
+    """
+    Cosine similarity of every option to a query text.
+
+    N-grams the options don't contain still count toward the query's norm,
+    so a long query that shares a few common n-grams scores low.
+
+    Returns:
+        numpy.ndarray: One score per option, from 0 to 1
+    """
+    vector = np.zeros(len(index['vocab']))
+    unseen_idf = np.log(1 + index['size']) + 1
+    norm = 0.0
+    for gram, count in Counter(_ngrams(query)).items():
+        col = index['vocab'].get(gram)
+        weight = (1 + np.log(count)) * (index['idf'][col] if col is not None else unseen_idf)
+        norm += weight ** 2
+        if col is not None:
+            vector[col] = weight
+
+    if not norm:
+        return np.zeros(index['size'])
+    products = index['weights'] * vector[index['cols']] / np.sqrt(norm)
+    return np.bincount(index['rows'], weights=products, minlength=index['size'])
+
+
+def rank_options(field_label, option_texts, profile_text):
+    """
+    Order options by similarity to the field label or a profile fact.
+
+    Each option is scored against the label and every line of the profile
+    text separately, keeping its best score, so one matching fact ("B.S.
+    Computer Science, UC Berkeley") isn't diluted by unrelated lines.
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts
+        profile_text: Profile facts relevant to the field, one per line
+
+    Returns:
+        list: Option indices, most similar first
+    """
+    index = build_option_index(option_texts)
+    queries = [field_label] + [line.strip(' -*\t') for line in (profile_text or '').splitlines()]
+    scores = np.zeros(len(option_texts))
+    for query in queries:
+        if query:
+            scores = np.maximum(scores, score_options(index, query))
+    return [int(i) for i in np.argsort(-scores, kind='stable')]
+
+
+def shortlist_options(field_label, option_texts, profile_text, size=SHORTLIST_SIZE):
+    """
+    Pick the options most similar to the field label or a profile fact.
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts
+        profile_text: Profile facts relevant to the field, one per line
+        size: How many options to keep
+
+    Returns:
+        list: Indices of the kept options in their original order; all
+        indices when the list has at most SHORTLIST_MIN_OPTIONS options
+    """
+    if len(option_texts) <= max(size, SHORTLIST_MIN_OPTIONS):
+        return list(range(len(option_texts)))
+
+    kept = rank_options(field_label, option_texts, profile_text)[:size]
+    with _stats_lock:
+        _shortlist_stats['shortlisted'] += 1
+        _shortlist_stats['options_in'] += len(option_texts)
+        _shortlist_stats['options_sent'] += len(kept)
+    return sorted(kept)
+
+
+def get_shortlist_stats():
+    """Return how many option lists were shortlisted and how far they were cut"""
+    with _stats_lock:
+        stats = dict(_shortlist_stats)
+    total = stats['options_in']
+    stats['reduction'] = 1 - stats['options_sent'] / total if total else 0.0
+    return stats
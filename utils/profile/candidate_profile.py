@@ -0,0 +1,237 @@
+import hashlib
+import os
+import re
+import threading
+
+PROFILE_PATH = 'info.txt'
+
+# Section headings used in info.txt
+KNOWN_SECTIONS = ['EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS',
+                  'CERTIFICATIONS', 'AWARDS', 'LEADERSHIP', 'PUBLICATIONS']
+
+# Keywords that put a profile line into a fact group
+FACT_GROUPS = {
+    'eeo': ['gender', 'pronoun', 'race', 'ethnicity', 'hispanic', 'latino',
+            'veteran', 'disabilit', 'age:'],
+    'authorization': ['authorized', 'sponsorship', 'visa', 'citizenship',
+                      'citizen', 'clearance', 'background check', 'drug test',
+                      "driver's license"],
+    'availability': ['available', 'availability', 'start', 'relocate', 'travel',
+                     'schedule', 'work location', 'overtime', 'weekend',
+                     'shift', 'salary'],
+    'languages': ['languages', 'english', 'mandarin', 'spanish'],
+    'certifications': ['certification', 'license', 'certified']
+}
+
+# Keywords in a field label that point at a fact group
+LABEL_TOPICS = {
+    'eeo': ['gender', 'sex', 'pronoun', 'race', 'ethnic', 'hispanic', 'latino',
+            'veteran', 'military', 'disabilit', 'disabled', 'age', 'identify',
+            'lgbt', 'transgender', 'orientation'],
+    'authorization': ['sponsor', 'visa', 'authoriz', 'eligib', 'legally',
+                      'citizen', 'clearance', 'work permit', 'background',
+                      'drug', 'license', 'immigration'],
+    'availability': ['start', 'available', 'availability', 'relocat', 'travel',
+                     'remote', 'hybrid', 'on-site', 'onsite', 'office',
+                     'schedule', 'shift', 'overtime', 'weekend', 'notice',
+                     'salary', 'compensation', 'full-time', 'part-time'],
+    'contact': ['phone', 'email', 'address', 'city', 'state', 'zip', 'postal',
+                'country', 'location', 'name', 'linkedin', 'github',
+                'website', 'reside', 'live'],
+    'languages': ['language', 'speak', 'fluent', 'bilingual'],
+    'certifications': ['certif', 'license'],
+    'education': ['school', 'university', 'college', 'degree', 'major',
+                  'education', 'gpa', 'discipline', 'graduat', 'study',
+                  'field of study', 'bachelor', 'master', 'phd'],
+    'experience': ['employer', 'company', 'experience', 'worked', 'work history',
+                   'current', 'title', 'position', 'role', 'years'],
+    'skills': ['skill', 'proficien', 'familiar', 'programming', 'knowledge of',
+               'tools', 'technolog', 'software', 'framework', 'expertise']
+}
+
+# Sections whose lines describe what the candidate can do
+SKILL_SECTIONS = ['EXPERIENCE', 'SKILLS', 'PROJECTS']
+
+STOPWORDS = {'a', 'an', 'the', 'you', 'your', 'are', 'is', 'do', 'does', 'of',
+             'in', 'to', 'for', 'and', 'or', 'on', 'at', 'be', 'we', 'our',
+             'this', 'that', 'with', 'have', 'has', 'will', 'what', 'which',
+             'please', 'select', 'if', 'any', 'by', 'as', 'us', 'who', 'how',
+             'yes', 'no', 'would', 'currently', 'now', 'future', 'require'}
+
+# Lines up to this long are headlines (job titles, dates, key: value facts);
+# longer ones are bullets
+MAX_HEADLINE_LENGTH = 100
+# Bullets kept when they share words with a label, best overlap first
+MAX_MATCHED_BULLETS = 3
+
+_profile = None
+_profile_lock = threading.Lock()
+
+
+def _tokens(text):
+    return {token for token in re.findall(r"[a-z0-9']+", text.lower())
+            if token not in STOPWORDS and len(token) > 1}
+
+
+def _is_section_heading(line):
+    stripped = line.strip()
+    return stripped in KNOWN_SECTIONS or (
+        stripped.isupper() and ':' not in stripped and len(stripped.split()) <= 2)
+
+
+def _classify_line(line):
+    """Return the fact groups a profile line belongs to"""
+    lowered = line.lower()
+    return [group for group, keywords in FACT_GROUPS.items()
+            if any(keyword in lowered for keyword in keywords)]
+
+
+def parse_profile(text):
+    """
+    Split the raw profile text into sections and key/value facts.
+
+    Args:
+        text: Contents of info.txt
+
+    Returns:
+        dict: 'text', 'sections' (name -> list of lines), 'facts'
+        (key -> value), 'groups' (group -> list of lines; 'skills' holds the
+        experience bullets and skill/project lines) and 'fingerprint'
+    """
+    sections = {'HEADER': []}
+    facts = {}
+    groups = {group: [] for group in
+              list(FACT_GROUPS) + ['contact', 'education', 'experience', 'skills']}
+
+    current_section = 'HEADER'
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if _is_section_heading(line):
+            current_section = line
+            sections.setdefault(current_section, [])
+            continue
+
+        # "Key: Value" lines are facts wherever they appear
+        if ':' in line and len(line) <= MAX_HEADLINE_LENGTH:
+            key, value = line.split(':', 1)
+            if key.strip() and value.strip():
+                facts[key.strip()] = value.strip()
+
+        sections.setdefault(current_section, []).append(line)
+
+        is_headline = len(line) <= MAX_HEADLINE_LENGTH
+        if current_section in SKILL_SECTIONS and (
+                current_section != 'EXPERIENCE' or not is_headline):
+            groups['skills'].append(line)
+
+        if current_section == 'HEADER':
+            groups['contact'].append(line)
+        elif current_section == 'EDUCATION' and not _classify_line(line):
+            groups['education'].append(line)
+        elif current_section == 'EXPERIENCE':
+            if is_headline:
+                groups['experience'].append(line)
+            continue
+
+        if is_headline:
+            for group in _classify_line(line):
+                groups[group].append(line)
+
+    return {
+        'text': text,
+        'sections': sections,
+        'facts': facts,
+        'groups': groups,
+        'fingerprint': hashlib.sha1(text.encode('utf-8')).hexdigest()
+    }
+
+
+def load_profile(path=PROFILE_PATH):
+    """
+    Return the parsed profile, re-reading the file only when its mtime changes.
+
+    Args:
+        path: Path to the profile text file
+
+    Returns:
+        dict: The parsed profile (see parse_profile), or an empty profile if
+        the file can't be read
+    """
+    global _profile
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError as e:
+        print(f"Error reading {path}: {e}")
+        return parse_profile('')
+
+    with _profile_lock:
+        if (_profile is None or _profile['path'] != path
+                or _profile['mtime'] != mtime):
+            with open(path, 'r') as f:
+                profile = parse_profile(f.read())
+            profile['path'] = path
+            profile['mtime'] = mtime
+            _profile = profile
+        return _profile
+
+
+def get_profile_text(path=PROFILE_PATH):
+    """Return the full profile text"""
+    return load_profile(path)['text']
+
+
+def get_profile_fingerprint(path=PROFILE_PATH):
+    """Return a hash of the profile contents, for cache keys"""
+    return load_profile(path)['fingerprint']
+
+
+def get_relevant_facts(field_label, path=PROFILE_PATH):
+    """
+    Return only the profile lines relevant to a field label.
+
+    Lines are picked by topic (e.g. a "Veteran Status" label pulls the EEO
+    facts, "Programming languages" the experience bullets) and by word
+    overlap with the label: every matching headline, plus the
+    MAX_MATCHED_BULLETS longer lines sharing the most words (so "Experience
+    with AWS?" finds the bullet mentioning AWS). If nothing matches, the
+    whole profile is returned so the caller never loses context.
+
+    Args:
+        field_label: The label/question of the field
+        path: Path to the profile text file
+
+    Returns:
+        str: Newline-separated profile lines
+    """
+    profile = load_profile(path)
+    label = (field_label or '').lower()
+
+    selected = []
+    for topic, keywords in LABEL_TOPICS.items():
+        if any(re.search(r'\b' + re.escape(keyword), label) for keyword in keywords):
+            selected.extend(profile['groups'].get(topic, []))
+
+    label_tokens = _tokens(label)
+    if label_tokens:
+        bullets = []
+        for lines in profile['sections'].values():
+            for line in lines:
+                overlap = len(label_tokens & _tokens(line))
+                if not overlap:
+                    continue
+                if len(line) <= MAX_HEADLINE_LENGTH:
+                    selected.append(line)
+                else:
+                    bullets.append((overlap, line))
+        bullets.sort(key=lambda bullet: -bullet[0])
+        selected.extend(line for _, line in bullets[:MAX_MATCHED_BULLETS])
+
+    if not selected:
+        return profile['text']
+
+    # Keep the header (name and contact line) for context, drop duplicates
+    header = profile['sections'].get('HEADER', [])[:1]
+    return '\n'.join(dict.fromkeys(header + selected))
@@ -0,0 +1,279 @@
+from utils.profile.candidate_profile import load_profile
+from bisect import bisect_left
+import difflib
+import json
+import os
+import re
+import threading
+import unicodedata
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Reference datasets: data file and the profile groups their facts come from
+DATASETS = {
+    'country': {'file': 'countries.json', 'groups': ['authorization', 'contact']},
+    'us_state': {'file': 'us_states.json', 'groups': ['contact']},
+    'university': {'file': 'universities.json', 'groups': ['education']},
+    'degree': {'file': 'degrees.json', 'groups': ['education']}
+}
+
+# Label keywords -> dataset, checked in order ("Degree" before "School")
+LABEL_KINDS = [
+    ('degree', ['degree', 'level of education', 'education level']),
+    ('university', ['school', 'university', 'college', 'institution', 'alma mater']),
+    ('us_state', ['state', 'province']),
+    ('country', ['country', 'nation'])
+]
+
+# Options this similar to a known name count as that entity
+FUZZY_THRESHOLD = 0.9
+# Shortest search term worth typing
+MIN_SEARCH_TERM = 3
+
+_gazetteers = {}
+_gazetteer_lock = threading.Lock()
+
+# How many fields were answered or searched from reference data
+_reference_stats = {
+    'matched': 0,
+    'search_terms': 0,
+    'unresolved': 0
+}
+_stats_lock = threading.Lock()
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"['’]", '', text.lower())
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def _is_abbreviation(alias):
+    """Capitalized short forms like 'US', 'U.S.' or 'UCLA'"""
+    letters = alias.replace('.', '')
+    return letters.isalpha() and letters.isupper() and len(letters) <= 5
+
+
+def _build_gazetteer(entries):
+    """
+    Index a dataset for lookups by alias and by search-term prefix.
+
+    Codes (ISO, postal) only identify options; free text is matched on
+    names and aliases, with capitalized short forms kept case-sensitive so
+    'us' or 'ca' in a sentence isn't read as a country or state.
+
+    Returns:
+        dict: 'entries', 'options' (normalized alias or code -> entry
+        indices), 'phrases' (normalized alias -> entry index, unambiguous
+        ones only), 'abbreviations' (list of (regex, entry index)), 'names'
+        (entry index -> set of normalized aliases) and 'suffixes' (sorted
+        (lowercase name from a word start, entry index) pairs)
+    """
+    gazetteer = {'entries': entries, 'options': {}, 'phrases': {},
+                 'abbreviations': [], 'names': [], 'suffixes': []}
+    owners = {}
+    for index, entry in enumerate(entries):
+        names = set()
+        for alias in [entry['name']] + entry.get('aliases', []):
+            normalized = _normalize(alias)
+            names.add(normalized)
+            owners.setdefault(normalized, set()).add(index)
+            if _is_abbreviation(alias):
+                pattern = r'(?<![A-Za-z])' + re.escape(alias) + r'(?![A-Za-z])'
+                gazetteer['abbreviations'].append((re.compile(pattern), index))
+        for code in ('iso2', 'iso3', 'code'):
+            if code in entry:
+                names.add(_normalize(entry[code]))
+        gazetteer['names'].append(names)
+        for name in names:
+            gazetteer['options'].setdefault(name, set()).add(index)
+
+        lowered = entry['name'].lower()
+        for match in re.finditer(r'\b\w', lowered):
+            gazetteer['suffixes'].append((lowered[match.start():], index))
+
+    abbreviated = {_normalize(entry_alias) for entry in entries
+                   for entry_alias in entry.get('aliases', []) if _is_abbreviation(entry_alias)}
+    gazetteer['phrases'] = {alias: next(iter(indices)) for alias, indices in owners.items()
+                            if len(indices) == 1 and alias not in abbreviated}
+    gazetteer['suffixes'].sort()
+    return gazetteer
+
+
+def load_gazetteer(kind):
+    """Return the indexed dataset for a kind, loading it on first use"""
+    with _gazetteer_lock:
+        if kind not in _gazetteers:
+            with open(os.path.join(DATA_DIR, DATASETS[kind]['file']), encoding='utf-8') as f:
+                _gazetteers[kind] = _build_gazetteer(json.load(f))
+        return _gazetteers[kind]
+
+
+def detect_reference_kind(field_label):
+    """Return the dataset a field label asks about, or None"""
+    label = _normalize(field_label)
+    for kind, keywords in LABEL_KINDS:
+        if any(re.search(r'\b' + re.escape(keyword) + r'\b', label) for keyword in keywords):
+            return kind
+    return None
+
+
+def resolve_entity(kind, text):
+    """
+    Find the entity a line of text mentions, e.g. 'Authorized to work in
+    the United States' -> United States. The longest alias found wins.
+
+    Returns:
+        int: Entry index in the dataset, or None
+    """
+    gazetteer = load_gazetteer(kind)
+    padded = f" {_normalize(text)} "
+    best, best_length = None, 0
+    for alias, index in gazetteer['phrases'].items():
+        if len(alias) > best_length and f" {alias} " in padded:
+            best, best_length = index, len(alias)
+
+    for pattern, index in gazetteer['abbreviations']:
+        match = pattern.search(text or '')
+        if match and len(match.group(0)) > best_length:
+            best, best_length = index, len(match.group(0))
+    return best
+
+
+def profile_entity(kind, profile=None):
+    """Return the entry index the profile gives for a dataset, or None"""
+    profile = profile or load_profile()
+    for group in DATASETS[kind]['groups']:
+        for line in profile['groups'].get(group, []):
+            index = resolve_entity(kind, line)
+            if index is not None:
+                return index
+    return None
+
+
+def _find_option(gazetteer, index, option_texts):
+    """
+    Return the option naming an entry: an exact alias or code first, then
+    the shortest option containing one of its names ("United States (+1)"),
+    then a close spelling. Options that exactly name another entry are
+    never taken.
+    """
+    names = gazetteer['names'][index]
+    normalized = [_normalize(text) for text in option_texts]
+
+    exact = [i for i, text in enumerate(normalized) if text in names]
+    if exact:
+        canonical = _normalize(gazetteer['entries'][index]['name'])
+        return next((i for i in exact if normalized[i] == canonical), exact[0])
+
+    others = [i for i, text in enumerate(normalized)
+              if text and text not in gazetteer['options']]
+    phrases = [name for name in names if gazetteer['phrases'].get(name) == index]
+    containing = [i for i in others
+                  if any(f" {name} " in f" {normalized[i]} " for name in phrases)]
+    if containing:
+        return min(containing, key=lambda i: len(normalized[i]))
+
+    best, best_ratio = None, FUZZY_THRESHOLD
+    for i in others:
+        for name in phrases:
+            matcher = difflib.SequenceMatcher(None, normalized[i], name)
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = i, ratio
+    return best
+
+
+def find_reference_option(field_label, option_texts, profile=None):
+    """
+    Answer a country, state, university or degree field from bundled
+    reference data, without an LLM call.
+
+    A degree that isn't among the options falls back to its broader degree
+    (e.g. "Bachelor of Science" -> "Bachelor's Degree").
+
+    Args:
+        field_label: The label/question of the field
+        option_texts: List of option texts
+        profile: Parsed profile, loaded from info.txt if not given
+
+    Returns:
+        int: Index of the matching option, or None
+    """
+    kind = detect_reference_kind(field_label)
+    if not kind or not option_texts:
+        return None
+
+    gazetteer = load_gazetteer(kind)
+    index = profile_entity(kind, profile)
+    while index is not None:
+        option = _find_option(gazetteer, index, option_texts)
+        if option is not None:
+            with _stats_lock:
+                _reference_stats['matched'] += 1
+            return option
+        parent = gazetteer['entries'][index].get('parent')
+        index = next((i for i, entry in enumerate(gazetteer['entries'])
+                      if entry['name'] == parent), None)
+
+    with _stats_lock:
+        _reference_stats['unresolved'] += 1
+    return None
+
+
+def shortest_search_term(kind, index):
+    """
+    Return the shortest text that starts a word of the entry's name and no
+    other entry's name, e.g. 'dav' for University of California, Davis.
+    Falls back to the full name when every prefix is shared.
+    """
+    gazetteer = load_gazetteer(kind)
+    suffixes = gazetteer['suffixes']
+    name = gazetteer['entries'][index]['name'].lower()
+
+    best = name
+    for match in re.finditer(r'\b\w', name):
+        for end in range(match.start() + MIN_SEARCH_TERM, len(name) + 1):
+            term = name[match.start():end]
+            if end - match.start() >= len(best):
+                break
+            if term[-1].isspace():
+                continue
+            start = bisect_left(suffixes, (term,))
+            owners = set()
+            for suffix, owner in suffixes[start:]:
+                if not suffix.startswith(term):
+                    break
+                owners.add(owner)
+                if len(owners) > 1:
+                    break
+            if owners == {index}:
+                best = term
+                break
+    return best
+
+
+def reference_search_term(field_label, profile=None):
+    """
+    Return a search term to type into a country, state, university or
+    degree dropdown, or None if the field isn't one or the profile doesn't
+    say.
+    """
+    kind = detect_reference_kind(field_label)
+    if not kind:
+        return None
+    index = profile_entity(kind, profile)
+    if index is None:
+        return None
+    with _stats_lock:
+        _reference_stats['search_terms'] += 1
+    return shortest_search_term(kind, index)
+
+
+def get_reference_stats():
+    """Return how many fields were answered or searched from reference data"""
+    with _stats_lock:
+        return dict(_reference_stats)
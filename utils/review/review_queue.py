@@ -0,0 +1,67 @@
+from datetime import datetime
+import json
+import threading
+
+# When set, fields GPT can't decide are written here instead of prompting
+_queue_state = {'path': None}
+_write_lock = threading.Lock()
+# Items queued by the job running on the current thread
+_current_job = threading.local()
+
+
+def enable_review_queue(path):
+    """Queue undecidable fields to a JSONL file instead of asking on stdin"""
+    _queue_state['path'] = path
+
+
+def start_review_job(url):
+    """Start collecting review items for the URL processed on this thread"""
+    _current_job.url = url
+    _current_job.items = []
+
+
+def finish_review_job():
+    """Return the review items queued on this thread since start_review_job"""
+    items = getattr(_current_job, 'items', [])
+    _current_job.items = []
+    return items
+
+
+def ask_for_option(page, element, new_elements, reason):
+    """
+    Ask which option to click when GPT can't pick one.
+
+    In interactive mode this prompts on stdin. With a review queue enabled
+    the field and its options are queued for a human and 'q' is returned,
+    so the run moves on to the next field instead of blocking.
+
+    Args:
+        page: Playwright page
+        element: Field dict being filled
+        new_elements: Options shown for the field
+        reason: Why manual selection is needed
+
+    Returns:
+        str: A 1-based option number or 'q' to give up on the field
+    """
+    if not _queue_state['path']:
+        return input("\nEnter number to click an element or 'q' to quit: ")
+
+    item = {
+        'url': getattr(_current_job, 'url', None) or page.url,
+        'page_url': page.url,
+        'label': element['label'],
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or '',
+        'reason': reason,
+        'options': [el['textContent'] for el in new_elements],
+        'queued_at': datetime.now().isoformat(timespec='seconds')
+    }
+    with _write_lock:
+        with open(_queue_state['path'], 'a') as f:
+            f.write(json.dumps(item) + "\n")
+    if hasattr(_current_job, 'items'):
+        _current_job.items.append(item)
+
+    print(f"Queued '{element['label']}' for human review")
+    return 'q'
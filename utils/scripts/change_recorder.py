@@ -0,0 +1,42 @@
+from utils.scripts.page_helpers import call_helper
+
+
+def arm_change_recorder(page):
+    """
+    Start recording DOM changes in the page with a MutationObserver.
+
+    Call this right before the action (click, typing) whose effect you want
+    to see, then call collect_changes afterwards.
+
+    Args:
+        page: Playwright page
+    """
+    call_helper(page, 'arm')
+
+
+def collect_changes(page, element, include_containers=False, max_nodes=2000):
+    """
+    Return the clickable elements that were added or became visible since
+    arm_change_recorder was called, and stop recording. Elements that were
+    already visible when the recorder was armed aren't reported, even if
+    their attributes changed (e.g. an open list being re-styled).
+
+    Args:
+        page: Playwright page
+        element: The field dict that was clicked/typed into; changes to it
+            and its ancestors are ignored
+        include_containers: Also report the current children of containers
+            whose child list or text changed. Needed after typing a search
+            term, where a filtered list keeps its existing option nodes.
+        max_nodes: Max nodes inspected
+
+    Returns:
+        list: Element details (tag, id, classes, textContent, ariaAttributes,
+        dimensions, hasMouseListeners), or an empty list if nothing changed
+    """
+    return call_helper(page, 'collect', {
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or '',
+        'includeContainers': include_containers,
+        'maxNodes': max_nodes
+    })
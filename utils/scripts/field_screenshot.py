@@ -0,0 +1,148 @@
+from dotenv import load_dotenv
+from utils.scripts.page_helpers import call_helper
+from PIL import Image
+from io import BytesIO
+import os
+import threading
+
+# Load environment variables
+load_dotenv()
+
+# Pixels of context kept around the field
+CLIP_MARGIN = 16
+# Captures wider than this are downscaled before upload
+MAX_IMAGE_WIDTH = int(os.getenv('VISION_MAX_WIDTH', '512'))
+# 'jpeg', 'png' or 'webp'
+IMAGE_FORMAT = os.getenv('VISION_IMAGE_FORMAT', 'jpeg').lower()
+IMAGE_QUALITY = 70
+
+_screenshot_stats = {
+    'captures': 0,
+    'bytes': 0,
+    'full_viewport': 0
+}
+_stats_lock = threading.Lock()
+
+
+def _field_clip(page, element):
+    """Clip rect around the field in viewport coordinates, or None if it isn't visible"""
+    rect = call_helper(page, 'fieldRect', {
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or ''
+    })
+    if not rect:
+        return None
+
+    left = max(0, rect['x'] - CLIP_MARGIN)
+    top = max(0, rect['y'] - CLIP_MARGIN)
+    right = min(rect['viewportWidth'], rect['x'] + rect['width'] + CLIP_MARGIN)
+    bottom = min(rect['viewportHeight'], rect['y'] + rect['height'] + CLIP_MARGIN)
+    if right - left < 1 or bottom - top < 1:
+        return None
+    return {'x': left, 'y': top, 'width': right - left, 'height': bottom - top}
+
+
+def capture_field_image(page, element):
+    """
+    Screenshot just a field and a small margin around it, in memory.
+
+    The image is captured at CSS pixel scale and, when it's no wider than
+    MAX_IMAGE_WIDTH and the format is JPEG or PNG, comes straight from the
+    browser without being decoded again. Wider captures (and WebP) are
+    resized and encoded once with PIL. If the field can't be located, the
+    visible viewport is captured instead.
+
+    Args:
+        page: Playwright page
+        element: Field dict from analyze_form_fields
+
+    Returns:
+        tuple: (image bytes, MIME type)
+    """
+    clip = _field_clip(page, element)
+    if clip is None:
+        with _stats_lock:
+            _screenshot_stats['full_viewport'] += 1
+        width = (page.viewport_size or {}).get('width', MAX_IMAGE_WIDTH + 1)
+    else:
+        width = clip['width']
+
+    if width <= MAX_IMAGE_WIDTH and IMAGE_FORMAT in ('jpeg', 'png'):
+        options = {'quality': IMAGE_QUALITY} if IMAGE_FORMAT == 'jpeg' else {}
+        image = page.screenshot(clip=clip, type=IMAGE_FORMAT, scale='css', **options)
+    else:
+        raw = page.screenshot(clip=clip, type='png', scale='css')
+        with Image.open(BytesIO(raw)) as picture:
+            image = _encode(picture)
+
+    with _stats_lock:
+        _screenshot_stats['captures'] += 1
+        _screenshot_stats['bytes'] += len(image)
+    return image, f"image/{IMAGE_FORMAT}"
+
+
+def _encode(picture):
+    """Downscale a PIL image to MAX_IMAGE_WIDTH and encode it as IMAGE_FORMAT"""
+    if picture.width > MAX_IMAGE_WIDTH:
+        height = max(1, round(picture.height * MAX_IMAGE_WIDTH / picture.width))
+        picture = picture.resize((MAX_IMAGE_WIDTH, height), Image.LANCZOS)
+    if IMAGE_FORMAT == 'jpeg':
+        picture = picture.convert('RGB')
+    buffer = BytesIO()
+    picture.save(buffer, format=IMAGE_FORMAT.upper(), quality=IMAGE_QUALITY)
+    return buffer.getvalue()
+
+
+def capture_field_images(page, elements):
+    """
+    Images of several fields from a single full-page screenshot.
+
+    The page is captured once and each field's box (plus CLIP_MARGIN) is
+    cropped out of it, so nothing is scrolled and the browser renders one
+    image however many fields there are. A single field uses
+    capture_field_image instead.
+
+    Args:
+        page: Playwright page
+        elements: List of field dicts from analyze_form_fields
+
+    Returns:
+        list: (image bytes, MIME type) per field, or None for fields that
+        couldn't be located
+    """
+    if len(elements) == 1:
+        return [capture_field_image(page, elements[0])]
+
+    rects = call_helper(page, 'fieldRects', [{
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or ''
+    } for element in elements])
+    if not any(rects):
+        return [None] * len(elements)
+
+    images = []
+    raw = page.screenshot(full_page=True, type='png', scale='css')
+    with Image.open(BytesIO(raw)) as picture:
+        for rect in rects:
+            if not rect:
+                images.append(None)
+                continue
+            box = (max(0, int(rect['x'] - CLIP_MARGIN)),
+                   max(0, int(rect['y'] - CLIP_MARGIN)),
+                   min(picture.width, int(rect['x'] + rect['width'] + CLIP_MARGIN)),
+                   min(picture.height, int(rect['y'] + rect['height'] + CLIP_MARGIN)))
+            if box[2] <= box[0] or box[3] <= box[1]:
+                images.append(None)
+                continue
+            image = _encode(picture.crop(box))
+            with _stats_lock:
+                _screenshot_stats['captures'] += 1
+                _screenshot_stats['bytes'] += len(image)
+            images.append((image, f"image/{IMAGE_FORMAT}"))
+    return images
+
+
+def get_screenshot_stats():
+    """Return how many field images were captured and their total size"""
+    with _stats_lock:
+        return dict(_screenshot_stats)
@@ -0,0 +1,35 @@
+from utils.scripts.page_helpers import call_helper
+
+
+def watch_fields(page, fields):
+    """
+    Track which fields' DOM subtrees change and whether new form controls
+    appear, so only those fields need re-verifying after a fill.
+
+    A field counts as changed when a mutation happens inside it or inside
+    its wrapper (up to 3 ancestors, which holds the selected value of most
+    custom dropdowns). Calling this again replaces the previous watch.
+
+    Args:
+        page: Playwright page
+        fields: List of field dicts from analyze_form_fields
+    """
+    call_helper(page, 'watch', [{
+        'id': field['attributes'].get('id') or '',
+        'xpath': field.get('xpath') or ''
+    } for field in fields])
+
+
+def take_field_changes(page):
+    """
+    Return the changes seen since the last call and start a new window.
+
+    The subtrees that added form controls are kept in the page for
+    analyze_revealed_fields, until the next call.
+
+    Returns:
+        dict: 'dirty' (indices of fields whose subtree changed), 'detached'
+        (indices of fields no longer in the DOM) and 'revealed' (True if new
+        form controls were added)
+    """
+    return call_helper(page, 'takeChanges')
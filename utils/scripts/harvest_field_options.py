@@ -0,0 +1,28 @@
+from utils.scripts.page_helpers import call_helper
+
+
+def harvest_field_options(page, fields):
+    """
+    Read the options of every field that exposes them without being opened.
+
+    Native selects always have their <option> list in the DOM; custom
+    dropdowns only do if their listbox (aria-controls/aria-owns or the
+    React-Select listbox) is already rendered.
+
+    Args:
+        page: Playwright page
+        fields: List of field dicts from analyze_form_fields
+
+    Returns:
+        list: One list of option texts per field (empty if not known)
+    """
+    params = [{
+        'id': field['attributes'].get('id') or '',
+        'xpath': field.get('xpath') or ''
+    } for field in fields]
+
+    try:
+        return call_helper(page, 'options', params)
+    except Exception as e:
+        print(f"Error harvesting field options: {e}")
+        return [[] for _ in fields]
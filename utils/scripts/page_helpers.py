@@ -0,0 +1,894 @@
+import threading
+import weakref
+
+# Bump when HELPERS_JS changes so pages holding an older copy reinstall it
+HELPERS_VERSION = 10
+
+# Helper library installed once per page as window.__adf. Python calls short
+# entry points (__adf.scan(), __adf.verify(fields), __adf.options(fields), ...)
+# instead of shipping and compiling the full source on every evaluate.
+HELPERS_JS = '''(() => {
+    const VERSION = ''' + str(HELPERS_VERSION) + ''';
+    if (window.__adf && window.__adf.version === VERSION) return;
+
+    // Find a field by id, then XPath, then (optionally) its label.
+    // labelCandidates is a cache shared by one batch of lookups.
+    function findField(info, labelCandidates) {
+        if (info.id) {
+            const el = document.getElementById(info.id);
+            if (el) return { method: 'id', element: el };
+        }
+        if (info.xpath) {
+            const el = document.evaluate(info.xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (el) return { method: 'xpath', element: el };
+        }
+        if (info.label && labelCandidates) {
+            if (!labelCandidates.length) {
+                document.querySelectorAll('[role="combobox"], [role="listbox"], select, input').forEach(e => {
+                    labelCandidates.push({
+                        element: e,
+                        ariaLabel: e.getAttribute('aria-label'),
+                        labelText: e.id ? (document.querySelector(`label[for="${CSS.escape(e.id)}"]`)?.textContent || '') : ''
+                    });
+                });
+            }
+            const match = labelCandidates.find(c => c.ariaLabel === info.label || c.labelText.includes(info.label));
+            if (match) return { method: 'role_label', element: match.element };
+        }
+        return null;
+    }
+
+    // Groups candidate elements that belong to the same field: elements within
+    // 50px of each other (left or right edge, and top or bottom edge), or that
+    // share an ancestor with fewer than 20 descendants. Rects are read once and
+    // bucketed into a uniform grid, and each element's highest small ancestor is
+    // precomputed, so only nearby pairs are compared instead of every pair.
+
+    function groupElements(elements) {
+        const CELL = 50;
+        const MAX_ANCESTOR_SIZE = 20;
+        const rects = elements.map(el => el.getBoundingClientRect());
+
+        // Descendant counts, capped at MAX_ANCESTOR_SIZE
+        const sizes = new Map();
+        function cappedSize(node) {
+            if (sizes.has(node)) return sizes.get(node);
+            const walker = document.createTreeWalker(node, NodeFilter.SHOW_ELEMENT);
+            let count = 0;
+            while (count < MAX_ANCESTOR_SIZE && walker.nextNode()) count++;
+            sizes.set(node, count);
+            return count;
+        }
+
+        // Highest ancestor (or self) with fewer than MAX_ANCESTOR_SIZE
+        // descendants. Two elements have a small common ancestor exactly
+        // when these are the same node.
+        const smallRoots = elements.map(el => {
+            let root = null;
+            let node = el;
+            while (node && cappedSize(node) < MAX_ANCESTOR_SIZE) {
+                root = node;
+                node = node.parentElement;
+            }
+            return root;
+        });
+        const byRoot = new Map();
+        smallRoots.forEach((root, i) => {
+            if (!root) return;
+            if (!byRoot.has(root)) byRoot.set(root, []);
+            byRoot.get(root).push(i);
+        });
+
+        // One grid per edge pairing; two close elements share a cell or a
+        // neighbouring cell in at least one of them
+        const corners = [['left', 'top'], ['left', 'bottom'], ['right', 'top'], ['right', 'bottom']];
+        const cellKey = (x, y) => Math.floor(x / CELL) + ',' + Math.floor(y / CELL);
+        const grids = corners.map(([x, y]) => {
+            const grid = new Map();
+            rects.forEach((rect, i) => {
+                const key = cellKey(rect[x], rect[y]);
+                if (!grid.has(key)) grid.set(key, []);
+                grid.get(key).push(i);
+            });
+            return grid;
+        });
+
+        function isRelated(i, j) {
+            const a = rects[i];
+            const b = rects[j];
+            const closeHorizontally = Math.abs(a.left - b.left) < CELL ||
+                                      Math.abs(a.right - b.right) < CELL;
+            const closeVertically = Math.abs(a.top - b.top) < CELL ||
+                                    Math.abs(a.bottom - b.bottom) < CELL;
+            return (closeHorizontally && closeVertically) ||
+                   (smallRoots[i] !== null && smallRoots[i] === smallRoots[j]);
+        }
+
+        function candidates(i) {
+            const found = new Set(smallRoots[i] ? byRoot.get(smallRoots[i]) : []);
+            corners.forEach(([x, y], c) => {
+                for (let dx = -CELL; dx <= CELL; dx += CELL) {
+                    for (let dy = -CELL; dy <= CELL; dy += CELL) {
+                        const cell = grids[c].get(cellKey(rects[i][x] + dx, rects[i][y] + dy));
+                        if (cell) cell.forEach(j => found.add(j));
+                    }
+                }
+            });
+            return found;
+        }
+
+        // Same greedy grouping as comparing every pair in page order
+        const used = new Array(elements.length).fill(false);
+        const groups = [];
+        elements.forEach((el, i) => {
+            if (used[i]) return;
+            used[i] = true;
+            const members = [i];
+            Array.from(candidates(i))
+                .filter(j => !used[j] && isRelated(i, j))
+                .sort((a, b) => a - b)
+                .forEach(j => {
+                    used[j] = true;
+                    members.push(j);
+                });
+            groups.push(members.map(j => elements[j]));
+        });
+        return groups;
+    }
+
+    // Find, group and describe all form fields (analyze_form_fields), or only
+    // those inside roots. With tracked (the watched field elements) each
+    // field also gets 'after': the index of the last tracked field before it
+    // in page order, or -1.
+    function scan(roots, tracked) {
+        function queryAll(selector) {
+            if (!roots) return Array.from(document.querySelectorAll(selector));
+            const found = new Set();
+            roots.forEach(root => {
+                if (root.matches(selector)) found.add(root);
+                root.querySelectorAll(selector).forEach(el => found.add(el));
+            });
+            return Array.from(found);
+        }
+
+        function getFieldDetails(el) {
+            // Find label text from related elements first
+            const getLabelFromRelated = (el) => {
+                // Find all related label elements
+                const labels = el.querySelectorAll('label');
+                if (labels.length > 0) {
+                    // Return the text content of the first label found
+                    return labels[0].textContent.trim();
+                }
+                return null;
+            };
+
+            // Get label through multiple methods
+            const getLabel = (el) => {
+                // Check explicit label with proper CSS escaping
+                if (el.id) {
+                    try {
+                        // CSS.escape is the proper way to escape IDs for CSS selectors
+                        const escapedId = CSS.escape(el.id);
+                        const explicitLabel = document.querySelector(`label[for="${escapedId}"]`);
+                        if (explicitLabel) return explicitLabel.textContent.trim();
+                    } catch (e) {
+                        // If selector fails, try alternative methods
+                        console.log("Error finding label by ID, trying alternatives");
+                    }
+                }
+
+                // Rest of the existing label finding logic
+                // Check aria-label
+                if (el.getAttribute('aria-label')) 
+                    return el.getAttribute('aria-label').trim();
+
+                // Check parent label
+                let parent = el.parentElement;
+                while (parent && parent !== document.body) {
+                    if (parent.tagName === 'LABEL') 
+                        return parent.textContent.trim();
+                    const labelChild = parent.querySelector('label');
+                    if (labelChild) 
+                        return labelChild.textContent.trim();
+                    parent = parent.parentElement;
+                }
+
+                // Check for preceding text that might be a label
+                const prevSibling = el.previousSibling;
+                if (prevSibling && prevSibling.textContent) {
+                    return prevSibling.textContent.trim();
+                }
+
+                return el.placeholder || el.name || '';
+            };
+
+            // Wrap the entire function in try-catch to ensure it never fails completely
+            try {
+                const relatedLabel = getLabelFromRelated(el);
+                return {
+                    type: el.tagName.toLowerCase(),
+                    label: relatedLabel || getLabel(el),
+                    value: el.value || '',
+                    isEmpty: !el.value,
+                    isRequired: el.required || el.getAttribute('aria-required') === 'true',
+                    isVisible: el.offsetParent !== null,
+                    isEnabled: !el.disabled,
+                    xpath: getXPath(el),
+                    attributes: {
+                        id: el.id,
+                        name: el.name,
+                        class: el.className,
+                        role: el.getAttribute('role'),
+                        'aria-label': el.getAttribute('aria-label'),
+                        'aria-controls': el.getAttribute('aria-controls'),
+                        'aria-expanded': el.getAttribute('aria-expanded'),
+                        placeholder: el.placeholder
+                    }
+                };
+            } catch (e) {
+                // If anything fails, return a minimal valid object
+                console.log("Error in getFieldDetails, returning minimal info");
+                return {
+                    type: el.tagName ? el.tagName.toLowerCase() : 'unknown',
+                    label: '',
+                    value: '',
+                    isEmpty: true,
+                    isRequired: false,
+                    isVisible: true,
+                    isEnabled: true,
+                    xpath: '',
+                    attributes: {
+                        id: '',
+                        name: '',
+                        class: '',
+                        role: '',
+                        'aria-label': '',
+                        'aria-controls': '',
+                        'aria-expanded': null,
+                        placeholder: ''
+                    }
+                };
+            }
+        }
+
+        function getXPath(el) {
+            const parts = [];
+            while (el && el.nodeType === Node.ELEMENT_NODE) {
+                let idx = 0;
+                let sibling = el.previousSibling;
+                while (sibling) {
+                    if (sibling.nodeType === Node.ELEMENT_NODE && sibling.tagName === el.tagName) {
+                        idx++;
+                    }
+                    sibling = sibling.previousSibling;
+                }
+                const position = idx ? `[${idx + 1}]` : '';
+                parts.unshift(el.tagName.toLowerCase() + position);
+                el = el.parentNode;
+            }
+            return '/' + parts.join('/');
+        }
+
+        // First find all select fields (both native and custom)
+        const selectElements = queryAll('select, [role="listbox"], [role="combobox"], [class*="select"], [class*="dropdown"]')
+            .filter(el => {
+                const style = window.getComputedStyle(el);
+                // Be more lenient with visibility checks for select elements
+                return style.display !== 'none' && 
+                       style.visibility !== 'hidden' &&
+                       (el.tagName.toLowerCase() === 'select' || // Always include native select
+                        (style.opacity !== '0' && el.offsetParent !== null)); // Check others
+            });
+
+        // Then get all other form elements
+        const selectSet = new Set(selectElements);
+        const otherElements = queryAll('*')
+            .filter(el => {
+                const style = window.getComputedStyle(el);
+                const tag = el.tagName.toLowerCase();
+
+                // Skip if it's already in selectElements
+                if (selectSet.has(el)) return false;
+
+                // Only keep form-related elements
+                const allowedTags = ['input', 'button', 'textarea', 'fieldset'];
+                const isFormElement = allowedTags.includes(tag);
+
+                // Also keep elements with form-related roles
+                const formRoles = ['button', 'checkbox', 'menuitem', 
+                                 'menuitemcheckbox', 'menuitemradio', 'option', 'radio', 
+                                 'searchbox', 'switch', 'tab', 'textbox'];
+                const hasFormRole = formRoles.includes(el.getAttribute('role'));
+
+                return (isFormElement || hasFormRole) && 
+                       style.display !== 'none' && 
+                       style.visibility !== 'hidden' && 
+                       style.opacity !== '0' &&
+                       el.offsetParent !== null;
+            });
+
+        // Combine both sets of elements
+        const elements = [...selectElements, ...otherElements];
+
+        // Group related elements
+        const groups = groupElements(elements);
+
+        // Map groups to field details
+        return groups.map(group => {
+            // For select groups, prioritize the select element as main
+            const mainElement = group.find(el => 
+                el.tagName.toLowerCase() === 'select' ||
+                el.getAttribute('role') === 'listbox' ||
+                el.getAttribute('role') === 'combobox' ||
+                (el.className && (el.className.includes('select') || el.className.includes('dropdown')))
+            ) || group.find(el => 
+                el.tagName.toLowerCase() === 'input' || 
+                el.getAttribute('role') === 'textbox'
+            ) || group[0];
+
+            const details = getFieldDetails(mainElement);
+
+            // Add related elements information
+            details.relatedElements = group
+                .filter(el => el !== mainElement)
+                .map(el => ({
+                    type: el.tagName.toLowerCase(),
+                    role: el.getAttribute('role'),
+                    class: el.className,
+                    id: el.id,
+                    label: el.getAttribute('aria-label') || ''
+                }));
+
+            if (tracked) {
+                details.after = -1;
+                tracked.forEach((el, index) => {
+                    if (el && el.isConnected &&
+                        (el.compareDocumentPosition(mainElement) & Node.DOCUMENT_POSITION_FOLLOWING)) {
+                        details.after = index;
+                    }
+                });
+            }
+            return details;
+        });
+    }
+
+    // Content state of many fields at once (verify_fields_content)
+    function verify(fields) {
+        const labelCandidates = [];
+        return fields.map(info => {
+            const result = findField(info, labelCandidates);
+            if (!result) return { error: 'Could not find field' };
+
+            const el = result.element;
+            const selectedValue = el.querySelector('.select__single-value, .selected-value, [class*="selected"], [class*="value"]');
+            const selectedOption = el.querySelector('[aria-selected="true"]');
+            // Custom dropdowns render the value or placeholder beside the input
+            const box = fieldBox(el);
+            const singleValue = box.querySelector('[class*="single-value"], [class*="singleValue"]');
+            const placeholderNode = box.querySelector('[class*="placeholder"]:not(input):not(textarea)');
+            const classes = `${el.className || ''} ${box === el ? '' : box.className || ''}`;
+            const state = {
+                foundBy: result.method,
+                tagName: el.tagName,
+                role: el.getAttribute('role') || '',
+                value: el.value || '',
+                selectedText: selectedValue ? selectedValue.textContent : '',
+                ariaValue: el.getAttribute('aria-valuenow') || el.getAttribute('aria-valuetext') || '',
+                selectedAriaText: selectedOption ? selectedOption.textContent : '',
+                placeholder: el.getAttribute('placeholder') || '',
+                singleValueText: singleValue ? singleValue.textContent : '',
+                multiValueCount: box.querySelectorAll('[class*="multi-value__label"], [class*="multiValue__label"]').length,
+                placeholderText: placeholderNode ? placeholderNode.textContent : '',
+                placeholderShown: el.matches('input:placeholder-shown, textarea:placeholder-shown'),
+                emptyClass: /(^|[\\s_-])(is-)?empty\\b|placeholder-shown/i.test(classes)
+            };
+            if (el.tagName === 'SELECT') {
+                const option = el.selectedIndex >= 0 ? el.options[el.selectedIndex] : null;
+                state.selectedIndex = el.selectedIndex;
+                state.selectedOptionText = option ? option.textContent : '';
+                state.selectedIsPlaceholder = !option || isPlaceholderOption(option);
+            }
+            return state;
+        });
+    }
+
+    function isPlaceholderOption(opt) {
+        const text = opt.textContent.trim().toLowerCase();
+        const value = (opt.value || '').trim();
+        return !value || value === '-1' || value === 'Please Select' ||
+               text.includes('please select') || text.includes('select...');
+    }
+
+    // Option texts of fields that expose them without being opened:
+    // native selects, or custom dropdowns whose listbox is already rendered
+    function options(fields) {
+        return fields.map(info => {
+            const result = findField(info);
+            if (!result) return [];
+            const el = result.element;
+
+            if (el.tagName.toLowerCase() === 'select') {
+                return Array.from(el.options)
+                    .filter(opt => !opt.disabled && !isPlaceholderOption(opt))
+                    .map(opt => opt.textContent.trim());
+            }
+
+            const listboxIds = [
+                el.getAttribute('aria-controls'),
+                el.getAttribute('aria-owns'),
+                el.id ? `react-select-${el.id}-listbox` : null
+            ].filter(Boolean);
+            for (const listboxId of listboxIds) {
+                const listbox = document.getElementById(listboxId);
+                if (!listbox) continue;
+                const texts = Array.from(listbox.querySelectorAll('[role="option"]'))
+                    .map(opt => opt.textContent.trim())
+                    .filter(Boolean);
+                if (texts.length) return texts;
+            }
+            return [];
+        });
+    }
+
+    // Full option details of a native select, or [] if the field isn't one
+    function selectOptions(info) {
+        const result = findField(info);
+        if (!result) return [];
+        const el = result.element;
+        if (el.tagName.toLowerCase() !== 'select') return [];
+
+        return Array.from(el.querySelectorAll('option'))
+            .filter(opt => !opt.disabled && !isPlaceholderOption(opt))
+            .map(opt => ({
+                text: opt.textContent.trim(),
+                value: opt.value,
+                selected: opt.selected,
+                attributes: {
+                    class: opt.className,
+                    id: opt.id,
+                    'data-value': opt.getAttribute('data-value'),
+                    'aria-label': opt.getAttribute('aria-label')
+                }
+            }));
+    }
+
+    // Set a native select's value and fire input and change events.
+    // The prototype setter is used so frameworks that wrap .value (React)
+    // see the change. Returns whether the select now has that value.
+    function setSelectValue(info, value) {
+        const result = findField(info);
+        if (!result) return false;
+        const el = result.element;
+        if (el.tagName.toLowerCase() !== 'select') return false;
+        Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set.call(el, value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return el.value === value;
+    }
+
+    // A field's visible box. Custom dropdowns put the selected value in a
+    // wrapper around the input, so the box grows to the highest of 3
+    // ancestors that is still one row tall.
+    function fieldBox(el) {
+        let box = el;
+        let node = el.parentElement;
+        for (let depth = 0; node && node !== document.body && depth < 3; depth++) {
+            const rect = node.getBoundingClientRect();
+            if (rect.height > 120 || rect.width > window.innerWidth) break;
+            box = node;
+            node = node.parentElement;
+        }
+        return box;
+    }
+
+    // Viewport rect of a field's box, scrolled into view
+    function fieldRect(info) {
+        const result = findField(info);
+        if (!result) return null;
+        result.element.scrollIntoView({ block: 'center', inline: 'nearest' });
+
+        const rect = fieldBox(result.element).getBoundingClientRect();
+        return {
+            x: rect.left,
+            y: rect.top,
+            width: rect.width,
+            height: rect.height,
+            viewportWidth: window.innerWidth,
+            viewportHeight: window.innerHeight
+        };
+    }
+
+    // Document rects of many fields' boxes (for cropping one full-page
+    // screenshot), null for fields that are missing or not rendered
+    function fieldRects(fields) {
+        return fields.map(info => {
+            const result = findField(info);
+            if (!result) return null;
+            const rect = fieldBox(result.element).getBoundingClientRect();
+            if (!rect.width || !rect.height) return null;
+            return {
+                x: rect.left + window.scrollX,
+                y: rect.top + window.scrollY,
+                width: rect.width,
+                height: rect.height
+            };
+        });
+    }
+
+    // Elements collect() may report
+    const CLICKABLE_SELECTOR = 'button, a, input, select, option, li, [role], [onclick], ' +
+        '[class*="clickable"], [class*="selectable"], [class*="option"]';
+
+    // DOM change recorder (change_recorder.py): arm() right before a click
+    // or typing, collect() afterwards for what appeared. The clickable
+    // elements already visible at arm() time are remembered so a re-styled
+    // list that was open all along isn't reported as new.
+    function arm() {
+        if (window.__adfRecorder) window.__adfRecorder.observer.disconnect();
+
+        const recorder = {
+            added: new Set(),
+            changed: new Set(),
+            containers: new Set(),
+            wasVisible: new WeakSet(),
+            mutationCount: 0,
+            lastMutation: null,
+            waitStarted: null
+        };
+        document.querySelectorAll(CLICKABLE_SELECTOR).forEach(el => {
+            if (isVisible(el)) recorder.wasVisible.add(el);
+        });
+        recorder.observer = new MutationObserver(mutations => {
+            recorder.mutationCount += mutations.length;
+            recorder.lastMutation = performance.now();
+            for (const mutation of mutations) {
+                if (mutation.type === 'childList') {
+                    mutation.addedNodes.forEach(node => {
+                        if (node.nodeType === Node.ELEMENT_NODE) recorder.added.add(node);
+                    });
+                    if (mutation.target.nodeType === Node.ELEMENT_NODE) recorder.containers.add(mutation.target);
+                } else if (mutation.type === 'attributes') {
+                    recorder.changed.add(mutation.target);
+                } else if (mutation.type === 'characterData' && mutation.target.parentElement) {
+                    recorder.containers.add(mutation.target.parentElement);
+                }
+            }
+        });
+        recorder.observer.observe(document.documentElement, {
+            childList: true,
+            subtree: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ['style', 'class', 'hidden', 'aria-hidden', 'aria-expanded', 'open']
+        });
+        window.__adfRecorder = recorder;
+    }
+
+    function isVisible(el) {
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' &&
+               style.visibility !== 'hidden' &&
+               style.opacity !== '0' &&
+               (el.offsetParent !== null || style.position === 'fixed');
+    }
+
+    function isClickable(el, role) {
+        const tag = el.tagName.toLowerCase();
+        const hasHandlers = !!(el.onclick || el.onmousedown || el.onmouseup ||
+                               el.onmouseover || el.onkeydown || el.onkeyup ||
+                               el.onkeypress || el.getAttribute('onclick'));
+        return hasHandlers ||
+               ['option', 'menuitem', 'button', 'link'].includes(role) ||
+               ['button', 'a', 'input', 'select', 'option'].includes(tag) ||
+               Array.from(el.classList).some(cls =>
+                   cls.toLowerCase().includes('clickable') || cls.toLowerCase().includes('selectable'));
+    }
+
+    // Clickable elements added or shown since arm(); stops recording
+    function collect(params) {
+        const recorder = window.__adfRecorder;
+        if (!recorder) return [];
+        recorder.observer.disconnect();
+        window.__adfRecorder = null;
+
+        const found = findField(params);
+        const field = found ? found.element : null;
+
+        // Containers (after typing a search term) report their current
+        // children, since a filtered list keeps its existing option nodes;
+        // elsewhere only elements hidden at arm() time count
+        const roots = [];
+        if (params.includeContainers) {
+            recorder.containers.forEach(root => roots.push({ root, onlyNew: false }));
+        }
+        [...recorder.added, ...recorder.changed].forEach(root => roots.push({ root, onlyNew: true }));
+
+        const seen = new Set();
+        const results = [];
+        for (const { root, onlyNew } of roots) {
+            // Page-level class flips and the field's own wrappers would
+            // report the whole form, so only look at roots beside the field
+            if (!root.isConnected || root === document.body || root === document.documentElement) continue;
+            if (field && root.contains(field)) continue;
+            const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+            let node = walker.currentNode;
+            while (node && seen.size < params.maxNodes) {
+                if (!seen.has(node)) {
+                    seen.add(node);
+                    if (!(onlyNew && recorder.wasVisible.has(node)) && isVisible(node)) {
+                        const role = node.getAttribute('role');
+                        const text = (node.textContent || '').trim();
+                        const label = node.getAttribute('aria-label') || '';
+                        if (isClickable(node, role) &&
+                            !text.toLowerCase().includes('attach') &&
+                            !label.toLowerCase().includes('attach')) {
+                            const rect = node.getBoundingClientRect();
+                            results.push({
+                                tag: node.tagName.toLowerCase(),
+                                id: node.id,
+                                classes: Array.from(node.classList),
+                                textContent: text,
+                                value: node.value || '',
+                                dimensions: { top: rect.top, left: rect.left, width: rect.width, height: rect.height },
+                                hasMouseListeners: !!(node.onclick || node.getAttribute('onclick')),
+                                ariaAttributes: {
+                                    role: role,
+                                    label: label,
+                                    selected: node.getAttribute('aria-selected'),
+                                    value: node.getAttribute('aria-value')
+                                }
+                            });
+                        }
+                    }
+                }
+                node = walker.nextNode();
+            }
+            if (seen.size >= params.maxNodes) break;
+        }
+        return results;
+    }
+
+    // Field watch (field_watcher.py): which fields' subtrees changed and
+    // which new form controls appeared since the last takeChanges()
+    function watch(fields) {
+        if (window.__adfFieldWatch) window.__adfFieldWatch.observer.disconnect();
+
+        const state = {
+            elements: fields.map(info => {
+                const result = findField(info);
+                return result ? result.element : null;
+            }),
+            owners: new Map(),
+            dirty: new Set(),
+            addedRoots: [],
+            revealedRoots: []
+        };
+
+        // Map the field and its wrappers to the field indices they belong to
+        state.elements.forEach((el, index) => {
+            let node = el;
+            for (let depth = 0; node && node !== document.body && depth <= 3; depth++) {
+                if (!state.owners.has(node)) state.owners.set(node, []);
+                state.owners.get(node).push(index);
+                node = node.parentElement;
+            }
+        });
+
+        // Added controls inside a known field (e.g. React-Select's hidden
+        // value input) or inside an open option list aren't new fields
+        const controlSelector = 'input:not([type="hidden"]), select, textarea, [role="combobox"], [role="textbox"]';
+        function isNewControl(node) {
+            if (node.nodeType !== Node.ELEMENT_NODE) return false;
+            if (node.closest('[role="listbox"], [role="menu"]')) return false;
+            if (!node.matches(controlSelector) && !node.querySelector(controlSelector)) return false;
+            return !state.elements.some(el => el && el.contains(node));
+        }
+
+        state.observer = new MutationObserver(mutations => {
+            for (const mutation of mutations) {
+                let node = mutation.target.nodeType === Node.ELEMENT_NODE
+                    ? mutation.target : mutation.target.parentElement;
+                while (node && node !== document.body) {
+                    const owners = state.owners.get(node);
+                    if (owners) {
+                        owners.forEach(index => state.dirty.add(index));
+                        break;
+                    }
+                    node = node.parentElement;
+                }
+                if (mutation.type === 'childList') {
+                    mutation.addedNodes.forEach(added => {
+                        if (isNewControl(added)) state.addedRoots.push(added);
+                    });
+                }
+            }
+        });
+        state.observer.observe(document.body, {
+            childList: true,
+            subtree: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ['value', 'class', 'style', 'hidden', 'aria-hidden', 'aria-expanded', 'aria-selected']
+        });
+        window.__adfFieldWatch = state;
+    }
+
+    // The added subtrees are kept for scanRevealed()
+    function takeChanges() {
+        const state = window.__adfFieldWatch;
+        if (!state) return { dirty: [], detached: [], revealed: false };
+
+        state.revealedRoots = state.addedRoots.filter(el => el.isConnected);
+        state.addedRoots = [];
+        const changes = {
+            dirty: Array.from(state.dirty),
+            detached: state.elements
+                .map((el, index) => (el && el.isConnected) ? -1 : index)
+                .filter(index => index >= 0),
+            revealed: state.revealedRoots.length > 0
+        };
+        state.dirty.clear();
+        return changes;
+    }
+
+    // Scan only the subtrees added before the last takeChanges(), in page order
+    function scanRevealed() {
+        const state = window.__adfFieldWatch;
+        if (!state) return [];
+        const roots = state.revealedRoots.filter(el => el.isConnected)
+            .sort((a, b) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1);
+        return scan(roots, state.elements);
+    }
+
+    // Wait predicates (wait_utils.py), polled by page.wait_for_function
+
+    // The recorder saw a mutation and the DOM has since been quiet, or it
+    // saw none within startMs of the first poll (the click changed nothing)
+    function changesSettled(quietMs, startMs) {
+        const recorder = window.__adfRecorder;
+        if (!recorder) return false;
+        const now = performance.now();
+        if (recorder.mutationCount === 0) {
+            if (recorder.waitStarted === null) recorder.waitStarted = now;
+            return now - recorder.waitStarted >= startMs;
+        }
+        return now - recorder.lastMutation >= quietMs;
+    }
+
+    // The field (or its combobox wrapper, up to 3 ancestors) reports
+    // aria-expanded="true"
+    function isExpanded(info) {
+        const result = findField(info);
+        let el = result ? result.element : null;
+        for (let depth = 0; el && el !== document.body && depth <= 3; depth++) {
+            if (el.getAttribute('aria-expanded') === 'true') return true;
+            el = el.parentElement;
+        }
+        return false;
+    }
+
+    function resetOptionCount() {
+        window.__adfOptionCount = { count: -1, since: performance.now() };
+    }
+
+    // The recorder saw the list update and the visible option count has
+    // not changed for stableMs
+    function optionsStable(stableMs) {
+        const recorder = window.__adfRecorder;
+        if (recorder && recorder.mutationCount === 0) return false;
+
+        const count = Array.from(document.querySelectorAll('[role="option"], [role="menuitem"], [role="listbox"] li'))
+            .filter(el => el.offsetParent !== null).length;
+        const state = window.__adfOptionCount;
+        const now = performance.now();
+        if (count !== state.count) {
+            state.count = count;
+            state.since = now;
+            return false;
+        }
+        return now - state.since >= stableMs;
+    }
+
+    function armQuiet() {
+        if (!window.__adfQuiet) {
+            window.__adfQuiet = { last: performance.now() };
+            new MutationObserver(() => { window.__adfQuiet.last = performance.now(); })
+                .observe(document.documentElement, { childList: true, subtree: true, attributes: true, characterData: true });
+        }
+        window.__adfQuiet.last = performance.now();
+    }
+
+    function isQuiet(quietMs) {
+        return performance.now() - window.__adfQuiet.last >= quietMs;
+    }
+
+    // Unfocus whatever has focus (reset_focus.py)
+    function blurActive() {
+        if (document.activeElement) document.activeElement.blur();
+    }
+
+    window.__adf = {
+        version: VERSION,
+        findField,
+        groupElements,
+        scan,
+        verify,
+        options,
+        selectOptions,
+        setSelectValue,
+        fieldRect,
+        fieldRects,
+        arm,
+        collect,
+        watch,
+        takeChanges,
+        scanRevealed,
+        changesSettled,
+        isExpanded,
+        resetOptionCount,
+        optionsStable,
+        armQuiet,
+        isQuiet,
+        blurActive
+    };
+})()'''
+
+# Pages whose context re-runs the bundle on every navigation
+_registered_pages = weakref.WeakSet()
+
+_helper_stats = {
+    'calls': 0,
+    'installs': 0,
+    'source_bytes_saved': 0
+}
+_stats_lock = threading.Lock()
+
+
+def install_helpers(page):
+    """
+    Install the helper bundle in the page now and on every future navigation.
+
+    Args:
+        page: Playwright page
+    """
+    if page not in _registered_pages:
+        # Init scripts run before page scripts on each new document
+        page.add_init_script(HELPERS_JS)
+        _registered_pages.add(page)
+    page.evaluate(HELPERS_JS)
+    with _stats_lock:
+        _helper_stats['installs'] += 1
+
+
+def call_helper(page, name, *args):
+    """
+    Call window.__adf[name](*args) in the page.
+
+    Installs the bundle first if the page doesn't have this version yet
+    (first call, or a document loaded before the init script was added).
+
+    Returns:
+        The helper's JSON-serializable result
+    """
+    script = '''([name, version, args]) => {
+        if (!window.__adf || window.__adf.version !== version) return { __adfMissing: true };
+        return { result: window.__adf[name](...args) };
+    }'''
+    params = [name, HELPERS_VERSION, list(args)]
+
+    response = page.evaluate(script, params)
+    if response.get('__adfMissing'):
+        install_helpers(page)
+        response = page.evaluate(script, params)
+
+    with _stats_lock:
+        _helper_stats['calls'] += 1
+        _helper_stats['source_bytes_saved'] += len(HELPERS_JS) - len(script)
+    return response['result']
+
+
+def get_helper_stats():
+    """Return helper call/install counts and the script source not re-sent"""
+    with _stats_lock:
+        return dict(_helper_stats)
@@ -1,4 +1,5 @@
-import time
+from utils.scripts.page_helpers import call_helper
+from utils.scripts.wait_utils import wait_for_dom_quiet
 
 
 def reset_focus(page, element):
@@ -7,12 +8,9 @@ def reset_focus(page, element):
         print("\nResetting focus...")
 
         # Use JavaScript's blur() to unfocus the active element
-        page.evaluate('''() => {
-            if (document.activeElement) {
-                document.activeElement.blur();
-            }
-        }''')
-        time.sleep(0.1)
+        call_helper(page, 'blurActive')
+        wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                           name='focus_reset', fixed_sleep=0.1)
 
         return True
 
@@ -1,145 +1,212 @@
+from dotenv import load_dotenv
+from utils.scripts.page_helpers import call_helper
+from urllib.parse import urlparse
+import os
+import threading
+
+# Load environment variables
+load_dotenv()
+
+PLACEHOLDER_TEXTS = [
+    "select...", "all selected options have been cleared",
+    "choose an option", "no selection", "select an option"
+]
+
+# Values checked for content, in order of trust
+VALUE_FIELDS = ['selectedText', 'selectedAriaText', 'value', 'ariaValue']
+
+# How strongly each DOM signal says the field is filled
+FILLED_SIGNALS = {
+    'singleValueText': 0.9,
+    'multiValueCount': 0.9,
+    'value': 0.7,
+    'selectedAriaText': 0.6,
+    'selectedText': 0.5,
+    'ariaValue': 0.5
+}
+# ...or empty
+EMPTY_SIGNALS = {
+    'placeholderText': 0.8,
+    'placeholderValue': 0.6,
+    'placeholderShown': 0.5,
+    'emptyClass': 0.5,
+    'blankInput': 0.6
+}
+# Below this the DOM can't tell, and the field goes to image-based validation
+MIN_CONFIDENCE = float(os.getenv('DOM_STATE_MIN_CONFIDENCE', '0.5'))
+
+# Per-site classifications and vision escalations
+_classifier_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _is_placeholder(value):
+    return any(text in value.lower() for text in PLACEHOLDER_TEXTS)
+
+
+def find_content_evidence(field_state):
+    """
+    Return (source, value) for the first non-placeholder value in a field
+    state, or None if the field looks empty
+    """
+    for field in ['singleValueText'] + VALUE_FIELDS:
+        value = (field_state.get(field) or '').strip()
+        if value and not _is_placeholder(value):
+            return field, value
+    return None
+
+
+def _combine(weights):
+    """Chance at least one signal is right, treating them as independent"""
+    remaining = 1.0
+    for weight in weights:
+        remaining *= 1 - weight
+    return 1 - remaining
+
+
+def classify_field_state(field_state):
+    """
+    Decide from DOM signals alone whether a field is filled.
+
+    A native select is decided by its selected option. Other fields weigh
+    every signal the page gave: value texts that aren't placeholders and
+    React-Select value chips count toward filled; a rendered placeholder,
+    a placeholder string as the value, empty classes and a blank plain
+    input count toward empty. The confidence is how much the stronger
+    side outweighs the other; when it's below MIN_CONFIDENCE (or the
+    field wasn't found) the state is 'unknown'.
+
+    Args:
+        field_state: One result of the page's verify helper
+
+    Returns:
+        tuple: ('filled', 'empty' or 'unknown', confidence from 0 to 1)
+    """
+    if 'error' in field_state:
+        return 'unknown', 0.0
+
+    if field_state.get('tagName') == 'SELECT' and 'selectedIndex' in field_state:
+        if field_state['selectedIsPlaceholder']:
+            return 'empty', 0.95
+        return 'filled', 0.95
+
+    filled, empty = [], []
+    for field, weight in FILLED_SIGNALS.items():
+        value = field_state.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+            if value and _is_placeholder(value):
+                empty.append(EMPTY_SIGNALS['placeholderValue'])
+                continue
+        if value:
+            filled.append(weight)
+
+    if (field_state.get('placeholderText') or '').strip():
+        empty.append(EMPTY_SIGNALS['placeholderText'])
+    for field in ('placeholderShown', 'emptyClass'):
+        if field_state.get(field):
+            empty.append(EMPTY_SIGNALS[field])
+    # A plain text input keeps its answer in .value; comboboxes may not
+    if (field_state.get('tagName') in ('INPUT', 'TEXTAREA') and
+            field_state.get('role') != 'combobox' and not filled):
+        empty.append(EMPTY_SIGNALS['blankInput'])
+
+    margin = _combine(filled) - _combine(empty)
+    if abs(margin) < MIN_CONFIDENCE:
+        return 'unknown', abs(margin)
+    return ('filled' if margin > 0 else 'empty'), abs(margin)
+
+
+def _site(page):
+    try:
+        return urlparse(page.url).netloc or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def _count(page, key, amount=1):
+    site = _site(page)
+    with _stats_lock:
+        stats = _classifier_stats.setdefault(site, {
+            'filled': 0, 'empty': 0, 'unknown': 0, 'escalated': 0})
+        stats[key] += amount
+
+
+def record_escalations(page, count):
+    """Count fields of a page that were sent to image-based validation"""
+    _count(page, 'escalated', count)
+
+
+def verify_fields_content(page, elements):
+    """
+    Check the content of many fields with a single page.evaluate.
+
+    Args:
+        page: Playwright page
+        elements: List of field dicts from analyze_form_fields
+
+    Returns:
+        list: One dict per field with 'hasContent', 'fieldState' and
+        'confidence' (see classify_field_state), 'evidence' ((source, value)
+        or None), 'foundBy' (id/xpath/role_label or None if the field wasn't
+        found) and the raw 'state'
+    """
+    if not elements:
+        return []
+
+    params = [{
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or '',
+        'label': element.get('label') or ''
+    } for element in elements]
+
+    try:
+        states = call_helper(page, 'verify', params)
+    except Exception as e:
+        print(f"Error in verify_fields_content: {e}")
+        states = [{'error': str(e)} for _ in elements]
+
+    results = []
+    for state in states:
+        field_state, confidence = classify_field_state(state)
+        _count(page, field_state)
+        results.append({
+            'hasContent': field_state == 'filled',
+            'fieldState': field_state,
+            'confidence': confidence,
+            'evidence': None if 'error' in state else find_content_evidence(state),
+            'foundBy': state.get('foundBy'),
+            'state': state
+        })
+    return results
+
+
 def verify_field_content(page, element):
     """Check if a field has actual selected content (not placeholder text)"""
-    try:
-        print("\n=== Field Content Verification ===")
-        print(f"Checking field: {element.get('label', 'Unknown Label')}")
-        print(f"Field type: {element.get('type', 'Unknown Type')}")
-        print(f"Field ID: {element['attributes'].get('id', 'No ID')}")
-
-        # Create a params object to safely pass to JavaScript
-        params = {
-            'id': element['attributes']['id'],
-            'xpath': element['xpath'],
-            'label': element['label']
-        }
-
-        field_state = page.evaluate('''(params) => {
-            function getFieldByMultipleMethods() {
-                let el;
-                
-                // Try by ID
-                const id = params.id;
-                if (id) {
-                    el = document.getElementById(id);
-                    if (el) return { method: 'id', element: el };
-                }
-                
-                // Try by XPath
-                const xpath = params.xpath;
-                if (xpath) {
-                    el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                    if (el) return { method: 'xpath', element: el };
-                }
-                
-                // Try by role and label
-                const label = params.label;
-                if (label) {
-                    el = Array.from(document.querySelectorAll('[role="combobox"], [role="listbox"], select, input'))
-                        .find(e => e.getAttribute('aria-label') === label || 
-                                 document.querySelector(`label[for="${e.id}"]`)?.textContent.includes(label));
-                    if (el) return { method: 'role_label', element: el };
-                }
-                
-                return null;
-            }
-
-            const result = getFieldByMultipleMethods();
-            if (!result) return { error: 'Could not find field' };
-            
-            const el = result.element;
-            const style = window.getComputedStyle(el);
-            
-            // Get parent element info
-            const parent = el.parentElement;
-            const parentInfo = parent ? {
-                tag: parent.tagName,
-                class: parent.className,
-                role: parent.getAttribute('role'),
-                id: parent.id
-            } : null;
-            
-            // Get all possible selected values
-            const selectedValue = el.querySelector('.select__single-value, .selected-value, [class*="selected"], [class*="value"]');
-            const selectedOption = el.querySelector('[aria-selected="true"]');
-            const selectedText = selectedValue ? selectedValue.textContent : null;
-            
-            return {
-                foundBy: result.method,
-                value: el.value || '',
-                textContent: el.textContent || '',
-                innerText: el.innerText || '',
-                selectedText: selectedText || '',
-                ariaValue: el.getAttribute('aria-valuenow') || el.getAttribute('aria-valuetext') || '',
-                selectedAriaText: selectedOption ? selectedOption.textContent : '',
-                placeholder: el.getAttribute('placeholder') || '',
-                isDisabled: el.disabled || el.getAttribute('aria-disabled') === 'true',
-                isReadOnly: el.readOnly || el.getAttribute('aria-readonly') === 'true',
-                hasPlaceholderClass: el.classList.contains('placeholder'),
-                isEmptyClass: el.classList.contains('empty'),
-                visibility: style.visibility,
-                display: style.display,
-                computedHeight: style.height,
-                ariaExpanded: el.getAttribute('aria-expanded'),
-                ariaHasPopup: el.getAttribute('aria-haspopup'),
-                ariaControls: el.getAttribute('aria-controls'),
-                ariaOwns: el.getAttribute('aria-owns'),
-                ariaDescribedby: el.getAttribute('aria-describedby'),
-                classList: Array.from(el.classList).join(' '),
-                tagName: el.tagName,
-                parent: parentInfo,
-                childElements: Array.from(el.children).map(child => ({
-                    tag: child.tagName,
-                    text: child.textContent,
-                    class: child.className,
-                    role: child.getAttribute('role'),
-                    ariaSelected: child.getAttribute('aria-selected')
-                }))
-            };
-        }''', params)
-
-        if field_state:
-            print("\nField State:")
-            print(
-                f"  Found by: {field_state.get('foundBy', 'Unknown method')}")
-            print(f"  Tag: {field_state.get('tagName', 'Unknown')}")
-            print(f"  Classes: {field_state.get('classList', 'None')}")
-            print(f"  Disabled: {field_state.get('isDisabled', False)}")
-            print(f"  ReadOnly: {field_state.get('isReadOnly', False)}")
-            print(f"  Visibility: {field_state.get('visibility', 'Unknown')}")
-            print(f"  Display: {field_state.get('display', 'Unknown')}")
-
-            print("\nContent Values Found:")
-            # Check for actual selected value
-            value_fields = ['selectedText',
-                            'selectedAriaText', 'value', 'ariaValue']
-            for field in value_fields:
-                value = field_state.get(field, '').strip()
-                print(f"  {field}: '{value}'")
-                if value:
-                    # Check if it's not a placeholder
-                    placeholder_texts = [
-                        "select...", "all selected options have been cleared",
-                        "choose an option", "no selection", "select an option"
-                    ]
-                    is_placeholder = any(text in value.lower()
-                                         for text in placeholder_texts)
-                    if not is_placeholder:
-                        print(f"\nDecision: Has Content (Found in {field})")
-                        print(f"  - Value: '{value}'")
-                        print("  - Not a placeholder text")
-                        return True
-                    else:
-                        print(f"  - '{value}' appears to be a placeholder")
-
-            print("\nDecision: Empty")
-            print("  - No valid content found in any field")
-            return False
+    print("\n=== Field Content Verification ===")
+    print(f"Checking field: {element.get('label', 'Unknown Label')}")
+
+    result = verify_fields_content(page, [element])[0]
+    if result['hasContent']:
+        if result['evidence']:
+            source, value = result['evidence']
+            print(f"Decision: Has Content (Found in {source}: '{value}')")
         else:
-            print("\nDecision: Empty")
-            print("  - Could not get field state")
-            return False
+            print(f"Decision: Has Content ({result['confidence']:.0%} confident)")
+    elif result['foundBy'] is None:
+        print(f"Decision: Empty ({result['state'].get('error')})")
+    elif result['fieldState'] == 'empty':
+        print(f"Decision: Empty ({result['confidence']:.0%} confident)")
+    else:
+        print("Decision: Empty (no valid content found)")
+    return result['hasContent']
 
-    except Exception as e:
-        print("\nDecision: Empty (Error)")
-        print(f"  - Error in verify_field_content: {e}")
-        return False
+
+def get_classifier_stats():
+    """Return per-site DOM state counts and how often vision was needed"""
+    with _stats_lock:
+        stats = {site: dict(counts) for site, counts in _classifier_stats.items()}
+    for counts in stats.values():
+        classified = counts['filled'] + counts['empty'] + counts['unknown']
+        counts['escalation_rate'] = counts['escalated'] / classified if classified else 0.0
+    return stats
@@ -1,28 +1,149 @@
-from utils.scripts.get_detailed_element_info import get_detailed_element_info
+from utils.scripts.change_recorder import arm_change_recorder, collect_changes
 from utils.scripts.reset_focus import reset_focus
-from utils.gpt.option_selector import select_best_option
+from utils.scripts.page_helpers import call_helper
+from utils.review.review_queue import ask_for_option
+from utils.scripts.wait_utils import wait_for_changes, wait_for_aria_expanded, wait_for_options_stable, wait_for_dom_quiet
+from utils.gpt.option_selector import select_best_option, LARGE_LIST_OPTIONS
+from utils.gpt.form_planner import find_planned_option
 from utils.gpt.field_partial_fill import generate_search_term
 from utils.gpt.field_partial_fill_with_retry import generate_retry_search_term
 from utils.gpt.field_fill_no_context import generate_search_term as generate_search_term_no_context
-from utils.scripts.compare_utils import compare_states, compare_styles, compare_aria
-import time
+from utils.reference.gazetteer import reference_search_term
 from datetime import datetime
-import json
+import threading
+
+# Retry search terms per field before giving up on searching
+MAX_SEARCH_RETRIES = 2
+
+# Native selects filled without opening them, ones left for review or that
+# wouldn't take a value, and ones whose options couldn't be read (click path)
+_native_select_stats = {
+    'filled': 0,
+    'already_selected': 0,
+    'unanswered': 0,
+    'failed': 0,
+    'fallback': 0
+}
+_stats_lock = threading.Lock()
+
+
+def choose_option(formatted_elements, element):
+    """Use the planned answer for this field if it matches an option, otherwise ask GPT"""
+    planned_answer = element.get('plannedAnswer')
+    if planned_answer:
+        index = find_planned_option(
+            planned_answer, [el['text'] for el in formatted_elements])
+        if index is not None:
+            print(
+                f"Using planned answer: [{index}] {formatted_elements[index]['text']}")
+            return index
+        print(
+            f"Planned answer '{planned_answer}' not among the options, asking GPT...")
+
+    return select_best_option(formatted_elements, element['label'])
+
+
+def _field_selector(element):
+    if element['attributes']['id']:
+        # Escape periods in ID for CSS selector
+        escaped_id = element['attributes']['id'].replace('.', '\\.')
+        return f"#{escaped_id}"
+    return f"xpath={element['xpath']}"
+
+
+def _set_native_option(page, element, field, option):
+    """Select one option of a native <select>; True if it took"""
+    if option['selected']:
+        print("Option already selected")
+        with _stats_lock:
+            _native_select_stats['already_selected'] += 1
+        return True
+
+    try:
+        if not call_helper(page, 'setSelectValue', field, option['value']):
+            page.select_option(_field_selector(element), value=option['value'])
+        print("Successfully set select value")
+        with _stats_lock:
+            _native_select_stats['filled'] += 1
+        return True
+    except Exception as e:
+        print(f"Error setting select value: {e}")
+        with _stats_lock:
+            _native_select_stats['failed'] += 1
+        return False
+
+
+def fill_native_select(page, element):
+    """
+    Fill a native <select> without clicking it.
+
+    The options are read in one evaluate, the answer comes from the planned
+    answer, the decision cache, the local matcher or GPT (see
+    choose_option), and the value is set in the page with input and change
+    events. Playwright's select_option is the fallback when the value
+    doesn't take. No snapshots are taken and nothing is waited for.
+
+    When no option can be chosen the field goes to ask_for_option (the
+    review queue in batch runs) rather than the click path, which would
+    open the OS picker and ask GPT about the same options again.
+
+    Args:
+        page: Playwright page
+        element: Field dict from analyze_form_fields
+
+    Returns:
+        bool: True if an option was selected, False if not, or None if the
+        options couldn't be read and the click path should be tried
+    """
+    field = {'id': element['attributes']['id'], 'xpath': element['xpath']}
+    native_options = call_helper(page, 'selectOptions', field)
+    if not native_options:
+        print("\nNo options found in native select")
+        with _stats_lock:
+            _native_select_stats['fallback'] += 1
+        return None
+
+    print(f"\nFound {len(native_options)} native select options")
+    formatted_elements = [{'text': opt['text'], 'class': ''} for opt in native_options]
+    best_option = choose_option(formatted_elements, element)
+    if best_option != 'false':
+        print(f"\nGPT selected option: {native_options[best_option]['text']}")
+        return _set_native_option(page, element, field, native_options[best_option])
+
+    print("GPT couldn't determine the best option from native select options")
+    with _stats_lock:
+        _native_select_stats['unanswered'] += 1
+    while True:
+        choice = ask_for_option(page, element, [{'textContent': opt['text']} for opt in native_options],
+                                "GPT couldn't determine the best option")
+        if choice.lower() == 'q':
+            return False
+        try:
+            index = int(choice) - 1
+        except ValueError:
+            print("Please enter a valid number or 'q'")
+            continue
+        if 0 <= index < len(native_options):
+            return _set_native_option(page, element, field, native_options[index])
+        print("Please enter a valid number or 'q'")
 
 
 def visualize_element_changes(page, element, analyze_form_fields_func):
     """Visualize changes in the element and its surroundings"""
+    # Native selects need no click or DOM diff to read and set their options
+    if element.get('nativeSelect'):
+        print("\n=== Native Select ===")
+        if fill_native_select(page, element) is not None:
+            return analyze_form_fields_func(page)
+        print("Falling back to clicking the select...")
+
+    search_retries = 0
     while True:
         print("\n=== Element Visualization Start ===")
         print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')}")
 
-        # Get initial state
-        print("\nGetting initial state...")
-        initial_state = get_detailed_element_info(page, element)
-        print(f"Initial state keys: {list(initial_state.keys())}")
-        if 'targetElement' in initial_state:
-            print(
-                f"Initial targetElement keys: {list(initial_state['targetElement'].keys())}")
+        # Record DOM mutations caused by the click instead of diffing snapshots
+        arm_change_recorder(page)
 
         # Click the element
         try:
@@ -37,47 +158,21 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
             print(f"\nFailed to click element: {e}")
             return
 
-        # Wait a moment for changes
-        time.sleep(0.1)
-
-        # Get state after click
-        print("\nGetting post-click state...")
-        post_state = get_detailed_element_info(page, element)
-        print(f"Post state keys: {list(post_state.keys())}")
-        if 'targetElement' in post_state:
-            print(
-                f"Post targetElement keys: {list(post_state['targetElement'].keys())}")
-
-        # Compare and display changes
+        # Wait for the dropdown to open and settle; native selects open an
+        # OS picker that never touches the DOM, so there's nothing to wait for.
+        # Comboboxes that report aria-expanded say exactly when they're open,
+        # and render their options in the same update.
+        if element['type'] != 'select':
+            expanded = (element['attributes'].get('aria-expanded') is not None and
+                        wait_for_aria_expanded(page, element, timeout=1.0,
+                                               name='aria_expanded', fixed_sleep=0.1))
+            if not expanded:
+                wait_for_changes(page, quiet_ms=50, timeout=1.0,
+                                 name='dropdown_open', fixed_sleep=0.1)
+
+        # Clickable elements that were added or became visible after the click
         print("\n=== Changes Detected ===")
-
-        # Compare target element
-        print("\nTarget Element Changes:")
-        if 'targetElement' not in initial_state or 'targetElement' not in post_state:
-            print("Error: Missing targetElement in one of the states")
-            print(
-                f"Initial state has targetElement: {'targetElement' in initial_state}")
-            print(
-                f"Post state has targetElement: {'targetElement' in post_state}")
-        else:
-            compare_states(
-                initial_state['targetElement'], post_state['targetElement'])
-
-        # Find new elements by comparing all visible elements
-        initial_elements = {f"{el['tag']}_{el['id']}_{el['textContent']}"
-                            for el in initial_state['allVisibleElements']}
-
-        # Filter for only clickable new elements, excluding 'attach' fields
-        new_elements = [el for el in post_state['allVisibleElements']
-                        if f"{el['tag']}_{el['id']}_{el['textContent']}" not in initial_elements
-                        and (el['hasMouseListeners'] or  # Has click handlers
-                             el['ariaAttributes']['role'] in ['option', 'menuitem', 'button', 'link'] or
-                             el['tag'] in ['button', 'a', 'input', 'select', 'option'] or
-                             any(cls for cls in el['classes'] if 'clickable' in cls.lower(
-                             ) or 'selectable' in cls.lower())
-                             )
-                        and not ('attach' in (el['textContent'] or '').lower() or
-                                 'attach' in (el['ariaAttributes'].get('label') or '').lower())]
+        new_elements = collect_changes(page, element)
 
         if new_elements:
             print("\nNew Clickable Elements Detected:")
@@ -105,11 +200,20 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                 for el in new_elements
             ]
 
-            # If there are 15 or more options, try to narrow down first
-            if len(formatted_elements) >= 90:
+            # Large lists are shortlisted locally first, which usually finds
+            # the answer without the search-term round trip
+            best_option = 'false'
+            asked_elements = None
+            if len(formatted_elements) >= LARGE_LIST_OPTIONS:
+                best_option = choose_option(formatted_elements, element)
+                asked_elements = formatted_elements
+
+            # If the shortlist had no match, try to narrow down by searching
+            if len(formatted_elements) >= LARGE_LIST_OPTIONS and best_option == 'false':
                 print("\nLarge number of options detected. Generating search term...")
-                # Take first 5 elements as sample
-                search_term = generate_search_term(
+                # Known entities (country, school, ...) need no LLM call;
+                # otherwise take first 5 elements as sample
+                search_term = reference_search_term(element['label']) or generate_search_term(
                     formatted_elements[:5], element['label'])
                 if not search_term:
                     print(
@@ -120,6 +224,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                 if search_term:
                     print(f"\nTyping search term: {search_term}")
                     try:
+                        # Record how the dropdown changes while searching
+                        arm_change_recorder(page)
+
                         # Focus and type into the original field
                         if element['attributes']['id']:
                             escaped_id = element['attributes']['id'].replace(
@@ -130,180 +237,16 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
 
                         # Type the search term
                         page.keyboard.type(search_term)
-                        # Increased delay to wait for dropdown to update and populate
-                        time.sleep(1.5)
+                        # Wait for the filtered option list to stop changing
+                        wait_for_options_stable(
+                            page, stable_ms=300, timeout=5.0, name='search_results', fixed_sleep=1.5)
 
-                        # Get updated state after search using the same method as analyze_form_fields
+                        # Get the dropdown options recorded during the search
                         print("\nGetting updated state after search...")
                         try:
-                            post_search_state = page.evaluate('''(elementInfo) => {
-                                function getFieldByMultipleMethods() {
-                                    let el;
-                                    
-                                    // Try by ID
-                                    const id = elementInfo.id;
-                                    if (id) {
-                                        el = document.getElementById(id);
-                                        if (el) return { method: 'id', element: el };
-                                    }
-                                    
-                                    // Try by XPath
-                                    const xpath = elementInfo.xpath;
-                                    if (xpath) {
-                                        el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                                        if (el) return { method: 'xpath', element: el };
-                                    }
-                                    
-                                    return null;
-                                }
-
-                                const result = getFieldByMultipleMethods();
-                                if (!result) return { error: 'Could not find field' };
-                                
-                                const el = result.element;
-                                
-                                // Debug info about the main element
-                                console.log('Main Element:', {
-                                    tag: el.tagName,
-                                    id: el.id,
-                                    classes: Array.from(el.classList),
-                                    role: el.getAttribute('role'),
-                                    expanded: el.getAttribute('aria-expanded'),
-                                    controls: el.getAttribute('aria-controls'),
-                                    owns: el.getAttribute('aria-owns')
-                                });
-                                
-                                // Get ALL possible elements that could be options
-                                const allPossibleOptions = {
-                                    // 1. React-Select pattern
-                                    reactSelect: (() => {
-                                        const listboxId = `react-select-${el.id}-listbox`;
-                                        const reactSelectListbox = document.getElementById(listboxId);
-                                        return reactSelectListbox ? 
-                                            Array.from(reactSelectListbox.querySelectorAll('*')).map(opt => ({
-                                                tag: opt.tagName,
-                                                text: opt.textContent,
-                                                classes: Array.from(opt.classList),
-                                                role: opt.getAttribute('role'),
-                                                selected: opt.getAttribute('aria-selected'),
-                                                hidden: opt.hidden || opt.style.display === 'none',
-                                                parent: opt.parentElement ? {
-                                                    tag: opt.parentElement.tagName,
-                                                    classes: Array.from(opt.parentElement.classList),
-                                                    role: opt.parentElement.getAttribute('role')
-                                                } : null
-                                            })) : [];
-                                    })(),
-                                    
-                                    // 2. Aria-expanded elements
-                                    ariaExpanded: (() => {
-                                        const expandedElements = document.querySelectorAll('[aria-expanded]');
-                                        return Array.from(expandedElements).map(exp => ({
-                                            tag: exp.tagName,
-                                            expanded: exp.getAttribute('aria-expanded'),
-                                            children: Array.from(exp.querySelectorAll('*')).map(child => ({
-                                                tag: child.tagName,
-                                                text: child.textContent,
-                                                classes: Array.from(child.classList),
-                                                role: child.getAttribute('role'),
-                                                hidden: child.hidden || child.style.display === 'none'
-                                            }))
-                                        }));
-                                    })(),
-                                    
-                                    // 3. All list items and options near the field
-                                    nearbyElements: (() => {
-                                        const rect = el.getBoundingClientRect();
-                                        return Array.from(document.querySelectorAll('li, [role="option"], [role="listbox"] *, .select-option, .dropdown-item'))
-                                            .map(opt => {
-                                                const optRect = opt.getBoundingClientRect();
-                                                return {
-                                                    tag: opt.tagName,
-                                                    text: opt.textContent,
-                                                    classes: Array.from(opt.classList),
-                                                    role: opt.getAttribute('role'),
-                                                    selected: opt.getAttribute('aria-selected'),
-                                                    hidden: opt.hidden || opt.style.display === 'none',
-                                                    position: {
-                                                        top: optRect.top - rect.bottom,
-                                                        left: optRect.left - rect.left
-                                                    },
-                                                    parent: opt.parentElement ? {
-                                                        tag: opt.parentElement.tagName,
-                                                        classes: Array.from(opt.parentElement.classList),
-                                                        role: opt.parentElement.getAttribute('role')
-                                                    } : null
-                                                };
-                                            });
-                                    })(),
-                                    
-                                    // 4. Any element with option-like classes
-                                    optionLikeElements: Array.from(document.querySelectorAll('[class*="option"], [class*="item"], [class*="select"], [class*="dropdown"]'))
-                                        .map(opt => ({
-                                            tag: opt.tagName,
-                                            text: opt.textContent,
-                                            classes: Array.from(opt.classList),
-                                            role: opt.getAttribute('role'),
-                                            selected: opt.getAttribute('aria-selected'),
-                                            hidden: opt.hidden || opt.style.display === 'none'
-                                        }))
-                                };
-                                
-                                return {
-                                    debug: true,
-                                    mainElement: {
-                                        tag: el.tagName,
-                                        id: el.id,
-                                        classes: Array.from(el.classList),
-                                        role: el.getAttribute('role'),
-                                        expanded: el.getAttribute('aria-expanded'),
-                                        controls: el.getAttribute('aria-controls'),
-                                        owns: el.getAttribute('aria-owns')
-                                    },
-                                    allPossibleOptions
-                                };
-                            }''', {
-                                'id': element['attributes']['id'],
-                                'xpath': element['xpath']
-                            })
-
-                            if not post_search_state or 'error' in post_search_state:
-                                raise Exception(
-                                    f"Error finding options: {post_search_state.get('error', 'Unknown error')}")
-
-                            # Add debug print statements after getting the state
-                            print("\n=== DEBUG: Dropdown State Analysis ===")
-                            print("\nMain Element:")
-                            print(json.dumps(post_search_state.get(
-                                'mainElement', {}), indent=2))
-
-                            print("\nPossible Options Found:")
-                            print("\n1. React-Select Pattern:")
-                            print(json.dumps(post_search_state.get(
-                                'allPossibleOptions', {}).get('reactSelect', [])[:5], indent=2))
-                            print(
-                                f"Total React-Select elements: {len(post_search_state.get('allPossibleOptions', {}).get('reactSelect', []))}")
-
-                            print("\n2. Aria-Expanded Elements:")
-                            print(json.dumps(post_search_state.get(
-                                'allPossibleOptions', {}).get('ariaExpanded', [])[:5], indent=2))
-                            print(
-                                f"Total Aria-Expanded elements: {len(post_search_state.get('allPossibleOptions', {}).get('ariaExpanded', []))}")
-
-                            print("\n3. Nearby Elements:")
-                            print(json.dumps(post_search_state.get('allPossibleOptions', {}).get(
-                                'nearbyElements', [])[:5], indent=2))
-                            print(
-                                f"Total Nearby elements: {len(post_search_state.get('allPossibleOptions', {}).get('nearbyElements', []))}")
-
-                            print("\n4. Option-like Elements:")
-                            print(json.dumps(post_search_state.get('allPossibleOptions', {}).get(
-                                'optionLikeElements', [])[:5], indent=2))
-                            print(
-                                f"Total Option-like elements: {len(post_search_state.get('allPossibleOptions', {}).get('optionLikeElements', []))}")
-
-                            # These are all new elements since they're from the dropdown
-                            filtered_elements = post_search_state['allVisibleElements']
+                            # Options that appeared or were re-filtered while typing
+                            filtered_elements = collect_changes(
+                                page, element, include_containers=True)
                             print(
                                 f"Found {len(filtered_elements)} dropdown options")
 
@@ -323,10 +266,7 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                     f"Filtered down to {len(formatted_elements)} options")
 
                                 # Get GPT's selection
-                                best_option = select_best_option(
-                                    formatted_elements,
-                                    element['label']
-                                )
+                                best_option = choose_option(formatted_elements, element)
 
                                 if best_option != 'false':
                                     selected_element = new_elements[best_option]
@@ -346,9 +286,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                             f"\nClicked element {best_option + 1}")
 
                                         # Reset focus after clicking
-                                        time.sleep(0.1)
+                                        wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                                                           name='option_selected', fixed_sleep=0.1)
                                         reset_focus(page, element)
-                                        time.sleep(0.1)  # Wait for focus reset
                                         # Return and exit after successful selection
                                         return analyze_form_fields_func(page)
                                     except Exception as e:
@@ -360,13 +300,15 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                     # TODO: omg please fix this later i have sucha  bad headache
                                     print(
                                         "GPT couldn't determine the best option")
-                                    # Try generating a new search term based on the failed results
-                                    retry_search_term = generate_retry_search_term(
-                                        formatted_elements[:5],
-                                        element['label'],
-                                        search_term,
-                                        formatted_elements
-                                    )
+                                    # Try a new search term based on the failed results, a few times at most
+                                    retry_search_term = None
+                                    if search_retries < MAX_SEARCH_RETRIES:
+                                        retry_search_term = generate_retry_search_term(
+                                            formatted_elements[:5],
+                                            element['label'],
+                                            search_term,
+                                            formatted_elements
+                                        )
 
                                     if retry_search_term:
                                         print(
@@ -374,14 +316,17 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                         # Clear previous search
                                         page.keyboard.press("Control+a")
                                         page.keyboard.press("Backspace")
-                                        time.sleep(0.5)
+                                        wait_for_dom_quiet(page, quiet_ms=100, timeout=0.5,
+                                                           name='search_cleared', fixed_sleep=0.5)
 
                                         # Type new search term
                                         page.keyboard.type(retry_search_term)
                                         # Wait for dropdown to update
-                                        time.sleep(2.5)
+                                        wait_for_dom_quiet(page, quiet_ms=300, timeout=5.0,
+                                                           name='retry_search_results', fixed_sleep=2.5)
 
                                         # Continue with the same logic for handling search results...
+                                        search_retries += 1
                                         continue
 
                                     print("Clearing search term...")
@@ -407,11 +352,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                             pass
                         print("Continuing with original list...")
 
-            # Get GPT's selection
-            best_option = select_best_option(
-                formatted_elements,
-                element['label']
-            )
+            # Get GPT's selection, unless it already saw this list
+            if formatted_elements is not asked_elements:
+                best_option = choose_option(formatted_elements, element)
 
             if best_option != 'false':
                 selected_element = new_elements[best_option]
@@ -428,9 +371,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                     print(f"\nClicked element {best_option + 1}")
 
                     # Reset focus after clicking
-                    time.sleep(0.1)  # Wait for click to register
+                    wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                                       name='option_selected', fixed_sleep=0.1)
                     reset_focus(page, element)
-                    time.sleep(0.1)  # Wait for focus reset
 
                     break  # Exit after successful click
                 except Exception as e:
@@ -438,8 +381,8 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                     print("Falling back to manual selection...")
                     # Fall back to manual selection if GPT's choice fails
                     try:
-                        choice = input(
-                            "\nEnter number to click an element or 'q' to quit: ")
+                        choice = ask_for_option(
+                            page, element, new_elements, f"Clicking the selected option failed: {e}")
                         if choice.lower() == 'q':
                             break
 
@@ -455,9 +398,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                     selected_element['textContent'], exact=True).click()
                             print(f"\nClicked element {choice}")
 
-                            time.sleep(0.1)
+                            wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                                               name='option_selected', fixed_sleep=0.1)
                             reset_focus(page, element)
-                            time.sleep(0.1)
                             break
                     except ValueError:
                         print("Please enter a valid number or 'q'")
@@ -465,8 +408,8 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                 print(
                     "\nGPT couldn't determine the best option. Please select manually.")
                 try:
-                    choice = input(
-                        "\nEnter number to click an element or 'q' to quit: ")
+                    choice = ask_for_option(
+                        page, element, new_elements, "GPT couldn't determine the best option")
                     if choice.lower() == 'q':
                         break
 
@@ -482,9 +425,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                 selected_element['textContent'], exact=True).click()
                         print(f"\nClicked element {choice}")
 
-                        time.sleep(0.1)
+                        wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                                           name='option_selected', fixed_sleep=0.1)
                         reset_focus(page, element)
-                        time.sleep(0.1)
                         break
                 except ValueError:
                     print("Please enter a valid number or 'q'")
@@ -492,63 +435,7 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
             print("\nNo new clickable elements detected")
 
             # First check if this is a native select with options
-            native_options = page.evaluate('''(elementInfo) => {
-                function getFieldByMultipleMethods() {
-                    let el;
-                    
-                    // Try by ID
-                    const id = elementInfo.id;
-                    if (id) {
-                        el = document.getElementById(id);
-                        if (el) return { method: 'id', element: el };
-                    }
-                    
-                    // Try by XPath
-                    const xpath = elementInfo.xpath;
-                    if (xpath) {
-                        el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                        if (el) return { method: 'xpath', element: el };
-                    }
-                    
-                    return null;
-                }
-
-                const result = getFieldByMultipleMethods();
-                if (!result) return { error: 'Could not find field' };
-                
-                const el = result.element;
-                
-                // Check if it's a select element and has options
-                if (el.tagName.toLowerCase() === 'select') {
-                    return Array.from(el.querySelectorAll('option'))
-                        .filter(opt => {
-                            // Skip the "Please Select" or empty options
-                            const text = opt.textContent.trim().toLowerCase();
-                            const value = (opt.value || '').trim();
-                            return !opt.disabled && 
-                                   value && 
-                                   value !== 'Please Select' &&
-                                   !text.includes('please select') &&
-                                   !text.includes('select...') &&
-                                   value !== '-1' &&
-                                   value !== '';
-                        })
-                        .map(opt => ({
-                            text: opt.textContent.trim(),
-                            value: opt.value,
-                            selected: opt.selected,
-                            // Include any additional attributes that might be useful
-                            attributes: {
-                                class: opt.className,
-                                id: opt.id,
-                                'data-value': opt.getAttribute('data-value'),
-                                'aria-label': opt.getAttribute('aria-label')
-                            }
-                        }));
-                }
-                
-                return [];
-            }''', {
+            native_options = call_helper(page, 'selectOptions', {
                 'id': element['attributes']['id'],
                 'xpath': element['xpath']
             })
@@ -566,10 +453,7 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                 ]
 
                 # Get GPT's selection
-                best_option = select_best_option(
-                    formatted_elements,
-                    element['label']
-                )
+                best_option = choose_option(formatted_elements, element)
 
                 if best_option != 'false':
                     selected_option = native_options[best_option]
@@ -577,49 +461,13 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
 
                     try:
                         # Use JavaScript to set the value
-                        page.evaluate('''(params) => {
-                            function getFieldByMultipleMethods() {
-                                let el;
-                                
-                                // Try by ID
-                                const id = params.elementInfo.id;
-                                if (id) {
-                                    el = document.getElementById(id);
-                                    if (el) return { method: 'id', element: el };
-                                }
-                                
-                                // Try by XPath
-                                const xpath = params.elementInfo.xpath;
-                                if (xpath) {
-                                    el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                                    if (el) return { method: 'xpath', element: el };
-                                }
-                                
-                                return null;
-                            }
-
-                            const result = getFieldByMultipleMethods();
-                            if (!result) return false;
-                            
-                            const el = result.element;
-                            el.value = params.value;
-                            
-                            // Trigger change event
-                            const event = new Event('change', { bubbles: true });
-                            el.dispatchEvent(event);
-                            
-                            return true;
-                        }''', {
-                            'elementInfo': {
-                                'id': element['attributes']['id'],
-                                'xpath': element['xpath']
-                            },
-                            'value': selected_option['value']
-                        })
-
-                        print("Successfully set select value")
-                        time.sleep(0.1)
-                        break
+                        if call_helper(page, 'setSelectValue', {
+                            'id': element['attributes']['id'],
+                            'xpath': element['xpath']
+                        }, selected_option['value']):
+                            print("Successfully set select value")
+                            break
+                        print("Select value didn't change")
                     except Exception as e:
                         print(f"Error setting select value: {e}")
                 else:
@@ -628,11 +476,15 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
 
             # If no native options or selection failed, try search term approach
             print("Attempting to type a search term...")
-            search_term = generate_search_term_no_context(element['label'])
+            search_term = reference_search_term(
+                element['label']) or generate_search_term_no_context(element['label'])
 
             if search_term:
                 print(f"\nTyping search term: {search_term}")
                 try:
+                    # Record how the dropdown changes while searching
+                    arm_change_recorder(page)
+
                     # Focus and type into the original field
                     if element['attributes']['id']:
                         escaped_id = element['attributes']['id'].replace(
@@ -643,180 +495,16 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
 
                     # Type the search term
                     page.keyboard.type(search_term)
-                    # Increased delay to wait for dropdown to update and populate
-                    time.sleep(2.5)
+                    # Wait for the filtered option list to stop changing
+                    wait_for_options_stable(
+                        page, stable_ms=300, timeout=5.0, name='search_results', fixed_sleep=2.5)
 
-                    # Get updated state after search using the same method as analyze_form_fields
+                    # Get the dropdown options recorded during the search
                     print("\nGetting updated state after search...")
                     try:
-                        post_search_state = page.evaluate('''(elementInfo) => {
-                            function getFieldByMultipleMethods() {
-                                let el;
-                                
-                                // Try by ID
-                                const id = elementInfo.id;
-                                if (id) {
-                                    el = document.getElementById(id);
-                                    if (el) return { method: 'id', element: el };
-                                }
-                                
-                                // Try by XPath
-                                const xpath = elementInfo.xpath;
-                                if (xpath) {
-                                    el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                                    if (el) return { method: 'xpath', element: el };
-                                }
-                                
-                                return null;
-                            }
-
-                            const result = getFieldByMultipleMethods();
-                            if (!result) return { error: 'Could not find field' };
-                            
-                            const el = result.element;
-                            
-                            // Debug info about the main element
-                            console.log('Main Element:', {
-                                tag: el.tagName,
-                                id: el.id,
-                                classes: Array.from(el.classList),
-                                role: el.getAttribute('role'),
-                                expanded: el.getAttribute('aria-expanded'),
-                                controls: el.getAttribute('aria-controls'),
-                                owns: el.getAttribute('aria-owns')
-                            });
-                            
-                            // Get ALL possible elements that could be options
-                            const allPossibleOptions = {
-                                // 1. React-Select pattern
-                                reactSelect: (() => {
-                                    const listboxId = `react-select-${el.id}-listbox`;
-                                    const reactSelectListbox = document.getElementById(listboxId);
-                                    return reactSelectListbox ? 
-                                        Array.from(reactSelectListbox.querySelectorAll('*')).map(opt => ({
-                                            tag: opt.tagName,
-                                            text: opt.textContent,
-                                            classes: Array.from(opt.classList),
-                                            role: opt.getAttribute('role'),
-                                            selected: opt.getAttribute('aria-selected'),
-                                            hidden: opt.hidden || opt.style.display === 'none',
-                                            parent: opt.parentElement ? {
-                                                tag: opt.parentElement.tagName,
-                                                classes: Array.from(opt.parentElement.classList),
-                                                role: opt.parentElement.getAttribute('role')
-                                            } : null
-                                        })) : [];
-                                })(),
-                                
-                                // 2. Aria-expanded elements
-                                ariaExpanded: (() => {
-                                    const expandedElements = document.querySelectorAll('[aria-expanded]');
-                                    return Array.from(expandedElements).map(exp => ({
-                                        tag: exp.tagName,
-                                        expanded: exp.getAttribute('aria-expanded'),
-                                        children: Array.from(exp.querySelectorAll('*')).map(child => ({
-                                            tag: child.tagName,
-                                            text: child.textContent,
-                                            classes: Array.from(child.classList),
-                                            role: child.getAttribute('role'),
-                                            hidden: child.hidden || child.style.display === 'none'
-                                        }))
-                                    }));
-                                })(),
-                                
-                                // 3. All list items and options near the field
-                                nearbyElements: (() => {
-                                    const rect = el.getBoundingClientRect();
-                                    return Array.from(document.querySelectorAll('li, [role="option"], [role="listbox"] *, .select-option, .dropdown-item'))
-                                        .map(opt => {
-                                            const optRect = opt.getBoundingClientRect();
-                                            return {
-                                                tag: opt.tagName,
-                                                text: opt.textContent,
-                                                classes: Array.from(opt.classList),
-                                                role: opt.getAttribute('role'),
-                                                selected: opt.getAttribute('aria-selected'),
-                                                hidden: opt.hidden || opt.style.display === 'none',
-                                                position: {
-                                                    top: optRect.top - rect.bottom,
-                                                    left: optRect.left - rect.left
-                                                },
-                                                parent: opt.parentElement ? {
-                                                    tag: opt.parentElement.tagName,
-                                                    classes: Array.from(opt.parentElement.classList),
-                                                    role: opt.parentElement.getAttribute('role')
-                                                } : null
-                                            };
-                                        });
-                                })(),
-                                
-                                // 4. Any element with option-like classes
-                                optionLikeElements: Array.from(document.querySelectorAll('[class*="option"], [class*="item"], [class*="select"], [class*="dropdown"]'))
-                                    .map(opt => ({
-                                        tag: opt.tagName,
-                                        text: opt.textContent,
-                                        classes: Array.from(opt.classList),
-                                        role: opt.getAttribute('role'),
-                                        selected: opt.getAttribute('aria-selected'),
-                                        hidden: opt.hidden || opt.style.display === 'none'
-                                    }))
-                            };
-                            
-                            return {
-                                debug: true,
-                                mainElement: {
-                                    tag: el.tagName,
-                                    id: el.id,
-                                    classes: Array.from(el.classList),
-                                    role: el.getAttribute('role'),
-                                    expanded: el.getAttribute('aria-expanded'),
-                                    controls: el.getAttribute('aria-controls'),
-                                    owns: el.getAttribute('aria-owns')
-                                },
-                                allPossibleOptions
-                            };
-                        }''', {
-                            'id': element['attributes']['id'],
-                            'xpath': element['xpath']
-                        })
-
-                        if not post_search_state or 'error' in post_search_state:
-                            raise Exception(
-                                f"Error finding options: {post_search_state.get('error', 'Unknown error')}")
-
-                        # Add debug print statements after getting the state
-                        print("\n=== DEBUG: Dropdown State Analysis ===")
-                        print("\nMain Element:")
-                        print(json.dumps(post_search_state.get(
-                            'mainElement', {}), indent=2))
-
-                        print("\nPossible Options Found:")
-                        print("\n1. React-Select Pattern:")
-                        print(json.dumps(post_search_state.get(
-                            'allPossibleOptions', {}).get('reactSelect', [])[:5], indent=2))
-                        print(
-                            f"Total React-Select elements: {len(post_search_state.get('allPossibleOptions', {}).get('reactSelect', []))}")
-
-                        print("\n2. Aria-Expanded Elements:")
-                        print(json.dumps(post_search_state.get(
-                            'allPossibleOptions', {}).get('ariaExpanded', [])[:5], indent=2))
-                        print(
-                            f"Total Aria-Expanded elements: {len(post_search_state.get('allPossibleOptions', {}).get('ariaExpanded', []))}")
-
-                        print("\n3. Nearby Elements:")
-                        print(json.dumps(post_search_state.get('allPossibleOptions', {}).get(
-                            'nearbyElements', [])[:5], indent=2))
-                        print(
-                            f"Total Nearby elements: {len(post_search_state.get('allPossibleOptions', {}).get('nearbyElements', []))}")
-
-                        print("\n4. Option-like Elements:")
-                        print(json.dumps(post_search_state.get('allPossibleOptions', {}).get(
-                            'optionLikeElements', [])[:5], indent=2))
-                        print(
-                            f"Total Option-like elements: {len(post_search_state.get('allPossibleOptions', {}).get('optionLikeElements', []))}")
-
-                        # These are all new elements since they're from the dropdown
-                        filtered_elements = post_search_state['allVisibleElements']
+                        # Options that appeared or were re-filtered while typing
+                        filtered_elements = collect_changes(
+                            page, element, include_containers=True)
                         print(
                             f"Found {len(filtered_elements)} dropdown options")
 
@@ -836,10 +524,7 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                 f"Filtered down to {len(formatted_elements)} options")
 
                             # Get GPT's selection
-                            best_option = select_best_option(
-                                formatted_elements,
-                                element['label']
-                            )
+                            best_option = choose_option(formatted_elements, element)
 
                             if best_option != 'false':
                                 selected_element = new_elements[best_option]
@@ -859,9 +544,9 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                         f"\nClicked element {best_option + 1}")
 
                                     # Reset focus after clicking
-                                    time.sleep(0.1)
+                                    wait_for_dom_quiet(page, quiet_ms=50, timeout=0.5,
+                                                       name='option_selected', fixed_sleep=0.1)
                                     reset_focus(page, element)
-                                    time.sleep(0.1)  # Wait for focus reset
                                     # Return and exit after successful selection
                                     return analyze_form_fields_func(page)
                                 except Exception as e:
@@ -871,13 +556,15 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                     page.keyboard.press("Backspace")
                             else:
                                 print("GPT couldn't determine the best option")
-                                # Try generating a new search term based on the failed results
-                                retry_search_term = generate_retry_search_term(
-                                    formatted_elements[:5],
-                                    element['label'],
-                                    search_term,
-                                    formatted_elements
-                                )
+                                # Try a new search term based on the failed results, a few times at most
+                                retry_search_term = None
+                                if search_retries < MAX_SEARCH_RETRIES:
+                                    retry_search_term = generate_retry_search_term(
+                                        formatted_elements[:5],
+                                        element['label'],
+                                        search_term,
+                                        formatted_elements
+                                    )
 
                                 if retry_search_term:
                                     print(
@@ -885,14 +572,17 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
                                     # Clear previous search
                                     page.keyboard.press("Control+a")
                                     page.keyboard.press("Backspace")
-                                    time.sleep(0.5)
+                                    wait_for_dom_quiet(page, quiet_ms=100, timeout=0.5,
+                                                       name='search_cleared', fixed_sleep=0.5)
 
                                     # Type new search term
                                     page.keyboard.type(retry_search_term)
                                     # Wait for dropdown to update
-                                    time.sleep(2.5)
+                                    wait_for_dom_quiet(page, quiet_ms=300, timeout=5.0,
+                                                       name='retry_search_results', fixed_sleep=2.5)
 
                                     # Continue with the same logic for handling search results...
+                                    search_retries += 1
                                     continue
 
                                 print("Clearing search term...")
@@ -925,8 +615,13 @@ def visualize_element_changes(page, element, analyze_form_fields_func):
 
     # Reset focus one final time before re-analyzing
     reset_focus(page, element)
-    time.sleep(0.1)
 
     # Re-analyze all form fields
     print("\nRe-analyzing all form fields...")
     return analyze_form_fields_func(page)
+
+
+def get_native_select_stats():
+    """Return how many native selects were filled without the click path"""
+    with _stats_lock:
+        return dict(_native_select_stats)
@@ -0,0 +1,124 @@
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from utils.scripts.page_helpers import call_helper
+import threading
+import time
+
+# Per-wait timing: name -> count, seconds actually waited, seconds the old
+# fixed sleep would have taken, and how many waits hit their deadline
+_wait_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name, started, fixed_sleep, timed_out):
+    waited = time.perf_counter() - started
+    with _stats_lock:
+        stats = _wait_stats.setdefault(
+            name, {'count': 0, 'waited': 0.0, 'fixed': 0.0, 'timeouts': 0})
+        stats['count'] += 1
+        stats['waited'] += waited
+        stats['fixed'] += fixed_sleep
+        if timed_out:
+            stats['timeouts'] += 1
+    return waited
+
+
+def wait_for_condition(page, predicate, arg=None, timeout=2.0, name='condition', fixed_sleep=0.0):
+    """
+    Wait until a JavaScript predicate returns true, or until the deadline.
+
+    Predicates are one-line calls into the window.__adf helper bundle
+    (page_helpers.py), so each poll doesn't re-send the check's source.
+
+    Args:
+        page: Playwright page
+        predicate: JavaScript function source, called with arg
+        arg: Argument passed to the predicate
+        timeout: Deadline in seconds
+        name: Name the wait is reported under
+        fixed_sleep: The fixed sleep this wait replaces, for reporting
+
+    Returns:
+        bool: True if the condition held before the deadline
+    """
+    started = time.perf_counter()
+    timed_out = False
+    try:
+        page.wait_for_function(predicate, arg=arg,
+                               timeout=timeout * 1000, polling=50)
+    except PlaywrightTimeoutError:
+        timed_out = True
+    except Exception as e:
+        print(f"Error waiting for {name}: {e}")
+        timed_out = True
+
+    _record(name, started, fixed_sleep, timed_out)
+    return not timed_out
+
+
+def wait_for_changes(page, quiet_ms=50, start_ms=150, timeout=1.0, name='dropdown_open', fixed_sleep=0.1):
+    """
+    Wait until the change recorder has seen a mutation and the DOM has then
+    been quiet for quiet_ms. If nothing changes within start_ms the wait ends
+    there, so a click that opens nothing costs about the old fixed sleep
+    rather than the whole timeout. Requires arm_change_recorder to have
+    been called, once per wait.
+    """
+    return wait_for_condition(page, '([quietMs, startMs]) => window.__adf.changesSettled(quietMs, startMs)',
+                              [quiet_ms, start_ms], timeout, name, fixed_sleep)
+
+
+def wait_for_aria_expanded(page, element, timeout=1.0, name='aria_expanded', fixed_sleep=0.1):
+    """Wait until the field (or its combobox wrapper) reports aria-expanded="true" """
+    return wait_for_condition(page, '(info) => window.__adf.isExpanded(info)', {
+        'id': element['attributes'].get('id') or '',
+        'xpath': element.get('xpath') or ''
+    }, timeout, name, fixed_sleep)
+
+
+def wait_for_options_stable(page, stable_ms=300, timeout=5.0, name='options_stable', fixed_sleep=1.5):
+    """
+    Wait until the change recorder has seen the list update and the number of
+    visible options has not changed for stable_ms.
+    """
+    call_helper(page, 'resetOptionCount')
+    return wait_for_condition(page, '(stableMs) => window.__adf.optionsStable(stableMs)',
+                              stable_ms, timeout, name, fixed_sleep)
+
+
+def wait_for_dom_quiet(page, quiet_ms=100, timeout=1.0, name='dom_quiet', fixed_sleep=0.1):
+    """Wait until no DOM mutation has happened for quiet_ms"""
+    call_helper(page, 'armQuiet')
+    return wait_for_condition(page, '(quietMs) => window.__adf.isQuiet(quietMs)',
+                              quiet_ms, timeout, name, fixed_sleep)
+
+
+def wait_for_page_ready(page, timeout=3.0, name='page_ready', fixed_sleep=3.0):
+    """Wait for the page's network to go idle instead of a fixed sleep"""
+    return wait_for_pages_ready([page], timeout, name, fixed_sleep)
+
+
+def wait_for_pages_ready(pages, timeout=3.0, name='page_ready', fixed_sleep=3.0):
+    """
+    Wait for the network of several pages to go idle. The pages load in
+    parallel, so they share one deadline: sites whose analytics never let
+    the network idle cost timeout once, not once per page.
+    """
+    started = time.perf_counter()
+    deadline = started + timeout
+    timed_out = False
+    for page in pages:
+        # Playwright reads a timeout of 0 as "no timeout"
+        remaining = max(deadline - time.perf_counter(), 0.001)
+        try:
+            page.wait_for_load_state('networkidle', timeout=remaining * 1000)
+        except PlaywrightTimeoutError:
+            timed_out = True
+    _record(name, started, fixed_sleep, timed_out)
+    return not timed_out
+
+
+def get_wait_stats():
+    """Return per-wait counts and total seconds waited vs the old fixed sleeps"""
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _wait_stats.items()}
+